@@ -2,7 +2,7 @@
 配置文件
 """
 import os
-from typing import Optional
+from typing import Dict, List, Optional
 from pydantic_settings import BaseSettings
 
 
@@ -23,11 +23,83 @@ class Settings(BaseSettings):
     # 浏览器配置
     HEADLESS: bool = False
     BROWSER_TIMEOUT: int = 30
-    IMPLICIT_WAIT: int = 10
+    CHROMEDRIVER_PATH: Optional[str] = None  # 固定的chromedriver路径（离线节点推荐）
+    CHROMEDRIVER_MANIFEST: str = ".chromedriver_manifest.json"  # 已解析的驱动路径和版本缓存
+    CHROMEDRIVER_AUTO_DOWNLOAD: bool = True  # 本地没有可用驱动时用webdriver-manager下载一次，离线节点设为false
+    CHROME_PROFILE_DIR: Optional[str] = None  # 持久化的Chrome用户数据根目录（每个账号一个模板），为空时每次使用空白配置
+    BROWSER_PREWARM: bool = True  # 在加载其余组件的同时在后台启动浏览器
+    IMPLICIT_WAIT: int = 0  # 隐式等待会让每次查找失败都白等，统一使用显式等待
+    SELECTOR_TIMEOUT: float = 3.0  # 显式查找元素的短超时（秒）
+    PAGE_READY_TIMEOUT: float = 10.0  # 等待页面关键元素出现的超时（秒）
+    CARD_PARSE_TIMEOUT: float = 3.0  # 逐张读取职位卡片时每张的截止时间（秒）
+    MAX_STUCK_CARDS: int = 3  # 一页中超时的卡片达到该数量后跳过剩余卡片
+    PAGE_LOAD_STRATEGY: str = "eager"  # 默认页面加载策略：normal/eager/none
+    PAGE_LOAD_STRATEGIES: Dict[str, str] = {
+        'login': 'normal',  # 登录页需要完整加载（验证码、二维码、协议脚本）
+        'search': 'eager',
+        'detail': 'eager',
+        'chat': 'eager'
+    }
+    RESOURCE_BLOCKING: bool = True  # 按页面类型屏蔽图片、字体和统计脚本
+    RESOURCE_LAUNCH_PROFILE: str = "login"  # 浏览器启动时的拦截配置：none/login/scrape
+    
+    # 网络抓包配置（通过CDP读取站点XHR返回的JSON，DOM解析作为回退）
+    NETWORK_CAPTURE: bool = True
+    CAPTURE_SEARCH_PATTERNS: List[str] = [r'search/positions', r'position/search', r'positionList']
+    CAPTURE_CHAT_LIST_PATTERNS: List[str] = [r'chat/(list|sessions?)', r'session/list', r'im/.*session']
+    CAPTURE_CHAT_MESSAGE_PATTERNS: List[str] = [r'chat/(history|messages?)', r'message/list', r'im/.*(history|message)']
+    
+    # 搜索方式：browser（加载页面）、api（直接请求搜索JSON接口）、auto（优先接口，失败时加载页面）
+    SEARCH_MODE: str = "auto"
+    ZHILIAN_SEARCH_API_URL: Optional[str] = None  # 搜索JSON接口地址，为空时从抓到的搜索请求中学习
+    SEARCH_API_PAGE_SIZE: int = 30  # 每页条数；从抓到的搜索请求学习接口时沿用其 pageSize
+    JOB_INDEX_ENABLED: bool = True  # 职位详情写入本地全文索引，重复查询不再访问网站
+    JOB_INDEX_FILE: str = "job_index.db"
+    JOB_INDEX_MAX_AGE_HOURS: float = 72.0  # LocalJobIndex.is_fresh 的默认有效期
+    DETAIL_TEXT_LIMIT: int = 5000  # 详情页正文保留的最大字符数
+    CRAWL_STALENESS_THRESHOLD: float = 0.3  # 估计内容已变化的概率超过该值才重新抓取详情
+    CRAWL_DAILY_BUDGET: int = 200  # 每日最多抓取的详情页数量
+    CRAWL_PRIOR_CHANGE_INTERVAL_HOURS: float = 72.0  # 没有观察数据时假设的职位内容变化间隔
+    CODE_INDEX_FILE: Optional[str] = None  # 额外的地区/关键词代码表（JSON，格式同 modules/data/zhilian_codes.json），覆盖内置条目
+    # 搜索条件 -> 接口查询参数名（与页面URL中的 jl/kw/gx/xl/yx/gm 对应）
+    SEARCH_API_PARAM_NAMES: Dict[str, str] = {
+        'location': 'cityId',
+        'keyword': 'kw',
+        'experience': 'workExperience',
+        'education': 'education',
+        'salary_range': 'salary',
+        'company_type': 'companyType',
+        'page': 'pageIndex',
+        'page_size': 'pageSize'
+    }
     
     # WebSocket配置
-    WS_RECONNECT_INTERVAL: int = 5
-    WS_MAX_RECONNECT_ATTEMPTS: int = 10
+    WS_RECONNECT_INTERVAL: int = 5  # 首次重连的基础等待（秒），之后按指数增长并加随机抖动
+    WS_MAX_RECONNECT_ATTEMPTS: int = 10  # 连续重连失败的上限，0为不限
+    WS_RECONNECT_MAX_INTERVAL: float = 60.0  # 重连等待的上限（秒）
+    WS_STABLE_SECONDS: float = 60.0  # 连接持续超过该时间后断开时，重连计数从头开始
+    WS_CONNECT_TIMEOUT: float = 10.0  # connect() 等待首次连接建立的时间（秒）
+    WS_PING_INTERVAL: float = 30.0  # 协议层ping间隔（秒），0为不发送
+    WS_PING_TIMEOUT: Optional[float] = 10.0  # 发出ping后等待pong的时间（秒），超时判定对端失联；为空时不检查
+    WS_APP_PING: bool = True  # 每次收到pong后同时发送应用层 {"type": "ping"} 消息
+    WS_ACK_TIMEOUT: float = 3.0  # 经WebSocket发送聊天消息后等待服务端确认或回显的时间（秒）
+    
+    # 打招呼配置
+    CHAT_ID_CACHE_FILE: str = "chat_id_cache.json"  # 职位URL -> 聊天ID 缓存
+    CHAT_ID_RESOLVE_TIMEOUT: float = 3.0  # 请求页面源码解析聊天ID的超时（秒）
+    CHAT_ID_MISS_TTL: float = 3600.0  # 解析不到聊天ID的URL在该秒数内不再请求
+    ZHILIAN_CHAT_SEND_API: Optional[str] = None  # 站内聊天发送接口，配置后可不经页面直接发送
+    GREETING_RATE_PER_MINUTE: float = 6.0  # 每个账号每分钟最多发送数（令牌桶速率）
+    GREETING_BURST: int = 2  # 令牌桶容量
+    GREETING_DAILY_QUOTA: int = 200  # 每个账号每日发送上限
+    GREETING_JITTER_MIN: float = 0.5  # 每次发送前的随机抖动（秒）
+    GREETING_JITTER_MAX: float = 2.0
+    GREETING_LANES: int = 1  # 并行发送通道数（每个通道一个浏览器）
+    GREETING_STATE_FILE: str = "greeting_state.json"  # 待发送队列和配额持久化文件
+    GREETING_STATE_SAVE_INTERVAL: float = 5.0  # 入队时最多每隔该秒数写一次状态文件（发送结果总是立即写入）
+    INPUT_MODE: str = "js"  # 消息输入方式：js（一次性注入并触发事件）或 keys（逐字符send_keys）
+    GREETING_RANKING: bool = True  # 搜索并打招呼时先按相关度排序，优先给最匹配的候选人发送
+    RANKING_OVERSAMPLE: int = 3  # 排序时多搜索的倍数（搜索 max_candidates * N 个后取前 max_candidates 个）
     
     # 中心服务器配置
     CENTER_SERVER_URL: Optional[str] = None
@@ -36,6 +108,23 @@ class Settings(BaseSettings):
     # 日志配置
     LOG_LEVEL: str = "INFO"
     LOG_FILE: str = "zhilian_bot.log"
+    LOG_ENQUEUE: bool = True  # 日志经队列由后台线程写出，不阻塞调用方
+    LOG_JSON_FILE: Optional[str] = None  # 额外输出结构化JSON日志（每行一条）
+    LOG_SAMPLING: Dict[str, float] = {}  # 按模块对DEBUG/INFO日志采样，如 {"modules.websocket_chat": 0.1}
+    
+    # 指标配置
+    METRICS_PORT: Optional[int] = None  # 本地指标端点端口（/metrics 为Prometheus文本，/metrics.json 为JSON），为空时不启动
+    METRICS_HOST: str = "127.0.0.1"
+    
+    # 追踪配置
+    TRACE_ENABLED: bool = False  # 记录搜索、解析、打招呼、转发等热点路径的耗时区间
+    TRACE_FILE: str = "zhilian_trace.json"
+    TRACE_FORMAT: str = "chrome"  # chrome（chrome://tracing / Perfetto 可打开）或 jsonl
+    TRACE_SAMPLE_RATE: float = 0.1  # 按调用链采样的比例，1.0 为全部记录
+    
+    # 剖析配置（start.py --profile）
+    PROFILE_DIR: str = "profiles"
+    PROFILE_SAMPLE_INTERVAL: float = 0.005  # 采样剖析器的采样间隔（秒）
     
     # 其他配置
     REQUEST_DELAY: float = 1.0  # 请求间隔（秒）
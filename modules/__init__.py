@@ -1,16 +1,52 @@
 """
 智联招聘自动化工具模块
+
+各管理器按需导入（PEP 562）：只有第一次访问 modules.ZhilianLogin 等属性时才导入对应子模块，
+不需要浏览器的运行模式（如 --mode export）不会加载 selenium、websocket、requests 等依赖。
 """
-from .login import ZhilianLogin
-from .candidate import CandidateManager
-from .interaction import InteractionManager
-from .websocket_chat import WebSocketChatManager
-from .message_forwarder import MessageForwarder
-
-__all__ = [
-    'ZhilianLogin',
-    'CandidateManager', 
-    'InteractionManager',
-    'WebSocketChatManager',
-    'MessageForwarder'
-]
\ No newline at end of file
+import importlib
+from typing import TYPE_CHECKING
+
+# 导出名 -> 所在子模块
+_EXPORTS = {
+    'ZhilianLogin': '.login',
+    'CandidateManager': '.candidate',
+    'InteractionManager': '.interaction',
+    'ChatIdResolver': '.chat_resolver',
+    'WebSocketChatManager': '.websocket_chat',
+    'MessageForwarder': '.message_forwarder',
+    'GreetingScheduler': '.greeting_scheduler',
+    'CandidateFilter': '.candidate_filter',
+    'CandidateRanker': '.candidate_ranker',
+    'LocalJobIndex': '.job_index',
+    'CrawlScheduler': '.crawl_scheduler'
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value  # 之后直接命中模块字典，不再经过 __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
+
+
+if TYPE_CHECKING:
+    from .login import ZhilianLogin
+    from .candidate import CandidateManager
+    from .interaction import InteractionManager
+    from .chat_resolver import ChatIdResolver
+    from .websocket_chat import WebSocketChatManager
+    from .message_forwarder import MessageForwarder
+    from .greeting_scheduler import GreetingScheduler
+    from .candidate_filter import CandidateFilter
+    from .candidate_ranker import CandidateRanker
+    from .job_index import LocalJobIndex
+    from .crawl_scheduler import CrawlScheduler
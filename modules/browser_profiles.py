@@ -0,0 +1,109 @@
+"""
+浏览器资源拦截配置 - 按页面类型屏蔽图片、字体和统计脚本
+"""
+from typing import Dict, List
+
+from utils import log
+
+
+# 第三方统计/广告脚本，任何阶段都不需要
+TRACKING_URL_PATTERNS = [
+    "*hm.baidu.com*",
+    "*cnzz.com*",
+    "*google-analytics.com*",
+    "*googletagmanager.com*",
+    "*doubleclick.net*",
+    "*growingio.com*",
+    "*sensorsdata*",
+    "*zhugeio.com*",
+    "*mmstat.com*",
+    "*/sa.gif*"
+]
+
+# 图片、字体、媒体等重资源，抓取列表页和详情页时不需要
+HEAVY_ASSET_PATTERNS = [
+    "*.png*", "*.jpg*", "*.jpeg*", "*.gif*", "*.webp*", "*.svg*", "*.ico*",
+    "*.woff*", "*.woff2*", "*.ttf*", "*.otf*", "*.eot*",
+    "*.mp4*", "*.webm*", "*.mp3*"
+]
+
+RESOURCE_PROFILES: Dict[str, Dict] = {
+    # 不拦截任何资源（对照基准）
+    'none': {
+        'block_images': False,
+        'blocked_urls': []
+    },
+    # 登录：保留图片以显示验证码和二维码，只屏蔽统计脚本
+    'login': {
+        'block_images': False,
+        'blocked_urls': TRACKING_URL_PATTERNS
+    },
+    # 抓取：屏蔽图片、字体、媒体和统计脚本
+    'scrape': {
+        'block_images': True,
+        'blocked_urls': TRACKING_URL_PATTERNS + HEAVY_ASSET_PATTERNS
+    }
+}
+
+
+def get_profile(name: str) -> Dict:
+    """获取资源拦截配置，未知名称时返回不拦截配置"""
+    profile = RESOURCE_PROFILES.get(name)
+    if profile is None:
+        log.warning(f"未知的资源拦截配置: {name}，不拦截任何资源")
+        profile = RESOURCE_PROFILES['none']
+    return profile
+
+
+def build_chrome_prefs(profile_name: str) -> Dict:
+    """生成启动时的Chrome首选项（启动后无法修改，用于浏览器启动时所在阶段）"""
+    profile = get_profile(profile_name)
+    prefs = {
+        'profile.default_content_setting_values.notifications': 2
+    }
+    if profile['block_images']:
+        prefs['profile.managed_default_content_settings.images'] = 2
+    return prefs
+
+
+def apply_resource_profile(driver, profile_name: str) -> bool:
+    """通过CDP Network.setBlockedURLs在运行时切换拦截规则"""
+    try:
+        profile = get_profile(profile_name)
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': profile['blocked_urls']})
+        log.debug(f"已切换资源拦截配置: {profile_name}（{len(profile['blocked_urls'])} 条规则）")
+        return True
+    except Exception as e:
+        log.warning(f"切换资源拦截配置失败: {e}")
+        return False
+
+
+_PAGE_METRICS_SCRIPT = """
+    var nav = performance.getEntriesByType('navigation')[0] || {};
+    var resources = performance.getEntriesByType('resource');
+    var bytes = nav.transferSize || 0;
+    for (var i = 0; i < resources.length; i++) {
+        bytes += resources[i].transferSize || 0;
+    }
+    return {
+        dom_content_loaded_ms: nav.domContentLoadedEventEnd || 0,
+        load_ms: nav.loadEventEnd || nav.duration || 0,
+        transfer_bytes: bytes,
+        resource_count: resources.length
+    };
+"""
+
+
+def collect_page_metrics(driver) -> Dict:
+    """读取当前页面的加载耗时和传输字节数（Navigation/Resource Timing）"""
+    try:
+        return driver.execute_script(_PAGE_METRICS_SCRIPT) or {}
+    except Exception as e:
+        log.debug(f"读取页面加载指标失败: {e}")
+        return {}
+
+
+def list_profiles() -> List[str]:
+    """所有可用的配置名称"""
+    return list(RESOURCE_PROFILES.keys())
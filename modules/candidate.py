@@ -3,7 +3,7 @@
 """
 import time
 import json
-from typing import List, Dict, Optional
+from typing import List, Dict, Iterable, Iterator, Optional
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
@@ -12,15 +12,40 @@ from selenium.common.exceptions import TimeoutException, NoSuchElementException
 from bs4 import BeautifulSoup
 
 from config import settings
-from utils import log
+from utils import log, metrics, tracer
+from .page_loader import load_page, wait_for_any, find_all, command_timeout
+from .network_capture import NetworkCapture, JOB_HINT_KEYS, map_job_record
+from .search_api import ZhilianSearchClient
+from .code_index import CODE_INDEX
+from .candidate_filter import CandidateFilter, SearchFunnel
+
+
+CARDS_PARSED = metrics.counter('zhilian_cards_parsed_total', '职位卡片解析结果', ('result',))
+CARD_PARSE_SECONDS = metrics.histogram('zhilian_card_parse_seconds', '单个职位卡片解析耗时（秒）')
+
+# 读取卡片文本和第一个链接，一次调用可处理整页卡片；解析在Python中完成
+CARD_SNAPSHOT_SCRIPT = """
+return arguments[0].map(function (card) {
+    var link = card.querySelector('a');
+    return {
+        text: card.innerText || '',
+        has_link: !!link,
+        link_text: link ? (link.innerText || '') : '',
+        href: link ? (link.getAttribute('href') ? link.href : '') : ''
+    };
+});
+"""
 
 
 class CandidateManager:
     """候选人管理类"""
     
-    def __init__(self, driver):
+    def __init__(self, driver, network_capture: NetworkCapture = None, wait: WebDriverWait = None):
         self.driver = driver
-        self.wait = WebDriverWait(driver, settings.BROWSER_TIMEOUT)
+        self.wait = wait or WebDriverWait(driver, settings.BROWSER_TIMEOUT)
+        self.network_capture = network_capture or NetworkCapture(driver)
+        self.search_client = ZhilianSearchClient(driver, self.network_capture)
+        self.last_parse_stats: Dict = {}  # 最近一页卡片解析的统计（超时、失败、最慢耗时等）
     
     def search_candidates(self, 
                          keyword: str = "",
@@ -29,7 +54,9 @@ class CandidateManager:
                          education: str = "",
                          salary_range: str = "",
                          company_type: str = "",
-                         page_limit: int = 5) -> List[Dict]:
+                         page_limit: int = 5,
+                         target_count: int = None,
+                         candidate_filter: CandidateFilter = None) -> List[Dict]:
         """
         搜索候选人
         
@@ -41,25 +68,93 @@ class CandidateManager:
             salary_range: 薪资范围
             company_type: 公司类型
             page_limit: 搜索页数限制
+            target_count: 找到该数量的符合条件的候选人后提前结束
+            candidate_filter: 筛选条件（薪资下限、学历、经验）
             
         Returns:
             候选人列表
         """
+        with tracer.span('search_candidates', keyword=keyword, location=location, page_limit=page_limit) as span:
+            candidates = list(self.iter_candidates(
+                keyword=keyword,
+                location=location,
+                experience=experience,
+                education=education,
+                salary_range=salary_range,
+                company_type=company_type,
+                page_limit=page_limit,
+                target_count=target_count,
+                candidate_filter=candidate_filter
+            ))
+            span.set(count=len(candidates))
+        log.info(f"搜索完成，共找到 {len(candidates)} 个候选人")
+        return candidates
+    
+    def iter_candidates(self, 
+                        keyword: str = "",
+                        location: str = "",
+                        experience: str = "",
+                        education: str = "",
+                        salary_range: str = "",
+                        company_type: str = "",
+                        page_limit: int = 5,
+                        buffer_pages: bool = True,
+                        mode: str = None,
+                        target_count: int = None,
+                        candidate_filter: CandidateFilter = None) -> Iterator[Dict]:
+        """
+        逐个产出候选人（生成器版本的搜索）
+        
+        调用方可以边搜索边处理（打招呼、转发、落盘），提前停止迭代时后续页面不会再加载。
+        其余参数含义与 search_candidates 相同。
+        
+        Args:
+            buffer_pages: 先解析完整页再逐个产出。下游会操作同一个driver（如打招呼时跳转页面）
+                时必须为True，否则当前页剩余的卡片元素会失效；只做落盘/转发时可设为False，
+                每解析一张卡片就立即产出
+            mode: browser / api / auto，默认取 settings.SEARCH_MODE。api和auto模式直接请求搜索接口；
+                接口地址未知时先加载第一页，从抓到的请求中学习接口后其余页面改用接口
+            target_count: 符合条件的候选人达到该数量后立即停止解析和翻页
+            candidate_filter: 筛选条件，在解析每张卡片时判断，不符合的不计入目标数量
+        
+        Yields:
+            候选人信息字典
+        """
+        funnel = SearchFunnel(target_count, candidate_filter)
         try:
             log.info(f"开始搜索候选人，关键词: {keyword}")
+            mode = mode or settings.SEARCH_MODE
+            # 地区只解析一次，页面URL和接口参数共用同一个代码
+            location_code = self._get_location_code(location) if location else ''
+            api_filters = {
+                'location': location_code,
+                'keyword': keyword,
+                'experience': experience,
+                'education': education,
+                'salary_range': salary_range,
+                'company_type': company_type
+            }
+            
+            if mode != 'browser' and self.search_client.available:
+                parsed_before = funnel.parsed
+                yield from self._through_funnel(
+                    self.search_client.iter_search(page_limit=page_limit, **api_filters), funnel
+                )
+                if funnel.parsed > parsed_before:
+                    log.info(f"接口搜索完成，共找到 {funnel.matched} 个候选人")
+                    return
+                log.warning("搜索接口没有返回结果，改为加载搜索页面")
             
             # 构建搜索URL
             search_url = self._build_search_url(
                 keyword=keyword,
-                location=location,
+                location=location_code,
                 experience=experience,
                 education=education,
                 salary_range=salary_range,
                 company_type=company_type
             )
             
-            candidates = []
-            
             for page in range(1, page_limit + 1):
                 log.info(f"正在搜索第 {page} 页...")
                 
@@ -76,27 +171,68 @@ class CandidateManager:
                         page_url = f"{search_url}/p{page}"
                 
                 log.debug(f"访问URL: {page_url}")
-                self.driver.get(page_url)
-                time.sleep(settings.REQUEST_DELAY)
+                self.network_capture.clear()
+                load_page(self.driver, page_url, 'search')
+                with tracer.span('sleep', reason='after_page_load'):
+                    time.sleep(settings.REQUEST_DELAY)
+                
+                # 解析当前页面的候选人，凑够目标数量后当前页剩余的卡片不再解析
+                parsed_before = funnel.parsed
+                if buffer_pages:
+                    page_candidates = self._parse_candidate_list(funnel)
+                else:
+                    page_candidates = self._through_funnel(self._iter_candidate_list(), funnel)
                 
-                # 解析当前页面的候选人
-                page_candidates = self._parse_candidate_list()
-                if not page_candidates:
+                yield from page_candidates
+                
+                page_count = funnel.parsed - parsed_before
+                if not page_count:
                     log.info("没有更多候选人，停止搜索")
                     break
                 
-                candidates.extend(page_candidates)
-                log.info(f"第 {page} 页找到 {len(page_candidates)} 个候选人")
+                log.info(f"第 {page} 页找到 {page_count} 个候选人")
+                
+                if funnel.done:
+                    log.info(f"已找到 {funnel.matched} 个符合条件的候选人，停止翻页")
+                    break
+                
+                # 第一页加载后从抓包中学习搜索接口，其余页面改用接口请求
+                if page == 1 and page_limit > 1 and mode != 'browser' and self.search_client.learn_endpoint():
+                    parsed_before = funnel.parsed
+                    yield from self._through_funnel(
+                        self.search_client.iter_search(page_limit=page_limit, start_page=2, **api_filters), funnel
+                    )
+                    if funnel.parsed > parsed_before:
+                        return
+                    log.warning("搜索接口没有返回结果，继续加载搜索页面")
                 
                 # 避免请求过快
-                time.sleep(settings.REQUEST_DELAY)
-            
-            log.info(f"搜索完成，共找到 {len(candidates)} 个候选人")
-            return candidates
+                with tracer.span('sleep', reason='between_pages'):
+                    time.sleep(settings.REQUEST_DELAY)
             
         except Exception as e:
             log.error(f"搜索候选人失败: {e}")
-            return []
+        finally:
+            if candidate_filter is not None or target_count is not None:
+                log.info(f"搜索漏斗: {funnel.summary()}")
+    
+    @staticmethod
+    def _through_funnel(candidates: Iterable[Dict], funnel: SearchFunnel) -> Iterator[Dict]:
+        """按漏斗筛选候选人流，达到目标数量后停止消费上游（不再解析卡片或请求下一页）"""
+        for candidate in candidates:
+            if funnel.accept(candidate):
+                yield candidate
+            if funnel.done:
+                return
+    
+    def _get_location_code(self, location: str) -> str:
+        """地区名称转换为智联招聘地区代码，无法识别时使用全国代码并给出警告"""
+        code = CODE_INDEX.location_code(location)
+        if code is None:
+            code = CODE_INDEX.nationwide_code
+            log.warning(f"未识别的地区: {location}，将搜索全国结果（{code}）。"
+                        f"可在 CODE_INDEX_FILE 中补充该地区代码，或直接传入地区代码")
+        return code
     
     def _build_search_url(self, **kwargs) -> str:
         """构建搜索URL - 基于智联招聘实际URL格式"""
@@ -104,90 +240,20 @@ class CandidateManager:
             # 智联招聘的搜索URL格式: https://www.zhaopin.com/sou/jl{地区代码}/kw{关键词编码}/p{页码}
             base_url = settings.ZHILIAN_SEARCH_URL
             
-            # 地区代码映射（部分常用城市）
-            location_codes = {
-                '北京': '530',
-                '上海': '538', 
-                '广州': '763',
-                '深圳': '765',
-                '杭州': '653',
-                '南京': '635',
-                '武汉': '736',
-                '成都': '801',
-                '西安': '854',
-                '重庆': '551',
-                '天津': '531',
-                '苏州': '636',
-                '郑州': '719',
-                '长沙': '749',
-                '东莞': '780',
-                '青岛': '702',
-                '沈阳': '565',
-                '宁波': '681',
-                '昆明': '831'
-            }
-            
             # 构建URL路径
             url_parts = []
             
             # 添加地区代码
             location = kwargs.get('location', '')
             if location:
-                location_code = location_codes.get(location, '489')  # 默认使用489（全国）
+                location_code = self._get_location_code(location)
                 url_parts.append(f"jl{location_code}")
             
             # 添加关键词（智联招聘使用特殊编码）
             keyword = kwargs.get('keyword', '')
             if keyword:
-                # 智联招聘关键词编码映射
-                keyword_codes = {
-                    'Java开发': '01500O80EO062NO0AF8G',
-                    'java开发': '01500O80EO062NO0AF8G', 
-                    'Java': '01500O80EO062NO0AF8G',
-                    'java': '01500O80EO062NO0AF8G',
-                    'Java开发工程师': '01500O80EO062NO0AF8G',
-                    'java开发工程师': '01500O80EO062NO0AF8G',
-                    'Python开发': '01500O80EO062',
-                    'python开发': '01500O80EO062',
-                    'Python': '01500O80EO062',
-                    'python': '01500O80EO062',
-                    'Python开发工程师': '01500O80EO062',
-                    'python开发工程师': '01500O80EO062',
-                    '前端开发': '01500O80EO062NO0AF8',
-                    '前端': '01500O80EO062NO0AF8',
-                    '前端工程师': '01500O80EO062NO0AF8',
-                    'JavaScript': '01500O80EO062NO0AF8',
-                    'Vue': '01500O80EO062NO0AF8',
-                    'React': '01500O80EO062NO0AF8',
-                    '后端开发': '01500O80EO062NO0AF8G',
-                    '后端': '01500O80EO062NO0AF8G',
-                    '后端工程师': '01500O80EO062NO0AF8G',
-                    '全栈开发': '01500O80EO062',
-                    '全栈': '01500O80EO062',
-                    '软件开发': '01500O80EO062',
-                    '软件工程师': '01500O80EO062',
-                    'PHP开发': '01500O80EO062NO0AF8',
-                    'PHP': '01500O80EO062NO0AF8',
-                    'C++': '01500O80EO062NO0AF8',
-                    'C#': '01500O80EO062NO0AF8',
-                    '.NET': '01500O80EO062NO0AF8',
-                    'Go开发': '01500O80EO062',
-                    'Go': '01500O80EO062',
-                    'Node.js': '01500O80EO062NO0AF8',
-                    '数据库': '01500O80EO062NO0AF8',
-                    'MySQL': '01500O80EO062NO0AF8',
-                    'Redis': '01500O80EO062NO0AF8',
-                    '运维': '01500O80EO062NO0AF8',
-                    'DevOps': '01500O80EO062NO0AF8',
-                    '测试': '01500O80EO062NO0AF8',
-                    '测试工程师': '01500O80EO062NO0AF8',
-                    '产品经理': '01500O80EO062NO0AF8',
-                    'UI设计': '01500O80EO062NO0AF8',
-                    'UE设计': '01500O80EO062NO0AF8'
-                }
-                
                 # 查找关键词编码
-                keyword_code = keyword_codes.get(keyword)
+                keyword_code = CODE_INDEX.keyword_code(keyword)
                 if keyword_code:
                     url_parts.append(f"kw{keyword_code}")
                     log.debug(f"使用关键词编码: {keyword} -> {keyword_code}")
@@ -230,13 +296,22 @@ class CandidateManager:
             # 返回默认搜索URL
             return f"{settings.ZHILIAN_SEARCH_URL}/jl489?srccode=401801"
     
-    def _parse_candidate_list(self) -> List[Dict]:
+    def _parse_candidate_list(self, funnel: SearchFunnel = None) -> List[Dict]:
         """解析候选人列表页面 - 适配智联招聘实际页面结构"""
+        with tracer.span('parse_candidate_list') as span:
+            if funnel is None:
+                candidates = list(self._iter_candidate_list())
+            else:
+                candidates = list(self._through_funnel(self._iter_candidate_list(), funnel))
+            span.set(count=len(candidates))
+            return candidates
+    
+    def _iter_candidate_list(self) -> Iterator[Dict]:
+        """逐个解析并产出当前页面的职位卡片"""
         try:
-            candidates = []
+            success_count = 0
             
-            # 等待页面加载，尝试多种可能的选择器
-            page_loaded = False
+            # 等待页面加载：所有候选选择器共享一个超时，任意一个出现即可
             selectors_to_try = [
                 (By.CLASS_NAME, "joblist-box"),
                 (By.CLASS_NAME, "positionlist"),
@@ -246,20 +321,20 @@ class CandidateManager:
                 (By.XPATH, "//div[contains(@class, 'job') or contains(@class, 'position')]")
             ]
             
-            for selector_type, selector_value in selectors_to_try:
-                try:
-                    self.wait.until(EC.presence_of_element_located((selector_type, selector_value)))
-                    page_loaded = True
-                    log.debug(f"页面加载成功，使用选择器: {selector_value}")
-                    break
-                except TimeoutException:
-                    continue
-            
-            if not page_loaded:
+            if wait_for_any(self.driver, selectors_to_try, timeout=settings.PAGE_READY_TIMEOUT) is not None:
+                log.debug("页面加载成功")
+            else:
                 log.warning("页面加载超时，尝试直接解析")
             
+            # 优先使用页面自身请求的搜索接口JSON，页面渲染完成时响应已经到达，不额外等待
+            captured = self._candidates_from_capture()
+            if captured:
+                CARDS_PARSED.inc(len(captured), result='capture')
+                log.info(f"从搜索接口响应中解析到 {len(captured)} 个职位")
+                yield from captured
+                return
+            
             # 获取职位卡片，尝试多种选择器
-            candidate_cards = []
             card_selectors = [
                 ".jobinfo",
                 ".position-item", 
@@ -271,15 +346,7 @@ class CandidateManager:
                 "div[class*='position']"
             ]
             
-            for selector in card_selectors:
-                try:
-                    cards = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                    if cards:
-                        candidate_cards = cards
-                        log.debug(f"找到 {len(cards)} 个职位卡片，使用选择器: {selector}")
-                        break
-                except:
-                    continue
+            candidate_cards = find_all(self.driver, card_selectors)
             
             if not candidate_cards:
                 log.warning("未找到职位卡片，尝试通用解析")
@@ -290,95 +357,118 @@ class CandidateManager:
             
             # 限制处理的卡片数量，避免卡死
             max_cards = min(len(candidate_cards), 50)  # 最多处理50个
-            
-            for i, card in enumerate(candidate_cards[:max_cards]):
-                try:
-                    log.debug(f"正在解析第 {i+1}/{max_cards} 个职位...")
-                    
-                    # 添加超时机制 - Windows兼容版本
-                    import threading
-                    import time
-                    
-                    candidate_info = None
-                    extraction_complete = threading.Event()
-                    
-                    def extract_with_timeout():
-                        nonlocal candidate_info
-                        try:
-                            candidate_info = self._extract_candidate_basic_info(card)
-                        except Exception as e:
-                            log.debug(f"提取过程中出错: {e}")
-                        finally:
-                            extraction_complete.set()
-                    
-                    # 启动提取线程
-                    extract_thread = threading.Thread(target=extract_with_timeout)
-                    extract_thread.daemon = True
-                    extract_thread.start()
-                    
-                    # 等待最多3秒
-                    if extraction_complete.wait(timeout=3):
-                        if candidate_info:
-                            candidates.append(candidate_info)
-                            log.info(f"✓ 成功解析第 {i+1} 个职位: {candidate_info.get('name', '未知')}")
+            cards = candidate_cards[:max_cards]
+            
+            # 一次脚本调用读取全部卡片，失败时（如卡片已失效）逐张读取
+            snapshots = self._snapshot_cards(cards)
+            stats = {'mode': 'snapshot' if snapshots is not None else 'per_card', 'cards': max_cards,
+                     'ok': 0, 'empty': 0, 'timeout': 0, 'error': 0, 'skipped': 0, 'slowest_ms': 0.0}
+            self.last_parse_stats = stats
+            deadline = settings.CARD_PARSE_TIMEOUT
+            
+            for i, card in enumerate(cards):
+                # 多张卡片超时说明页面或浏览器已卡住，放弃剩余卡片
+                if stats['timeout'] >= settings.MAX_STUCK_CARDS:
+                    stats['skipped'] = max_cards - i
+                    log.warning(f"已有 {stats['timeout']} 个职位卡片超时，跳过剩余 {stats['skipped']} 个")
+                    break
+                
+                log.debug("正在解析第 {}/{} 个职位...", i + 1, max_cards)
+                card_started = time.perf_counter()
+                candidate_info = None
+                with tracer.span('extract_card', index=i + 1) as span:
+                    try:
+                        if snapshots is not None:
+                            candidate_info = self._parse_card_snapshot(snapshots[i])
                         else:
-                            log.debug(f"第 {i+1} 个职位信息为空，跳过")
-                    else:
-                        log.warning(f"解析第 {i+1} 个职位信息超时，跳过")
-                        continue
-                        
-                except TimeoutError:
+                            # 每张卡片只发一条命令，命令超时即为该卡片的截止时间
+                            with command_timeout(self.driver, deadline):
+                                snapshot = self.driver.execute_script(CARD_SNAPSHOT_SCRIPT, [card])
+                            candidate_info = self._parse_card_snapshot(snapshot[0])
+                        result = 'ok' if candidate_info else 'empty'
+                    except Exception as e:
+                        # 命令超时抛出的是HTTP客户端的异常，按耗时区分超时和其他错误
+                        if time.perf_counter() - card_started >= deadline:
+                            result = 'timeout'
+                        else:
+                            result = 'error'
+                            log.warning(f"解析第 {i+1} 个职位信息失败: {e}")
+                    span.set(result=result)
+                
+                elapsed = time.perf_counter() - card_started
+                stats[result] += 1
+                stats['slowest_ms'] = max(stats['slowest_ms'], round(elapsed * 1000, 1))
+                CARD_PARSE_SECONDS.observe(elapsed)
+                CARDS_PARSED.inc(result=result)
+                
+                if result == 'ok':
+                    success_count += 1
+                    log.debug("✓ 成功解析第 {} 个职位: {}", i + 1, candidate_info.get('name', '未知'))
+                    yield candidate_info
+                elif result == 'empty':
+                    log.debug("第 {} 个职位信息为空，跳过", i + 1)
+                elif result == 'timeout':
                     log.warning(f"解析第 {i+1} 个职位信息超时，跳过")
-                    continue
-                except Exception as e:
-                    log.warning(f"解析第 {i+1} 个职位信息失败: {e}")
-                    continue
                 
                 # 每解析5个职位就输出一次进度
                 if (i + 1) % 5 == 0:
-                    log.info(f"已解析 {i+1}/{max_cards} 个职位，成功 {len(candidates)} 个")
+                    log.info(f"已解析 {i+1}/{max_cards} 个职位，成功 {success_count} 个")
             
-            log.info(f"解析完成！总共处理 {max_cards} 个职位卡片，成功解析 {len(candidates)} 个职位信息")
-            return candidates
+            log.info(f"解析完成！总共处理 {max_cards} 个职位卡片，成功解析 {success_count} 个职位信息"
+                     f"（{stats['mode']}，超时 {stats['timeout']} 个，失败 {stats['error']} 个，"
+                     f"跳过 {stats['skipped']} 个，最慢 {stats['slowest_ms']:.0f}ms）")
             
         except Exception as e:
             log.error(f"解析候选人列表失败: {e}")
+    
+    def _candidates_from_capture(self) -> List[Dict]:
+        """从捕获的搜索接口响应中构建候选人列表，没有可用响应时返回空列表"""
+        try:
+            records = self.network_capture.wait_for_records(
+                settings.CAPTURE_SEARCH_PATTERNS, JOB_HINT_KEYS, timeout=0
+            )
+            candidates = []
+            for record in records:
+                candidate = map_job_record(record)
+                if candidate:
+                    candidates.append(candidate)
+            return candidates
+        except Exception as e:
+            log.debug(f"从接口响应解析候选人失败，使用页面解析: {e}")
+            return []
+    
+    def _snapshot_cards(self, cards: List) -> Optional[List[Dict]]:
+        """用一次脚本调用读取卡片的文本和第一个链接，失败时返回None"""
+        if not cards:
             return []
+        try:
+            with tracer.span('snapshot_cards', count=len(cards)), \
+                    command_timeout(self.driver, settings.PAGE_READY_TIMEOUT):
+                snapshots = self.driver.execute_script(CARD_SNAPSHOT_SCRIPT, cards)
+            if isinstance(snapshots, list) and len(snapshots) == len(cards):
+                return snapshots
+            log.debug("卡片快照数量不符，改为逐张读取")
+        except Exception as e:
+            log.debug("读取卡片快照失败，改为逐张读取: {}", e)
+        return None
     
-    def _extract_candidate_basic_info(self, card_element) -> Optional[Dict]:
-        """从职位卡片提取基本信息 - 简化版本，避免卡死"""
+    def _parse_card_snapshot(self, snapshot: Dict) -> Optional[Dict]:
+        """从卡片快照（文本和第一个链接）解析职位基本信息，不访问浏览器"""
         try:
             candidate = {}
             
-            # 获取卡片的所有文本内容，用于快速解析
-            try:
-                card_text = card_element.text.strip()
-                if not card_text:
-                    return None
-            except:
+            card_text = (snapshot.get('text') or '').strip()
+            if not card_text:
                 return None
             
-            # 职位名称和链接 - 简化查找
-            try:
-                # 优先查找链接
-                link_element = None
-                try:
-                    link_element = card_element.find_element(By.TAG_NAME, "a")
-                except:
-                    pass
-                
-                if link_element:
-                    candidate['name'] = link_element.text.strip()
-                    candidate['profile_url'] = link_element.get_attribute("href") or ""
-                else:
-                    # 从文本中提取第一行作为职位名称
-                    lines = card_text.split('\n')
-                    candidate['name'] = lines[0].strip() if lines else "未知职位"
-                    candidate['profile_url'] = ""
-                    
-            except Exception as e:
-                log.debug(f"提取职位名称失败: {e}")
-                candidate['name'] = "未知职位"
+            # 职位名称和链接：优先取卡片中的第一个链接
+            if snapshot.get('has_link'):
+                candidate['name'] = (snapshot.get('link_text') or '').strip()
+                candidate['profile_url'] = snapshot.get('href') or ""
+            else:
+                # 从文本中提取第一行作为职位名称
+                lines = card_text.split('\n')
+                candidate['name'] = lines[0].strip() if lines else "未知职位"
                 candidate['profile_url'] = ""
             
             # 使用正则表达式从文本中快速提取信息
@@ -436,7 +526,7 @@ class CandidateManager:
             
             # 验证是否提取到有效信息
             if candidate.get('name') and candidate['name'] != "未知职位":
-                log.debug(f"成功提取职位信息: {candidate['name']} - {candidate['company']}")
+                log.debug("成功提取职位信息: {} - {}", candidate['name'], candidate['company'])
                 return candidate
             else:
                 log.debug("未提取到有效职位信息")
@@ -458,38 +548,21 @@ class CandidateManager:
             
             # 访问候选人详情页
             try:
-                self.driver.get(profile_url)
+                load_page(self.driver, profile_url, 'detail')
                 time.sleep(settings.REQUEST_DELAY * 2)  # 增加等待时间
             except Exception as e:
                 log.error(f"访问职位详情页失败: {e}")
                 return None
             
-            # 检查页面是否正常加载
-            try:
-                # 等待页面加载，尝试多种可能的元素
-                page_loaded = False
-                wait_selectors = [
-                    (By.CLASS_NAME, "resume-info"),
-                    (By.CLASS_NAME, "job-detail"),
-                    (By.CLASS_NAME, "position-detail"),
-                    (By.TAG_NAME, "body"),
-                    (By.XPATH, "//div[contains(@class, 'detail') or contains(@class, 'info')]")
-                ]
-                
-                for selector_type, selector_value in wait_selectors:
-                    try:
-                        self.wait.until(EC.presence_of_element_located((selector_type, selector_value)))
-                        page_loaded = True
-                        log.debug(f"页面加载成功，检测到元素: {selector_value}")
-                        break
-                    except:
-                        continue
-                
-                if not page_loaded:
-                    log.warning("页面加载超时，尝试直接解析")
-                
-            except Exception as e:
-                log.warning(f"等待页面加载失败: {e}")
+            # 检查页面是否正常加载：任意一个关键元素出现即可
+            wait_selectors = [
+                (By.CLASS_NAME, "resume-info"),
+                (By.CLASS_NAME, "job-detail"),
+                (By.CLASS_NAME, "position-detail"),
+                (By.XPATH, "//div[contains(@class, 'detail') or contains(@class, 'info')]")
+            ]
+            if wait_for_any(self.driver, wait_selectors, timeout=settings.PAGE_READY_TIMEOUT) is None:
+                log.warning("页面加载超时，尝试直接解析")
             
             # 检查是否是有效的职位详情页
             current_url = self.driver.current_url
@@ -518,6 +591,8 @@ class CandidateManager:
             try:
                 page_text = self.driver.find_element(By.TAG_NAME, "body").text
                 detail_info['page_content_length'] = len(page_text)
+                # 保留页面正文供本地全文索引使用
+                detail_info['description'] = page_text[:settings.DETAIL_TEXT_LIMIT]
                 
                 # 如果页面内容太少，可能是加载失败
                 if len(page_text) < 100:
@@ -735,6 +810,52 @@ class CandidateManager:
         except Exception as e:
             log.error(f"保存候选人信息失败: {e}")
     
+    def stream_candidates_to_jsonl(self, candidates: Iterable[Dict], filename: str = "candidates.jsonl") -> Iterator[Dict]:
+        """
+        将候选人逐条追加写入JSONL文件，并原样产出
+        
+        每写入一条就flush一次，程序中途崩溃时已解析的结果不会丢失；
+        作为管道中间环节使用，下游（打招呼、转发）可以同时消费同一个流。
+        """
+        count = 0
+        try:
+            with open(filename, 'a', encoding='utf-8') as f:
+                for candidate in candidates:
+                    f.write(json.dumps(candidate, ensure_ascii=False))
+                    f.write('\n')
+                    f.flush()
+                    count += 1
+                    yield candidate
+        except Exception as e:
+            log.error(f"写入JSONL失败: {e}")
+        finally:
+            log.info(f"已向 {filename} 追加 {count} 个候选人")
+    
+    def save_candidates_to_jsonl(self, candidates: Iterable[Dict], filename: str = "candidates.jsonl") -> int:
+        """保存候选人信息到JSONL文件（追加写入），返回写入数量"""
+        count = 0
+        for _ in self.stream_candidates_to_jsonl(candidates, filename):
+            count += 1
+        return count
+    
+    def load_candidates_from_jsonl(self, filename: str = "candidates.jsonl") -> List[Dict]:
+        """从JSONL文件加载候选人信息，跳过崩溃时写了一半的末行"""
+        candidates = []
+        try:
+            with open(filename, 'r', encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        candidates.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        log.warning(f"跳过无法解析的行: {line[:50]}")
+            log.info(f"从 {filename} 加载了 {len(candidates)} 个候选人信息")
+        except Exception as e:
+            log.error(f"加载候选人信息失败: {e}")
+        return candidates
+    
     def load_candidates_from_file(self, filename: str = "candidates.json") -> List[Dict]:
         """从文件加载候选人信息"""
         try:
@@ -0,0 +1,157 @@
+"""
+候选人筛选模块 - 解析卡片时即时判断薪资/学历/经验条件，凑够目标数量后提前结束搜索
+"""
+from typing import Dict, Iterable, Optional
+
+from utils import log
+from .normalizer import education_level, normalize_candidate
+
+
+class CandidateFilter:
+    """候选人筛选条件
+
+    Args:
+        salary_min: 月薪下限（元），薪资上限低于该值的淘汰
+        education_levels: 可接受的学历（如 ["大专", "本科"]），"学历不限"总是通过
+        experience_min: 经验年限下限
+        experience_max: 经验年限上限，与候选人的经验区间有交集即通过
+        keep_unknown: 字段无法解析（如"面议"）时是否保留
+    """
+
+    def __init__(self,
+                 salary_min: float = None,
+                 education_levels: Iterable[str] = None,
+                 experience_min: float = None,
+                 experience_max: float = None,
+                 keep_unknown: bool = True):
+        self.salary_min = salary_min
+        self.education_levels = None
+        if education_levels:
+            self.education_levels = {education_level(name) for name in education_levels} - {None}
+        self.experience_min = experience_min
+        self.experience_max = experience_max
+        self.keep_unknown = keep_unknown
+
+    @classmethod
+    def from_params(cls, params: Dict) -> Optional['CandidateFilter']:
+        """从搜索参数中读取筛选条件，没有任何条件时返回None"""
+        keys = ('salary_min', 'education_levels', 'experience_min', 'experience_max')
+        if not any(params.get(key) not in (None, '', []) for key in keys):
+            return None
+        return cls(
+            salary_min=params.get('salary_min'),
+            education_levels=params.get('education_levels'),
+            experience_min=params.get('experience_min'),
+            experience_max=params.get('experience_max'),
+            keep_unknown=params.get('keep_unknown', True)
+        )
+
+    def reject_reason(self, candidate: Dict) -> Optional[str]:
+        """返回淘汰原因（salary/education/experience），通过时返回None"""
+        normalize_candidate(candidate)
+
+        if self.salary_min is not None:
+            high = candidate['salary_max']
+            if high is None and candidate['salary_min'] is not None:
+                high = float('inf')  # "1万以上"：不设上限
+            if high is None:
+                if not self.keep_unknown:
+                    return 'salary'
+            elif high < self.salary_min:
+                return 'salary'
+
+        if self.education_levels:
+            level = candidate['education_level']
+            if level is None:
+                if not self.keep_unknown:
+                    return 'education'
+            elif level != 0 and level not in self.education_levels:
+                return 'education'
+
+        if self.experience_min is not None or self.experience_max is not None:
+            low, high = candidate['experience_min'], candidate['experience_max']
+            if low is None:
+                if not self.keep_unknown:
+                    return 'experience'
+            else:
+                if self.experience_max is not None and low > self.experience_max:
+                    return 'experience'
+                if self.experience_min is not None and high is not None and high < self.experience_min:
+                    return 'experience'
+
+        return None
+
+    def matches(self, candidate: Dict) -> bool:
+        return self.reject_reason(candidate) is None
+
+    def mask(self, table):
+        """
+        在 CandidateTable 上一次性计算全部候选人是否通过（向量化版本的 reject_reason）
+
+        Returns:
+            与表行数等长的布尔数组
+        """
+        import numpy as np
+
+        keep = np.ones(len(table), dtype=bool)
+        if self.salary_min is not None:
+            high = table.salary_max
+            known = ~np.isnan(high)
+            keep &= np.where(known, high >= self.salary_min, self.keep_unknown)
+
+        if self.education_levels:
+            level = table.education_level
+            known = level >= 0
+            allowed = np.isin(level, list(self.education_levels | {0}))
+            keep &= np.where(known, allowed, self.keep_unknown)
+
+        if self.experience_min is not None or self.experience_max is not None:
+            low = table.experience_min
+            high = table.experience_max  # 不设上限时为inf
+            known = ~np.isnan(low)
+            fits = np.ones(len(table), dtype=bool)
+            if self.experience_max is not None:
+                fits &= low <= self.experience_max
+            if self.experience_min is not None:
+                fits &= high >= self.experience_min
+            keep &= np.where(known, fits, self.keep_unknown)
+
+        return keep
+
+
+class SearchFunnel:
+    """搜索漏斗：统计解析/通过/淘汰数量，通过数达到目标后 done 为True"""
+
+    def __init__(self, target_count: int = None, candidate_filter: CandidateFilter = None):
+        self.target_count = target_count
+        self.candidate_filter = candidate_filter
+        self.parsed = 0
+        self.matched = 0
+        self.rejected: Dict[str, int] = {}
+
+    @property
+    def done(self) -> bool:
+        return self.target_count is not None and self.matched >= self.target_count
+
+    def accept(self, candidate: Dict) -> bool:
+        """判断候选人是否进入结果；达到目标数量后不再接收"""
+        if self.done:
+            return False
+        self.parsed += 1
+        normalize_candidate(candidate)
+        if self.candidate_filter is not None:
+            reason = self.candidate_filter.reject_reason(candidate)
+            if reason:
+                self.rejected[reason] = self.rejected.get(reason, 0) + 1
+                log.debug(f"候选人 {candidate.get('name', '未知')} 不符合{reason}条件，跳过")
+                return False
+        self.matched += 1
+        return True
+
+    def summary(self) -> Dict:
+        return {
+            'parsed': self.parsed,
+            'matched': self.matched,
+            'rejected': dict(self.rejected),
+            'target_count': self.target_count
+        }
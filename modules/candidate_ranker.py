@@ -0,0 +1,133 @@
+"""
+候选人相关度排序 - BM25文本相关度加薪资/经验匹配度，批量向量化计算，优先给最匹配的候选人打招呼
+"""
+from collections import Counter
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+from utils import log
+from .normalizer import normalize_candidate, parse_experience, tokenize
+
+
+class CandidateRanker:
+    """候选人排序器
+
+    score = text * BM25(关键词/技能 vs 职位名、公司、技能标签，按批内最高分归一化)
+          + salary * 薪资匹配度 + experience * 经验匹配度
+    无法解析的数值字段记0.5分，不奖励也不惩罚。
+    """
+
+    DEFAULT_WEIGHTS = {'text': 0.6, 'salary': 0.2, 'experience': 0.2}
+
+    # 各字段在文本中的重复次数（职位名权重最高）
+    FIELD_BOOSTS = (('name', 2), ('skills', 1), ('company', 1))
+
+    def __init__(self, search_params: Dict, weights: Dict[str, float] = None, k1: float = 1.5, b: float = 0.75):
+        self.weights = dict(self.DEFAULT_WEIGHTS)
+        if weights:
+            self.weights.update(weights)
+        self.k1 = k1
+        self.b = b
+
+        query_text = search_params.get('keyword', '')
+        skills = search_params.get('skills') or []
+        if isinstance(skills, str):
+            skills = [skills]
+        self.query_terms = list(dict.fromkeys(tokenize(" ".join([query_text] + list(skills)))))
+
+        self.salary_target = search_params.get('salary_min')
+        self.experience_range = (search_params.get('experience_min'), search_params.get('experience_max'))
+        if self.experience_range == (None, None) and search_params.get('experience'):
+            self.experience_range = parse_experience(search_params['experience'])
+
+    def _document_tokens(self, candidate: Dict) -> List[str]:
+        tokens = []
+        for field, boost in self.FIELD_BOOSTS:
+            value = candidate.get(field)
+            if isinstance(value, (list, tuple)):
+                value = " ".join(str(item) for item in value)
+            tokens.extend(tokenize(value) * boost)
+        return tokens
+
+    def text_scores(self, candidates: Sequence[Dict]) -> np.ndarray:
+        """BM25得分（未归一化）"""
+        n = len(candidates)
+        if not n or not self.query_terms:
+            return np.zeros(n)
+
+        term_index = {term: j for j, term in enumerate(self.query_terms)}
+        tf = np.zeros((n, len(self.query_terms)))
+        lengths = np.zeros(n)
+        for i, candidate in enumerate(candidates):
+            tokens = self._document_tokens(candidate)
+            lengths[i] = len(tokens)
+            for term, count in Counter(tokens).items():
+                j = term_index.get(term)
+                if j is not None:
+                    tf[i, j] = count
+
+        df = (tf > 0).sum(axis=0)
+        idf = np.log(1 + (n - df + 0.5) / (df + 0.5))
+        avg_length = lengths.mean() or 1.0
+        norm = self.k1 * (1 - self.b + self.b * lengths / avg_length)
+        return ((tf * (self.k1 + 1)) / (tf + norm[:, None]) * idf).sum(axis=1)
+
+    def salary_fit(self, salary_max: np.ndarray) -> np.ndarray:
+        """薪资上限达到期望月薪记1分，低于期望时按比例"""
+        if not self.salary_target:
+            return np.full(salary_max.shape, 0.5)
+        fit = np.clip(salary_max / float(self.salary_target), 0, 1)
+        return np.where(np.isnan(salary_max), 0.5, fit)
+
+    def experience_fit(self, low: np.ndarray, high: np.ndarray) -> np.ndarray:
+        """经验区间与期望区间有交集记1分，否则按相差年数衰减"""
+        want_low, want_high = self.experience_range
+        if want_low is None and want_high is None:
+            return np.full(low.shape, 0.5)
+        want_low = 0.0 if want_low is None else float(want_low)
+        want_high = np.inf if want_high is None else float(want_high)
+        high = np.where(np.isnan(high), np.inf, high)
+        gap = np.maximum(low - want_high, 0) + np.maximum(want_low - high, 0)
+        fit = np.exp(-gap / 2.0)
+        return np.where(np.isnan(low), 0.5, fit)
+
+    def scores(self, candidates: Sequence[Dict]) -> np.ndarray:
+        """批量计算综合得分"""
+        for candidate in candidates:
+            normalize_candidate(candidate)
+
+        def column(field):
+            return np.array([np.nan if c.get(field) is None else c[field] for c in candidates], dtype=np.float64)
+
+        text = self.text_scores(candidates)
+        if text.size and text.max() > 0:
+            text = text / text.max()
+
+        # "X万以上" 的薪资上限视为无穷大
+        salary_max = column('salary_max')
+        salary_max[~np.isnan(column('salary_min')) & np.isnan(salary_max)] = np.inf
+
+        return (self.weights['text'] * text
+                + self.weights['salary'] * self.salary_fit(salary_max)
+                + self.weights['experience'] * self.experience_fit(column('experience_min'), column('experience_max')))
+
+    def rank(self, candidates: Sequence[Dict], top_k: int = None) -> List[Dict]:
+        """按得分降序排列（同分保持原顺序），得分写入候选人的 score 字段"""
+        candidates = list(candidates)
+        if not candidates:
+            return []
+
+        scores = self.scores(candidates)
+        order = np.argsort(-scores, kind='stable')
+        if top_k is not None:
+            order = order[:top_k]
+
+        ranked = []
+        for i in order:
+            candidates[i]['score'] = round(float(scores[i]), 4)
+            ranked.append(candidates[i])
+
+        log.info(f"候选人排序完成: {len(candidates)} 个中选出 {len(ranked)} 个，"
+                 f"最高分 {ranked[0]['score']}，最低分 {ranked[-1]['score']}")
+        return ranked
@@ -0,0 +1,135 @@
+"""
+候选人列式表 - 把规范化后的数值字段存为NumPy数组，对大量已保存候选人做向量化筛选和排序
+"""
+import json
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from utils import log
+from .normalizer import normalize_candidate
+from .candidate_filter import CandidateFilter
+
+
+class CandidateTable:
+    """候选人列式表
+
+    每个数值字段一列：salary_min/salary_max/experience_min 未知时为NaN，
+    experience_max 不设上限时为inf、未知时为NaN，education_level 未知时为-1。
+    原始字典保存在 records 中，查询结果按行号取回。
+    """
+
+    SORT_COLUMNS = ('salary_min', 'salary_max', 'experience_min', 'experience_max', 'education_level')
+
+    def __init__(self, candidates: Iterable[Dict] = ()):
+        self.records: List[Dict] = [normalize_candidate(candidate) for candidate in candidates]
+        self._build_columns()
+
+    def _build_columns(self):
+        def column(field, none_value=np.nan):
+            return np.array(
+                [none_value if record.get(field) is None else record[field] for record in self.records],
+                dtype=np.float64
+            )
+
+        self.salary_min = column('salary_min')
+        # 薪资下限已知而上限为None表示"X万以上"，同样视为不设上限
+        self.salary_max = column('salary_max')
+        self.salary_max[~np.isnan(self.salary_min) & np.isnan(self.salary_max)] = np.inf
+        self.experience_min = column('experience_min')
+        # 经验下限已知而上限为None表示"X年以上"，视为不设上限
+        self.experience_max = column('experience_max')
+        open_ended = ~np.isnan(self.experience_min) & np.isnan(self.experience_max)
+        self.experience_max[open_ended] = np.inf
+        self.education_level = column('education_level', -1).astype(np.int8)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def extend(self, candidates: Iterable[Dict]):
+        """追加候选人并重建列"""
+        self.records.extend(normalize_candidate(candidate) for candidate in candidates)
+        self._build_columns()
+
+    @classmethod
+    def from_jsonl(cls, filename: str) -> 'CandidateTable':
+        """从 save_candidates_to_jsonl 写出的文件加载"""
+        candidates = []
+        try:
+            with open(filename, 'r', encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if line:
+                        try:
+                            candidates.append(json.loads(line))
+                        except ValueError:
+                            continue
+        except Exception as e:
+            log.error(f"加载候选人文件失败: {e}")
+        return cls(candidates)
+
+    @classmethod
+    def from_json(cls, filename: str) -> 'CandidateTable':
+        """从 save_candidates_to_file 写出的文件加载"""
+        try:
+            with open(filename, 'r', encoding='utf-8') as f:
+                return cls(json.load(f))
+        except Exception as e:
+            log.error(f"加载候选人文件失败: {e}")
+            return cls()
+
+    def query(self,
+              candidate_filter: CandidateFilter = None,
+              sort_by: str = None,
+              descending: bool = True,
+              limit: int = None) -> List[Dict]:
+        """
+        筛选并排序
+
+        Args:
+            candidate_filter: 筛选条件，为None时不筛选
+            sort_by: 排序列（SORT_COLUMNS之一），未知值排在最后
+            descending: 是否降序
+            limit: 最多返回条数
+
+        Returns:
+            候选人字典列表
+        """
+        indices = self.query_indices(candidate_filter, sort_by, descending, limit)
+        return [self.records[i] for i in indices]
+
+    def query_indices(self,
+                      candidate_filter: CandidateFilter = None,
+                      sort_by: str = None,
+                      descending: bool = True,
+                      limit: int = None) -> np.ndarray:
+        """与 query 相同，返回行号数组"""
+        if candidate_filter is not None:
+            indices = np.flatnonzero(candidate_filter.mask(self))
+        else:
+            indices = np.arange(len(self))
+
+        if sort_by:
+            if sort_by not in self.SORT_COLUMNS:
+                raise ValueError(f"不支持的排序列: {sort_by}")
+            values = getattr(self, sort_by)[indices].astype(np.float64)
+            unknown = np.isnan(values) | (values < 0 if sort_by == 'education_level' else False)
+            keys = np.where(unknown, -np.inf if descending else np.inf, values)
+            order = np.argsort(-keys if descending else keys, kind='stable')
+            indices = indices[order]
+
+        if limit is not None:
+            indices = indices[:limit]
+        return indices
+
+    def stats(self, candidate_filter: Optional[CandidateFilter] = None) -> Dict:
+        """薪资和经验的分布概况"""
+        mask = candidate_filter.mask(self) if candidate_filter is not None else np.ones(len(self), dtype=bool)
+        salary = self.salary_max[mask]
+        salary = salary[np.isfinite(salary)]
+        return {
+            'count': int(mask.sum()),
+            'salary_known': int(salary.size),
+            'salary_max_median': float(np.median(salary)) if salary.size else None,
+            'salary_max_p90': float(np.percentile(salary, 90)) if salary.size else None
+        }
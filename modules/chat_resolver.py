@@ -0,0 +1,146 @@
+"""
+聊天ID解析模块 - 将职位/候选人URL映射到聊天会话ID并缓存
+"""
+import os
+import re
+import json
+import time
+import threading
+from typing import Dict, Optional
+from urllib.parse import urlsplit, urlunsplit
+
+from config import settings
+from utils import log
+from .http_session import build_session_from_driver
+
+
+class ChatIdResolver:
+    """聊天ID解析器
+
+    已知聊天ID时，打招呼可以直接走WebSocket或聊天接口发送，
+    不必再打开详情页、查找联系按钮和输入框。
+    线程安全：多个打招呼通道共用一个实例，共享缓存并由同一把锁串行写文件。
+    """
+
+    # 页面源码/URL中常见的聊天ID模式
+    # （不使用 sessionId / imUserId 这类通用字段，页面上的登录会话、当前用户ID也叫这些名字，容易误认）
+    CHAT_ID_PATTERNS = [
+        r'i\.zhaopin\.com/chat/([\w-]+)',
+        r'"chatId"\s*:\s*"?([\w-]+)"?',
+        r'data-chat-id="([\w-]+)"'
+    ]
+
+    def __init__(self, cache_file: str = None):
+        self.cache_file = cache_file or settings.CHAT_ID_CACHE_FILE
+        self.cache: Dict[str, str] = {}
+        self.cache_lock = threading.Lock()
+        self.save_lock = threading.Lock()
+        self.session = None
+        # 解析失败的URL -> 失败时间，CHAT_ID_MISS_TTL 秒内不再请求
+        self.misses: Dict[str, float] = {}
+        self._compiled_patterns = [re.compile(pattern) for pattern in self.CHAT_ID_PATTERNS]
+        self._load_cache()
+
+    @staticmethod
+    def _normalize_url(url: str) -> str:
+        """去掉查询参数和锚点，同一职位的不同来源链接共用一个缓存项"""
+        try:
+            parts = urlsplit(url.strip())
+            return urlunsplit((parts.scheme, parts.netloc, parts.path.rstrip('/'), '', ''))
+        except Exception:
+            return url
+
+    def _load_cache(self):
+        """从文件加载缓存"""
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                self.cache = json.load(f)
+            log.debug(f"从 {self.cache_file} 加载了 {len(self.cache)} 个聊天ID")
+        except FileNotFoundError:
+            self.cache = {}
+        except Exception as e:
+            log.warning(f"加载聊天ID缓存失败: {e}")
+            self.cache = {}
+
+    def _save_cache(self):
+        """保存缓存到文件（先写临时文件再替换，并发写入不会互相截断）"""
+        try:
+            with self.save_lock:
+                with self.cache_lock:
+                    snapshot = dict(self.cache)
+                temp_file = self.cache_file + ".tmp"
+                with open(temp_file, 'w', encoding='utf-8') as f:
+                    json.dump(snapshot, f, ensure_ascii=False, indent=2)
+                os.replace(temp_file, self.cache_file)
+        except Exception as e:
+            log.warning(f"保存聊天ID缓存失败: {e}")
+
+    def get_cached(self, url: str) -> Optional[str]:
+        """只查缓存，不发起任何请求"""
+        with self.cache_lock:
+            return self.cache.get(self._normalize_url(url))
+
+    def learn(self, url: str, chat_id: str):
+        """记录URL与聊天ID的对应关系"""
+        if not url or not chat_id:
+            return
+        key = self._normalize_url(url)
+        with self.cache_lock:
+            if self.cache.get(key) == chat_id:
+                return
+            self.cache[key] = chat_id
+        self._save_cache()
+        log.debug(f"缓存聊天ID: {key} -> {chat_id}")
+
+    def extract_chat_id(self, text: str) -> Optional[str]:
+        """从URL或页面源码中提取聊天ID"""
+        if not text:
+            return None
+        for pattern in self._compiled_patterns:
+            match = pattern.search(text)
+            if match:
+                return match.group(1)
+        return None
+
+    def learn_from_driver(self, url: str, driver) -> Optional[str]:
+        """DOM流程成功后从浏览器当前页面学习聊天ID"""
+        try:
+            chat_id = self.extract_chat_id(driver.current_url) or self.extract_chat_id(driver.page_source)
+            if chat_id:
+                self.learn(url, chat_id)
+            return chat_id
+        except Exception as e:
+            log.debug(f"从页面学习聊天ID失败: {e}")
+            return None
+
+    def resolve(self, url: str, driver=None) -> Optional[str]:
+        """
+        解析URL对应的聊天ID
+
+        优先查缓存；未命中且提供了driver时，用浏览器cookies直接HTTP请求页面源码提取，
+        不触发浏览器页面加载。请求超时为 CHAT_ID_RESOLVE_TIMEOUT，失败的URL在
+        CHAT_ID_MISS_TTL 秒内直接返回None，不会每次打招呼都重复请求。
+        """
+        chat_id = self.get_cached(url)
+        if chat_id or driver is None:
+            return chat_id
+
+        key = self._normalize_url(url)
+        missed_at = self.misses.get(key)
+        if missed_at is not None and time.time() - missed_at < settings.CHAT_ID_MISS_TTL:
+            return None
+
+        try:
+            with self.cache_lock:
+                if self.session is None:
+                    self.session = build_session_from_driver(driver)
+            response = self.session.get(url, timeout=settings.CHAT_ID_RESOLVE_TIMEOUT)
+            if response.status_code == 200:
+                chat_id = self.extract_chat_id(response.text)
+                if chat_id:
+                    return chat_id
+        except Exception as e:
+            log.debug(f"解析聊天ID失败: {e}")
+
+        self.misses[key] = time.time()
+        return None
@@ -0,0 +1,138 @@
+"""
+地区/关键词代码索引 - 从随包附带的代码表加载，导入时构建一次只读映射，支持别名和模糊匹配
+"""
+import os
+import re
+import json
+import difflib
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional
+
+from config import settings
+from utils import log
+
+
+BUNDLED_CODES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'zhilian_codes.json')
+
+# 模糊匹配的最低相似度；关键词代码决定搜索的职位类别，阈值更严格
+LOCATION_FUZZY_CUTOFF = 0.75
+KEYWORD_FUZZY_CUTOFF = 0.85
+
+# 直接给出的地区代码（如 "653" 或 "jl653"）
+_RAW_LOCATION_CODE = re.compile(r'^(?:jl)?(\d{3,})$')
+_LOCATION_SUFFIXES = ('特别行政区', '自治区', '省', '市', '区', '县')
+
+
+def _normalize(text: str) -> str:
+    return re.sub(r'\s+', '', str(text)).casefold()
+
+
+def _is_cjk(text: str) -> bool:
+    return bool(text) and all('\u4e00' <= ch <= '\u9fff' for ch in text)
+
+
+def _normalize_location(text: str) -> str:
+    text = _normalize(text)
+    for suffix in _LOCATION_SUFFIXES:
+        if len(text) > len(suffix) + 1 and text.endswith(suffix):
+            return text[:-len(suffix)]
+    return text
+
+
+class CodeIndex:
+    """代码索引
+
+    代码表为JSON：locations / keywords 两个列表，每项含 code、名称和别名。
+    所有名称和别名归一化（去空白、忽略大小写、去掉"市""省"等后缀）后建立只读索引。
+    """
+
+    def __init__(self, data: Dict):
+        self.version = str(data.get('version', 'unknown'))
+        self.nationwide_code = str(data.get('nationwide', '489'))
+
+        locations = {}
+        self.location_names: Dict[str, str] = {}
+        for entry in data.get('locations', []):
+            code = str(entry['code'])
+            self.location_names[code] = entry['name']
+            for name in [entry['name']] + list(entry.get('aliases', [])):
+                locations[_normalize_location(name)] = code
+
+        keywords = {}
+        for entry in data.get('keywords', []):
+            code = str(entry['code'])
+            for name in [entry.get('label', '')] + list(entry.get('aliases', [])):
+                if name:
+                    keywords[_normalize(name)] = code
+
+        self.locations: Mapping[str, str] = MappingProxyType(locations)
+        self.keywords: Mapping[str, str] = MappingProxyType(keywords)
+
+    @classmethod
+    def load(cls, files: List[str]) -> 'CodeIndex':
+        """按顺序加载并合并多个代码表，后面的文件覆盖前面同名的条目"""
+        merged = {'locations': [], 'keywords': []}
+        for path in files:
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except Exception as e:
+                log.warning(f"加载代码表失败 {path}: {e}")
+                continue
+            for key in ('version', 'nationwide'):
+                if key in data:
+                    merged[key] = data[key]
+            merged['locations'].extend(data.get('locations', []))
+            merged['keywords'].extend(data.get('keywords', []))
+        return cls(merged)
+
+    def _lookup(self, mapping: Mapping[str, str], key: str, cutoff: float) -> Optional[str]:
+        code = mapping.get(key)
+        if code is not None:
+            return code
+        matches = difflib.get_close_matches(key, mapping.keys(), n=1, cutoff=cutoff)
+        return mapping[matches[0]] if matches else None
+
+    def location_code(self, location: str) -> Optional[str]:
+        """地区名称/别名/代码 -> 地区代码，无法识别时返回None"""
+        if not location:
+            return None
+        raw = _RAW_LOCATION_CODE.match(_normalize(location))
+        if raw:
+            return raw.group(1)
+
+        key = _normalize_location(location)
+        code = self.locations.get(key)
+        if code is not None:
+            return code
+        if not _is_cjk(key):
+            # 拼音/英文别名都很短，前缀和模糊匹配会把 shijiazhuang、changzhou 之类错配到表内城市
+            return None
+
+        # 只在中文名称上做前缀匹配："杭州西湖"、"深圳南山区" 等落到所在城市
+        cjk_names = [name for name in self.locations if _is_cjk(name)]
+        prefixed = [name for name in cjk_names if len(name) >= 2 and key.startswith(name)]
+        if prefixed:
+            return self.locations[max(prefixed, key=len)]
+        matches = difflib.get_close_matches(key, cjk_names, n=1, cutoff=LOCATION_FUZZY_CUTOFF)
+        if not matches:
+            return None
+        code = self.locations[matches[0]]
+        log.warning(f"地区 {location} 未精确匹配，按相似名称使用 {self.location_names.get(code, code)}（{code}）")
+        return code
+
+    def keyword_code(self, keyword: str) -> Optional[str]:
+        """关键词 -> 职位类别代码，无法识别时返回None（调用方改用URL编码的原始关键词）"""
+        if not keyword:
+            return None
+        return self._lookup(self.keywords, _normalize(keyword), KEYWORD_FUZZY_CUTOFF)
+
+
+def _code_files() -> List[str]:
+    files = [BUNDLED_CODES_FILE]
+    if settings.CODE_INDEX_FILE:
+        files.append(settings.CODE_INDEX_FILE)
+    return files
+
+
+CODE_INDEX = CodeIndex.load(_code_files())
@@ -0,0 +1,202 @@
+"""
+增量抓取调度 - 记录每个职位的抓取时间、内容哈希和变化频率，只重新抓取估计已过期的职位
+"""
+import re
+import json
+import math
+import time
+import hashlib
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from config import settings
+from utils import log
+from .job_index import LocalJobIndex
+
+
+class CrawlScheduler:
+    """增量抓取调度器
+
+    把每个职位的内容变化看作泊松过程，变化率估计为
+        rate = (变化次数 + 1) / (观察时长 + 先验间隔)
+    即在没有观察数据时假设每 CRAWL_PRIOR_CHANGE_INTERVAL_HOURS 变化一次。
+    距上次抓取 age 秒后内容已变化的概率为 1 - exp(-rate * age)，超过阈值才重新抓取；
+    从未抓取过详情的新职位总是排在最前面。状态与本地职位索引存放在同一个数据库。
+    """
+
+    # 参与内容哈希的结构化字段；description 是整页正文（含推荐职位、浏览数等每次都会变的内容），不参与
+    HASH_FIELDS = ('name', 'company', 'salary', 'location', 'experience', 'education',
+                   'skills', 'work_experience', 'education_history', 'self_evaluation')
+    # 哈希字段调整时更换前缀，旧版本的哈希不与新哈希比较，避免升级后所有职位都被记为变化一次
+    HASH_VERSION = 'v2:'
+
+    def __init__(self,
+                 job_index: LocalJobIndex,
+                 staleness_threshold: float = None,
+                 daily_budget: int = None,
+                 prior_interval_hours: float = None):
+        self.job_index = job_index
+        self.conn = job_index.conn
+        self.lock = job_index.lock
+        self.staleness_threshold = (staleness_threshold if staleness_threshold is not None
+                                    else settings.CRAWL_STALENESS_THRESHOLD)
+        self.daily_budget = daily_budget if daily_budget is not None else settings.CRAWL_DAILY_BUDGET
+        self.prior_interval = (prior_interval_hours if prior_interval_hours is not None
+                               else settings.CRAWL_PRIOR_CHANGE_INTERVAL_HOURS) * 3600
+        self._create_schema()
+
+    def _create_schema(self):
+        with self.lock, self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS crawl_state (
+                    url TEXT PRIMARY KEY,
+                    first_seen REAL,
+                    last_fetch REAL,
+                    content_hash TEXT,
+                    observed_seconds REAL DEFAULT 0,
+                    change_count INTEGER DEFAULT 0,
+                    fetch_count INTEGER DEFAULT 0
+                )
+            """)
+            # 每次抓取一行，按时间统计当日抓取次数（同一职位重复抓取也计入预算）
+            self.conn.execute("CREATE TABLE IF NOT EXISTS crawl_fetches (fetched_at REAL)")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_crawl_fetches_time ON crawl_fetches (fetched_at)")
+
+    @staticmethod
+    def _normalize(value):
+        """去掉空白差异，排版变化不算内容变化"""
+        if isinstance(value, str):
+            return re.sub(r'\s+', ' ', value).strip()
+        if isinstance(value, (list, tuple)):
+            return [CrawlScheduler._normalize(item) for item in value]
+        if isinstance(value, dict):
+            return {key: CrawlScheduler._normalize(item) for key, item in value.items()}
+        return value
+
+    @classmethod
+    def content_hash(cls, job: Dict) -> str:
+        content = {field: cls._normalize(job.get(field)) for field in cls.HASH_FIELDS}
+        digest = hashlib.sha1(json.dumps(content, ensure_ascii=False, sort_keys=True).encode('utf-8')).hexdigest()
+        return cls.HASH_VERSION + digest
+
+    def change_rate(self, observed_seconds: float, change_count: int) -> float:
+        """每秒变化次数的估计值"""
+        return (change_count + 1) / (observed_seconds + self.prior_interval)
+
+    def staleness(self, row, now: float = None) -> float:
+        """内容在上次抓取后已经变化的概率，从未抓取过时为1"""
+        if row is None or row['last_fetch'] is None:
+            return 1.0
+        now = now or time.time()
+        age = max(0.0, now - row['last_fetch'])
+        return 1 - math.exp(-self.change_rate(row['observed_seconds'], row['change_count']) * age)
+
+    def discover(self, urls: Iterable[str]) -> int:
+        """登记搜索页上出现的职位URL，返回新发现的数量"""
+        now = time.time()
+        with self.lock, self.conn:
+            before = self.conn.total_changes
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO crawl_state (url, first_seen) VALUES (?, ?)",
+                [(url, now) for url in urls if url]
+            )
+            return self.conn.total_changes - before
+
+    def record_fetch(self, url: str, job: Dict) -> bool:
+        """记录一次详情抓取，返回内容是否与上次不同"""
+        now = time.time()
+        new_hash = self.content_hash(job)
+        with self.lock, self.conn:
+            self.conn.execute("INSERT INTO crawl_fetches (fetched_at) VALUES (?)", (now,))
+            self.conn.execute("DELETE FROM crawl_fetches WHERE fetched_at < ?", (now - 7 * 86400,))
+            row = self.conn.execute("SELECT * FROM crawl_state WHERE url = ?", (url,)).fetchone()
+            if row is None:
+                self.conn.execute(
+                    """INSERT INTO crawl_state (url, first_seen, last_fetch, content_hash, fetch_count)
+                       VALUES (?, ?, ?, ?, 1)""",
+                    (url, now, now, new_hash)
+                )
+                return False
+
+            old_hash = row['content_hash']
+            changed = bool(old_hash) and old_hash.startswith(self.HASH_VERSION) and old_hash != new_hash
+            observed = row['observed_seconds'] + (now - row['last_fetch'] if row['last_fetch'] else 0)
+            self.conn.execute(
+                """UPDATE crawl_state SET last_fetch = ?, content_hash = ?, observed_seconds = ?,
+                   change_count = change_count + ?, fetch_count = fetch_count + 1 WHERE url = ?""",
+                (now, new_hash, observed, int(changed), url)
+            )
+        if changed:
+            log.debug(f"职位内容有变化: {url}")
+        return changed
+
+    def fetched_today(self) -> int:
+        """今天的抓取次数（同一职位抓取多次按多次计）"""
+        midnight = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0).timestamp()
+        with self.lock:
+            return self.conn.execute(
+                "SELECT COUNT(*) FROM crawl_fetches WHERE fetched_at >= ?", (midnight,)
+            ).fetchone()[0]
+
+    def plan(self, urls: Iterable[str] = None, budget: int = None) -> List[str]:
+        """
+        选出需要抓取详情的URL
+
+        Args:
+            urls: 候选URL，为None时考虑所有已登记的职位
+            budget: 本次最多抓取数量，默认为今日剩余预算
+
+        Returns:
+            按优先级排列的URL：新职位在前（按发现时间），其余按过期概率从高到低，
+            过期概率低于阈值的不抓取
+        """
+        if budget is None:
+            budget = max(0, self.daily_budget - self.fetched_today())
+
+        with self.lock:
+            if urls is None:
+                rows = self.conn.execute("SELECT * FROM crawl_state").fetchall()
+                states = {row['url']: row for row in rows}
+                urls = list(states.keys())
+            else:
+                urls = list(dict.fromkeys(url for url in urls if url))
+                states = {}
+                for url in urls:
+                    states[url] = self.conn.execute("SELECT * FROM crawl_state WHERE url = ?", (url,)).fetchone()
+
+        now = time.time()
+        new_urls = []
+        stale = []
+        for url in urls:
+            row = states.get(url)
+            if row is None or row['last_fetch'] is None:
+                new_urls.append((row['first_seen'] if row is not None else now, url))
+                continue
+            probability = self.staleness(row, now)
+            if probability >= self.staleness_threshold:
+                stale.append((probability, url))
+
+        new_urls.sort()
+        stale.sort(reverse=True)
+        planned = [url for _, url in new_urls] + [url for _, url in stale]
+        skipped = len(urls) - len(planned)
+        if len(planned) > budget:
+            log.info(f"抓取预算不足: 需要 {len(planned)} 个，预算 {budget} 个")
+            planned = planned[:budget]
+
+        log.info(f"增量抓取计划: 新职位 {len(new_urls)} 个，过期职位 {len(stale)} 个，"
+                 f"未过期跳过 {skipped} 个，本次抓取 {len(planned)} 个")
+        return planned
+
+    def stats(self) -> Dict:
+        with self.lock:
+            row = self.conn.execute(
+                """SELECT COUNT(*) AS tracked, SUM(last_fetch IS NULL) AS never_fetched,
+                   SUM(fetch_count) AS fetches, SUM(change_count) AS changes FROM crawl_state"""
+            ).fetchone()
+        return {key: row[key] or 0 for key in ('tracked', 'never_fetched', 'fetches', 'changes')}
+
+    def get_state(self, url: str) -> Optional[Dict]:
+        with self.lock:
+            row = self.conn.execute("SELECT * FROM crawl_state WHERE url = ?", (url,)).fetchone()
+        return dict(row) if row else None
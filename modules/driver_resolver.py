@@ -0,0 +1,151 @@
+"""
+chromedriver 路径解析 - 固定并缓存驱动路径和版本，启动时只做一次本地 --version 校验，不访问网络
+"""
+import os
+import re
+import json
+import time
+import shutil
+import subprocess
+from typing import Dict, Optional
+
+from config import settings
+from utils import log
+
+
+_VERSION_PATTERN = re.compile(r'ChromeDriver\s+([\d.]+)')
+
+
+def chromedriver_version(path: str, timeout: float = 5.0) -> Optional[str]:
+    """运行 chromedriver --version，返回版本号；文件不存在或无法执行时返回None"""
+    if not path or not os.path.isfile(path):
+        return None
+    try:
+        result = subprocess.run([path, '--version'], capture_output=True, text=True, timeout=timeout)
+        match = _VERSION_PATTERN.search(result.stdout or '')
+        return match.group(1) if match else None
+    except Exception as e:
+        log.debug(f"chromedriver --version 执行失败 {path}: {e}")
+        return None
+
+
+class ChromeDriverResolver:
+    """chromedriver 解析器
+
+    按顺序尝试：
+    1. 配置中固定的 CHROMEDRIVER_PATH
+    2. 本地清单（CHROMEDRIVER_MANIFEST）中缓存的路径和版本
+    3. PATH 中的 chromedriver
+    4. CHROMEDRIVER_AUTO_DOWNLOAD 开启时用 webdriver-manager 下载一次
+
+    命中后写入清单，之后每次启动只读清单并执行一次本地 --version 校验。
+    """
+
+    def __init__(self, manifest_file: str = None):
+        self.manifest_file = manifest_file or settings.CHROMEDRIVER_MANIFEST
+        self.last_resolution: Dict = {}
+
+    def load_manifest(self) -> Dict:
+        try:
+            with open(self.manifest_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            log.warning(f"读取chromedriver清单失败: {e}")
+            return {}
+
+    def save_manifest(self, path: str, version: str, source: str):
+        manifest = {
+            'path': os.path.abspath(path),
+            'version': version,
+            'source': source,
+            'resolved_at': time.strftime('%Y-%m-%d %H:%M:%S')
+        }
+        try:
+            with open(self.manifest_file, 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, ensure_ascii=False, indent=2)
+        except Exception as e:
+            log.warning(f"写入chromedriver清单失败: {e}")
+
+    def invalidate(self):
+        """删除清单（驱动与浏览器版本不匹配时调用）"""
+        try:
+            os.remove(self.manifest_file)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            log.warning(f"删除chromedriver清单失败: {e}")
+
+    def _candidates(self):
+        """按优先级产出 (来源, 路径, 清单中记录的版本)"""
+        if settings.CHROMEDRIVER_PATH:
+            yield 'pinned', settings.CHROMEDRIVER_PATH, None
+
+        manifest = self.load_manifest()
+        if manifest.get('path'):
+            yield 'manifest', manifest['path'], manifest.get('version')
+
+        on_path = shutil.which('chromedriver')
+        if on_path:
+            yield 'path', on_path, None
+
+    def resolve(self, allow_download: bool = None, force_download: bool = False) -> str:
+        """
+        返回可用的chromedriver路径
+
+        Args:
+            allow_download: 本地都没有时是否下载，默认取 CHROMEDRIVER_AUTO_DOWNLOAD
+            force_download: 跳过所有本地驱动直接下载与当前浏览器匹配的版本
+                （本地驱动与浏览器版本不匹配时使用，否则会再次解析到同一个本地驱动）
+
+        Raises:
+            RuntimeError: 本地没有可用的驱动且不允许下载
+        """
+        started = time.perf_counter()
+        allow_download = settings.CHROMEDRIVER_AUTO_DOWNLOAD if allow_download is None else allow_download
+
+        for source, path, expected_version in ([] if force_download else self._candidates()):
+            version = chromedriver_version(path)
+            if version is None:
+                log.warning(f"chromedriver不可用（{source}）: {path}")
+                continue
+            if expected_version and version != expected_version:
+                log.info(f"chromedriver版本已变化: {expected_version} -> {version}")
+            if source != 'manifest' or version != expected_version:
+                self.save_manifest(path, version, source)
+            return self._done(path, version, source, started)
+
+        if not (allow_download or force_download):
+            raise RuntimeError(
+                "没有找到可用的chromedriver。请设置 CHROMEDRIVER_PATH、把 chromedriver 加入 PATH，"
+                "或在联网环境运行 python -m modules.driver_resolver 预先下载"
+            )
+
+        if force_download:
+            log.info("跳过本地chromedriver，使用webdriver-manager下载与浏览器匹配的版本")
+        else:
+            log.info("本地没有可用的chromedriver，使用webdriver-manager下载（仅此一次）")
+        from webdriver_manager.chrome import ChromeDriverManager
+        path = ChromeDriverManager().install()
+        version = chromedriver_version(path) or 'unknown'
+        self.save_manifest(path, version, 'download')
+        return self._done(path, version, 'download', started)
+
+    def _done(self, path: str, version: str, source: str, started: float) -> str:
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.last_resolution = {
+            'path': path,
+            'version': version,
+            'source': source,
+            'resolve_ms': round(elapsed_ms, 1)
+        }
+        log.info(f"chromedriver {version}（{source}）解析耗时 {elapsed_ms:.0f}ms: {path}")
+        return path
+
+
+if __name__ == "__main__":
+    # 部署时在联网环境执行一次，下载并固定驱动；之后启动不再访问网络
+    resolver = ChromeDriverResolver()
+    resolver.resolve(allow_download=True)
+    print(json.dumps(resolver.load_manifest(), ensure_ascii=False, indent=2))
@@ -0,0 +1,361 @@
+"""
+打招呼调度模块 - 令牌桶限速、每日配额、多通道并行与断点续发
+"""
+import os
+import json
+import time
+import random
+import threading
+from datetime import date
+from typing import List, Dict, Iterable, Optional
+
+from config import settings
+from utils import log
+
+
+class TokenBucket:
+    """令牌桶限速器（线程安全）"""
+
+    def __init__(self, rate_per_minute: float, capacity: int = 1):
+        self.rate = rate_per_minute / 60.0  # 每秒补充的令牌数
+        self.capacity = max(1, capacity)
+        self.tokens = float(self.capacity)
+        self.last_refill = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.rate)
+        self.last_refill = now
+
+    def acquire(self, stop_event: threading.Event = None) -> bool:
+        """获取一个令牌，令牌不足时阻塞等待；stop_event被设置时返回False"""
+        while True:
+            with self.lock:
+                self._refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return True
+                wait_time = (1 - self.tokens) / self.rate if self.rate > 0 else 1.0
+
+            if stop_event is not None:
+                if stop_event.wait(wait_time):
+                    return False
+            else:
+                time.sleep(wait_time)
+
+
+class GreetingScheduler:
+    """打招呼调度器
+
+    - 按账号限速（令牌桶 + 随机抖动）并限制每日发送总量
+    - 多个通道（每个通道一个已登录的driver）在同一限额内并行发送
+    - 待发送队列持久化到文件，中断后再次运行会从断点继续
+
+    内存中的待发送队列是 profile_url -> 候选人 的有序字典，入队去重和完成后移除都是O(1)；
+    入队只标记状态有变化，最多每 GREETING_STATE_SAVE_INTERVAL 秒写一次文件，
+    每次发送完成（已经真正发出消息）和调度结束时立即写入。
+    """
+
+    def __init__(self,
+                 interaction_managers: List,
+                 account: str = None,
+                 rate_per_minute: float = None,
+                 burst: int = None,
+                 daily_quota: int = None,
+                 jitter_range: tuple = None,
+                 state_file: str = None):
+        if not interaction_managers:
+            raise ValueError("至少需要一个打招呼通道")
+
+        self.lanes = list(interaction_managers)
+        self.account = account or settings.ZHILIAN_USERNAME or settings.USERNAME or "default"
+        self.daily_quota = daily_quota if daily_quota is not None else settings.GREETING_DAILY_QUOTA
+        self.jitter_range = jitter_range or (settings.GREETING_JITTER_MIN, settings.GREETING_JITTER_MAX)
+        self.state_file = state_file or settings.GREETING_STATE_FILE
+        self.bucket = TokenBucket(
+            rate_per_minute if rate_per_minute is not None else settings.GREETING_RATE_PER_MINUTE,
+            burst if burst is not None else settings.GREETING_BURST
+        )
+
+        self.state_lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.state = {}
+        self.pending: Dict[str, Dict] = {}
+        self._dirty = False
+        self._last_save = 0.0
+        self._load_state()
+
+    # ---------- 状态持久化 ----------
+
+    def _load_state(self):
+        """加载当前账号的调度状态"""
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                all_states = json.load(f)
+        except FileNotFoundError:
+            all_states = {}
+        except Exception as e:
+            log.warning(f"加载打招呼调度状态失败: {e}")
+            all_states = {}
+
+        state = all_states.get(self.account, {})
+        today = date.today().isoformat()
+        if state.get('date') != today:
+            state['date'] = today
+            state['sent_today'] = 0
+        state.setdefault('greeted', {})
+        self.pending = {item['profile_url']: item for item in state.pop('pending', []) if item.get('profile_url')}
+        self.state = state
+
+    def _save_state(self, force: bool = False):
+        """
+        保存调度状态（调用方需持有state_lock）
+
+        force 为False时，距上次写入不足 GREETING_STATE_SAVE_INTERVAL 秒只标记有变化，由之后的保存一并写入。
+        """
+        self._dirty = True
+        if not force and time.monotonic() - self._last_save < settings.GREETING_STATE_SAVE_INTERVAL:
+            return
+        self._write_state()
+
+    def _flush_state(self):
+        """写入尚未保存的变化（调用方需持有state_lock）"""
+        if self._dirty:
+            self._write_state()
+
+    def _write_state(self):
+        try:
+            try:
+                with open(self.state_file, 'r', encoding='utf-8') as f:
+                    all_states = json.load(f)
+            except (FileNotFoundError, ValueError):
+                all_states = {}
+
+            all_states[self.account] = dict(self.state, pending=list(self.pending.values()))
+            # 先写临时文件再替换，写入中途退出不会留下损坏的状态文件
+            temp_file = self.state_file + ".tmp"
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                json.dump(all_states, f, ensure_ascii=False)
+            os.replace(temp_file, self.state_file)
+            self._dirty = False
+        except Exception as e:
+            log.warning(f"保存打招呼调度状态失败: {e}")
+        self._last_save = time.monotonic()
+
+    def _prune_greeted(self, max_age_days: int = 30):
+        """清理过期的已发送记录"""
+        cutoff = time.time() - max_age_days * 86400
+        greeted = self.state['greeted']
+        for url in [url for url, ts in greeted.items() if ts < cutoff]:
+            del greeted[url]
+
+    # ---------- 配额 ----------
+
+    def remaining_quota(self) -> int:
+        """今日剩余配额"""
+        with self.state_lock:
+            return max(0, self.daily_quota - self.state['sent_today'])
+
+    def _reserve_quota(self) -> bool:
+        with self.state_lock:
+            today = date.today().isoformat()
+            if self.state['date'] != today:
+                self.state['date'] = today
+                self.state['sent_today'] = 0
+
+            if self.state['sent_today'] >= self.daily_quota:
+                return False
+            self.state['sent_today'] += 1
+            return True
+
+    def _release_quota(self):
+        with self.state_lock:
+            self.state['sent_today'] = max(0, self.state['sent_today'] - 1)
+
+    # ---------- 调度 ----------
+
+    def _enqueue(self, candidate: Dict) -> bool:
+        """加入待发送队列（已发送过或已在队列中的跳过）"""
+        url = candidate.get('profile_url', '')
+        if not url:
+            log.warning(f"候选人 {candidate.get('name', '未知')} 没有详情页URL")
+            return False
+
+        with self.state_lock:
+            if url in self.state['greeted'] or url in self.pending:
+                return False
+            self.pending[url] = candidate
+            self._save_state()
+        return True
+
+    def _complete(self, candidate: Dict, success: bool, results: Dict):
+        """记录一次发送结果并从队列中移除"""
+        url = candidate.get('profile_url', '')
+        with self.state_lock:
+            self.pending.pop(url, None)
+            if success:
+                self.state['greeted'][url] = time.time()
+            # 消息已经发出，立即落盘，避免中断后重复发送
+            self._save_state(force=True)
+
+            results['details'].append({
+                'name': candidate.get('name', '未知'),
+                'company': candidate.get('company', '未知'),
+                'url': url,
+                'success': success,
+                'timestamp': time.time()
+            })
+            results['total'] += 1
+            if success:
+                results['success'] += 1
+            else:
+                results['failed'] += 1
+
+    def _greet_one(self, lane, candidate: Dict, message_template: Optional[str], results: Dict) -> bool:
+        """在指定通道上发送一次打招呼，返回False表示应停止调度"""
+        if not self._reserve_quota():
+            log.info(f"账号 {self.account} 今日配额已用完: {self.daily_quota}")
+            return False
+
+        if not self.bucket.acquire(self.stop_event):
+            self._release_quota()
+            return False
+
+        # 随机抖动，避免发送间隔过于规律
+        if self.stop_event.wait(random.uniform(*self.jitter_range)):
+            self._release_quota()
+            return False
+
+        try:
+            message = message_template
+            if not message and hasattr(lane, 'render_greeting'):
+                message = lane.render_greeting(candidate)
+
+            success = lane.send_greeting(
+                candidate_url=candidate['profile_url'],
+                message=message,
+                company=candidate.get('company', '我们公司'),
+                position=candidate.get('name', '相关职位'),
+                chat_id=candidate.get('chat_id')
+            )
+        except Exception as e:
+            log.error(f"处理候选人 {candidate.get('name', '未知')} 时出错: {e}")
+            success = False
+
+        if not success:
+            # 发送失败不占用配额
+            self._release_quota()
+
+        self._complete(candidate, success, results)
+        return True
+
+    def run(self,
+            candidates: Iterable[Dict],
+            message_template: str = None,
+            max_count: int = None) -> Dict:
+        """
+        调度发送打招呼
+
+        上次中断遗留的待发送候选人会优先处理。单通道时边消费候选人流边发送；
+        多通道时先把候选人全部入队再并行发送。
+
+        Args:
+            candidates: 候选人列表或生成器
+            message_template: 消息模板
+            max_count: 本次最多发送数量
+
+        Returns:
+            发送结果统计，格式与 batch_greeting 相同
+        """
+        results = {'total': 0, 'success': 0, 'failed': 0, 'details': []}
+        self.stop_event.clear()
+
+        with self.state_lock:
+            self._prune_greeted()
+            resumed = list(self.pending.values())
+        if resumed:
+            log.info(f"恢复上次未完成的打招呼队列: {len(resumed)} 个")
+
+        log.info(f"开始调度打招呼，通道数: {len(self.lanes)}，今日剩余配额: {self.remaining_quota()}")
+
+        # 预检模板字段缺失情况
+        if not message_template and isinstance(candidates, (list, tuple)) and hasattr(self.lanes[0], 'template_engine'):
+            self.lanes[0].template_engine.check_batch(candidates)
+
+        try:
+            if len(self.lanes) == 1:
+                self._run_single_lane(resumed, candidates, message_template, max_count, results)
+            else:
+                self._run_parallel(resumed, candidates, message_template, max_count, results)
+        except Exception as e:
+            log.error(f"打招呼调度失败: {e}")
+
+        with self.state_lock:
+            self._flush_state()
+            results['remaining'] = len(self.pending)
+
+        log.info(f"打招呼调度完成，总数: {results['total']}, 成功: {results['success']}, "
+                 f"失败: {results['failed']}, 待续发: {results['remaining']}")
+        return results
+
+    def _run_single_lane(self, resumed, candidates, message_template, max_count, results):
+        lane = self.lanes[0]
+
+        # 列表直接全部入队，配额用完时剩余的也能留到下次续发；生成器则边消费边入队
+        if isinstance(candidates, (list, tuple)):
+            for candidate in candidates:
+                self._enqueue(candidate)
+            with self.state_lock:
+                self._flush_state()
+                resumed = list(self.pending.values())
+            candidates = ()
+
+        def queued():
+            yield from resumed
+            for candidate in candidates:
+                if self._enqueue(candidate):
+                    yield candidate
+
+        for candidate in queued():
+            if max_count is not None and results['total'] >= max_count:
+                log.info(f"已达到最大发送数量限制: {max_count}")
+                break
+            if not self._greet_one(lane, candidate, message_template, results):
+                break
+
+    def _run_parallel(self, resumed, candidates, message_template, max_count, results):
+        for candidate in candidates:
+            self._enqueue(candidate)
+
+        with self.state_lock:
+            self._flush_state()
+            work = list(self.pending.values())
+        if max_count is not None:
+            work = work[:max_count]
+
+        work_lock = threading.Lock()
+
+        def lane_worker(lane):
+            while not self.stop_event.is_set():
+                with work_lock:
+                    if not work:
+                        return
+                    candidate = work.pop(0)
+                if not self._greet_one(lane, candidate, message_template, results):
+                    self.stop_event.set()
+                    return
+
+        threads = []
+        for index, lane in enumerate(self.lanes):
+            thread = threading.Thread(target=lane_worker, args=(lane,), name=f"greeting-lane-{index}")
+            thread.daemon = True
+            thread.start()
+            threads.append(thread)
+
+        for thread in threads:
+            thread.join()
+
+    def stop(self):
+        """停止调度，未发送的候选人保留在队列中"""
+        self.stop_event.set()
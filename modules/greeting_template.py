@@ -0,0 +1,155 @@
+"""
+打招呼模板引擎 - 加载时校验并预编译模板，按候选人信息批量渲染
+"""
+import random
+from string import Formatter
+from typing import List, Dict, Iterable, Optional, Tuple
+
+from utils import log
+
+
+class GreetingTemplateEngine:
+    """打招呼模板引擎
+
+    模板在加载时解析为（文本片段, 字段）序列并校验字段名，渲染时只做字典查找和拼接；
+    字段值从候选人字典中按 FIELD_SOURCES 依次查找，缺失的字段使用默认值并可批量预检。
+    """
+
+    # 模板字段 -> 候选人字典中的取值键（按优先级）
+    FIELD_SOURCES = {
+        'company': ('company',),
+        'position': ('position', 'name'),
+        'skill': ('skill', 'skills', 'keyword'),
+        'industry': ('industry',),
+        'location': ('location',),
+        'salary': ('salary',),
+        'education': ('education',),
+        'experience': ('experience',)
+    }
+
+    DEFAULTS = {
+        'company': '我们公司',
+        'position': '相关职位',
+        'skill': '技术',
+        'industry': '互联网',
+        'location': '',
+        'salary': '',
+        'education': '',
+        'experience': ''
+    }
+
+    FALLBACK_MESSAGE = "您好，看到您的简历很优秀，想和您聊聊相关的职位机会。"
+
+    # 候选人字段里表示"没有取到值"的占位文本
+    PLACEHOLDER_VALUES = {'', '未知', '未知公司', '未知职位', '未知地点', '未知时间'}
+
+    def __init__(self, templates: List[str], defaults: Dict[str, str] = None):
+        self.defaults = dict(self.DEFAULTS)
+        if defaults:
+            self.defaults.update(defaults)
+
+        self.compiled: List[Tuple[tuple, frozenset]] = []
+        for template in templates:
+            self.add_template(template)
+
+        if not self.compiled:
+            log.warning("没有可用的打招呼模板，将使用默认消息")
+
+    def add_template(self, template: str):
+        """校验并编译模板，字段不合法时抛出ValueError"""
+        parts = []
+        fields = set()
+        for literal, field_name, format_spec, conversion in Formatter().parse(template):
+            if literal:
+                parts.append((literal, None, None))
+            if field_name is None:
+                continue
+            if not field_name or not field_name.isidentifier():
+                raise ValueError(f"模板字段不合法: {{{field_name}}} in {template}")
+            if field_name not in self.defaults:
+                raise ValueError(f"未知的模板字段: {{{field_name}}} in {template}")
+            spec = format_spec or None
+            if conversion:
+                spec = (conversion, spec)
+            parts.append((None, field_name, spec))
+            fields.add(field_name)
+
+        self.compiled.append((tuple(parts), frozenset(fields)))
+
+    def _lookup(self, candidate: Dict, field: str) -> Optional[str]:
+        """从候选人字典中取字段值，取不到返回None"""
+        for key in self.FIELD_SOURCES.get(field, (field,)):
+            value = candidate.get(key)
+            if isinstance(value, (list, tuple)):
+                value = "、".join(str(item) for item in value[:3] if item)
+            if value is not None:
+                value = str(value).strip()
+                if value not in self.PLACEHOLDER_VALUES:
+                    return value
+        return None
+
+    def resolve_fields(self, candidate: Dict, **overrides) -> Tuple[Dict[str, str], set]:
+        """解析候选人的全部模板字段，返回（字段值, 缺失字段集合）"""
+        values = {}
+        missing = set()
+        for field, default in self.defaults.items():
+            value = overrides.get(field) or self._lookup(candidate, field)
+            if value is None:
+                missing.add(field)
+                value = default
+            values[field] = value
+        return values, missing
+
+    @staticmethod
+    def _render_parts(parts: tuple, values: Dict[str, str]) -> str:
+        chunks = []
+        for literal, field, spec in parts:
+            if field is None:
+                chunks.append(literal)
+            elif spec is None:
+                chunks.append(values[field])
+            else:
+                value = values[field]
+                if isinstance(spec, tuple):
+                    conversion, spec = spec
+                    value = {'r': repr, 's': str, 'a': ascii}[conversion](value)
+                chunks.append(format(value, spec or ''))
+        return "".join(chunks)
+
+    def render(self, candidate: Dict = None, **overrides) -> str:
+        """
+        为单个候选人渲染打招呼消息
+
+        优先在字段全部有真实取值的模板中随机选择，避免出现"技术""互联网"这类默认填充；
+        没有这样的模板时使用任意模板加默认值。
+        """
+        if not self.compiled:
+            return self.FALLBACK_MESSAGE
+
+        values, missing = self.resolve_fields(candidate or {}, **overrides)
+        complete = [parts for parts, fields in self.compiled if not (fields & missing)]
+        parts = random.choice(complete) if complete else random.choice(self.compiled)[0]
+        return self._render_parts(parts, values)
+
+    def check_batch(self, candidates: Iterable[Dict]) -> Dict[str, int]:
+        """预检一批候选人，统计每个模板字段缺失的人数"""
+        used_fields = set()
+        for _, fields in self.compiled:
+            used_fields |= fields
+
+        missing_counts = {}
+        total = 0
+        for candidate in candidates:
+            total += 1
+            _, missing = self.resolve_fields(candidate)
+            for field in missing & used_fields:
+                missing_counts[field] = missing_counts.get(field, 0) + 1
+
+        for field, count in missing_counts.items():
+            log.warning(f"模板字段 {{{field}}} 在 {count}/{total} 个候选人中缺失，将使用默认值: {self.defaults[field]}")
+        return missing_counts
+
+    def render_batch(self, candidates: List[Dict], key: str = 'profile_url', **overrides) -> Dict[str, str]:
+        """批量渲染一批候选人的消息，返回 {候选人key: 消息}"""
+        self.check_batch(candidates)
+        return {candidate.get(key, ''): self.render(candidate, **overrides) for candidate in candidates}
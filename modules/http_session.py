@@ -0,0 +1,38 @@
+"""
+HTTP会话工具 - 复用浏览器登录态直接请求智联招聘接口
+"""
+from typing import Optional
+import requests
+
+from utils import log
+
+
+DEFAULT_USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+
+
+def build_session_from_driver(driver, referer: str = "https://www.zhaopin.com/") -> requests.Session:
+    """用浏览器当前的cookies构建requests会话"""
+    session = requests.Session()
+    session.headers.update({
+        'User-Agent': DEFAULT_USER_AGENT,
+        'Referer': referer,
+        'Accept': 'application/json, text/plain, */*'
+    })
+    sync_cookies_from_driver(session, driver)
+    return session
+
+
+def sync_cookies_from_driver(session: requests.Session, driver) -> Optional[requests.Session]:
+    """把浏览器cookies同步到已有会话（登录态刷新后调用）"""
+    try:
+        for cookie in driver.get_cookies():
+            session.cookies.set(
+                cookie['name'],
+                cookie['value'],
+                domain=cookie.get('domain', ''),
+                path=cookie.get('path', '/')
+            )
+        return session
+    except Exception as e:
+        log.warning(f"同步浏览器cookies失败: {e}")
+        return None
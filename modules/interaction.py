@@ -3,7 +3,7 @@
 """
 import time
 import random
-from typing import List, Dict, Optional
+from typing import List, Dict, Iterable, Optional
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
@@ -11,15 +11,30 @@ from selenium.webdriver.common.keys import Keys
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 
 from config import settings
-from utils import log
+from utils import log, metrics, tracer, traced
+from .chat_resolver import ChatIdResolver
+from .greeting_template import GreetingTemplateEngine
+from .page_loader import load_page, wait_for_any, find_first
+from .http_session import build_session_from_driver, sync_cookies_from_driver
+from .websocket_chat import SEND_SENT, SEND_UNACKED, SEND_FAILED
+
+
+GREETINGS = metrics.counter('zhilian_greetings_total', '打招呼结果', ('channel', 'result'))
+GREETING_SECONDS = metrics.histogram('zhilian_greeting_seconds', '单次打招呼耗时（秒）', ('channel',))
 
 
 class InteractionManager:
     """候选人互动管理类"""
     
-    def __init__(self, driver):
+    def __init__(self, driver, websocket_manager=None, chat_resolver: ChatIdResolver = None,
+                 wait: WebDriverWait = None):
         self.driver = driver
-        self.wait = WebDriverWait(driver, settings.BROWSER_TIMEOUT)
+        self.wait = wait or WebDriverWait(driver, settings.BROWSER_TIMEOUT)
+        
+        # 快速打招呼通道：已知聊天ID时直接经WebSocket/聊天接口发送
+        self.websocket_manager = websocket_manager
+        self.chat_resolver = chat_resolver or ChatIdResolver()
+        self.http_session = None
         
         # 预设的打招呼模板
         self.greeting_templates = [
@@ -29,17 +44,23 @@ class InteractionManager:
             "您好，我是{company}的招聘负责人，您的背景很符合我们的需求，方便聊聊吗？",
             "您好，我们是一家{industry}公司，看到您的简历很优秀，想邀请您了解一下我们的职位。"
         ]
+        self.template_engine = GreetingTemplateEngine(self.greeting_templates)
     
+    @traced('send_greeting')
     def send_greeting(self, 
                      candidate_url: str, 
                      message: str = None,
                      company: str = "我们公司",
                      position: str = "相关职位",
                      skill: str = "技术",
-                     industry: str = "互联网") -> bool:
+                     industry: str = "互联网",
+                     chat_id: str = None) -> bool:
         """
         向候选人发送打招呼消息
         
+        已知（或可解析出）聊天ID时直接经WebSocket/聊天接口发送；
+        否则回退到打开详情页、点击联系按钮的页面流程。
+        
         Args:
             candidate_url: 候选人详情页URL
             message: 自定义消息，如果为空则使用模板
@@ -47,57 +68,146 @@ class InteractionManager:
             position: 职位名称
             skill: 技能关键词
             industry: 行业类型
+            chat_id: 聊天ID，为空时通过解析器查找
             
         Returns:
             是否发送成功
         """
+        started = time.perf_counter()
         try:
             log.info(f"向候选人发送打招呼: {candidate_url}")
             
+            # 生成或使用自定义消息
+            if not message:
+                message = self._generate_greeting_message(
+                    company=company,
+                    position=position,
+                    skill=skill,
+                    industry=industry
+                )
+            
+            # 快速通道
+            chat_id = chat_id or self.chat_resolver.resolve(candidate_url, self.driver)
+            if chat_id:
+                outcome = self._send_greeting_fast(chat_id, message)
+                if outcome == SEND_SENT:
+                    self.chat_resolver.learn(candidate_url, chat_id)
+                    log.info(f"打招呼消息发送成功（快速通道，聊天ID: {chat_id}）")
+                    return self._record_greeting(True, 'fast', started)
+                if outcome == SEND_UNACKED:
+                    # 消息可能已经送达，换通道重发会重复打招呼；按已发送处理，不记住这个聊天ID
+                    log.warning(f"打招呼消息已发出但未收到确认，不再重发（聊天ID: {chat_id}）")
+                    return self._record_greeting(True, 'fast', started, result=SEND_UNACKED)
+                log.debug("快速通道发送失败，回退到页面流程")
+            
             # 访问候选人详情页
-            self.driver.get(candidate_url)
-            time.sleep(settings.REQUEST_DELAY)
+            load_page(self.driver, candidate_url, 'detail')
+            with tracer.span('sleep', reason='after_page_load'):
+                time.sleep(settings.REQUEST_DELAY)
             
             # 查找并点击"打招呼"或"沟通"按钮
             if not self._click_contact_button():
                 log.error("未找到联系按钮")
-                return False
+                return self._record_greeting(False, 'page', started)
             
             # 等待消息输入框出现
             if not self._wait_for_message_input():
                 log.error("消息输入框未出现")
-                return False
-            
-            # 生成或使用自定义消息
-            if not message:
-                message = self._generate_greeting_message(
-                    company=company,
-                    position=position,
-                    skill=skill,
-                    industry=industry
-                )
+                return self._record_greeting(False, 'page', started)
             
             # 输入消息
             if not self._input_message(message):
                 log.error("输入消息失败")
-                return False
+                return self._record_greeting(False, 'page', started)
             
             # 发送消息
             if not self._send_message():
                 log.error("发送消息失败")
-                return False
+                return self._record_greeting(False, 'page', started)
+            
+            # 记住聊天ID，下次直接走快速通道
+            self.chat_resolver.learn_from_driver(candidate_url, self.driver)
             
             log.info("打招呼消息发送成功")
-            return True
+            return self._record_greeting(True, 'page', started)
             
         except Exception as e:
             log.error(f"发送打招呼失败: {e}")
-            return False
+            return self._record_greeting(False, 'page', started)
+    
+    @staticmethod
+    def _record_greeting(success: bool, channel: str, started: float, result: str = None) -> bool:
+        """记录打招呼指标，原样返回结果"""
+        GREETINGS.inc(channel=channel, result=result or ('sent' if success else 'failed'))
+        GREETING_SECONDS.observe(time.perf_counter() - started, channel=channel)
+        return success
+    
+    @traced('greeting.fast_channel')
+    def _send_greeting_fast(self, chat_id: str, message: str) -> str:
+        """
+        不打开页面，直接经WebSocket或聊天HTTP接口发送消息
+
+        Returns:
+            SEND_SENT / SEND_FAILED；WebSocket帧已发出但未收到确认时返回 SEND_UNACKED，
+            此时不再尝试HTTP接口，调用方也不应回退到页面流程
+        """
+        try:
+            # WebSocket已连接时优先使用，收到服务端确认才算发送成功
+            if self.websocket_manager and self.websocket_manager.is_connected:
+                outcome = self.websocket_manager.deliver_chat_message(chat_id, message,
+                                                                      ack_timeout=settings.WS_ACK_TIMEOUT)
+                if outcome != SEND_FAILED:
+                    return outcome
+            
+            # 站内聊天HTTP接口
+            if settings.ZHILIAN_CHAT_SEND_API:
+                if self.http_session is None:
+                    self.http_session = build_session_from_driver(self.driver, referer="https://i.zhaopin.com/chat")
+                else:
+                    sync_cookies_from_driver(self.http_session, self.driver)
+                
+                response = self.http_session.post(
+                    settings.ZHILIAN_CHAT_SEND_API,
+                    json={
+                        'chatId': chat_id,
+                        'content': message,
+                        'type': 'text'
+                    },
+                    timeout=10
+                )
+                
+                if response.status_code == 200:
+                    try:
+                        code = response.json().get('code')
+                    except ValueError:
+                        code = None
+                    if code in (None, 0, 200):
+                        return SEND_SENT
+                log.warning(f"聊天接口发送失败，状态码: {response.status_code}")
+            
+            return SEND_FAILED
+            
+        except Exception as e:
+            log.warning(f"快速通道发送失败: {e}")
+            return SEND_FAILED
     
+    # 消息输入框的候选选择器
+    MESSAGE_INPUT_SELECTORS = [
+        "textarea[placeholder*='消息']",
+        "textarea[placeholder*='打招呼']",
+        "textarea[placeholder*='沟通']",
+        ".message-input",
+        ".chat-input",
+        "textarea.form-control",
+        "#messageContent",
+        "textarea[name='content']"
+    ]
+    
+    @traced('greeting.click_contact')
     def _click_contact_button(self) -> bool:
         """点击联系按钮"""
         try:
-            # 尝试多种可能的按钮文本和类名
+            # 尝试多种可能的按钮文本和类名，所有选择器共享一个等待时间
             button_selectors = [
                 "//button[contains(text(), '打招呼')]",
                 "//button[contains(text(), '沟通')]",
@@ -109,101 +219,66 @@ class InteractionManager:
                 ".chat-btn"
             ]
             
-            for selector in button_selectors:
-                try:
-                    if selector.startswith("//"):
-                        button = self.wait.until(
-                            EC.element_to_be_clickable((By.XPATH, selector))
-                        )
-                    else:
-                        button = self.wait.until(
-                            EC.element_to_be_clickable((By.CSS_SELECTOR, selector))
-                        )
-                    
-                    button.click()
-                    time.sleep(1)
-                    return True
-                    
-                except TimeoutException:
-                    continue
-                except Exception as e:
-                    log.debug(f"尝试点击按钮失败: {selector}, {e}")
-                    continue
+            button = wait_for_any(self.driver, button_selectors,
+                                  timeout=settings.PAGE_READY_TIMEOUT, clickable=True)
+            if button is None:
+                return False
             
-            return False
+            try:
+                button.click()
+            except Exception as e:
+                log.debug(f"点击联系按钮失败，改用JavaScript点击: {e}")
+                self.driver.execute_script("arguments[0].click();", button)
+            time.sleep(1)
+            return True
             
         except Exception as e:
             log.error(f"点击联系按钮失败: {e}")
             return False
     
+    @traced('greeting.wait_input')
     def _wait_for_message_input(self) -> bool:
         """等待消息输入框出现"""
         try:
-            # 尝试多种可能的输入框选择器
-            input_selectors = [
-                "textarea[placeholder*='消息']",
-                "textarea[placeholder*='打招呼']",
-                "textarea[placeholder*='沟通']",
-                ".message-input",
-                ".chat-input",
-                "textarea.form-control",
-                "#messageContent",
-                "textarea[name='content']"
-            ]
-            
-            for selector in input_selectors:
-                try:
-                    self.wait.until(
-                        EC.presence_of_element_located((By.CSS_SELECTOR, selector))
-                    )
-                    return True
-                except TimeoutException:
-                    continue
-            
-            return False
-            
+            return wait_for_any(self.driver, self.MESSAGE_INPUT_SELECTORS,
+                                timeout=settings.PAGE_READY_TIMEOUT) is not None
         except Exception as e:
             log.error(f"等待消息输入框失败: {e}")
             return False
     
+    def set_greeting_templates(self, templates: List[str]):
+        """替换打招呼模板，模板在此处校验并编译，字段不合法时抛出ValueError"""
+        self.template_engine = GreetingTemplateEngine(templates)
+        self.greeting_templates = list(templates)
+    
+    def render_greeting(self, candidate: Dict) -> str:
+        """用候选人信息渲染打招呼消息"""
+        return self.template_engine.render(candidate)
+    
     def _generate_greeting_message(self, **kwargs) -> str:
         """生成打招呼消息"""
         try:
-            template = random.choice(self.greeting_templates)
-            message = template.format(**kwargs)
-            return message
+            return self.template_engine.render(kwargs)
         except Exception as e:
             log.error(f"生成打招呼消息失败: {e}")
-            return "您好，看到您的简历很优秀，想和您聊聊相关的职位机会。"
+            return GreetingTemplateEngine.FALLBACK_MESSAGE
     
+    @traced('greeting.input_message')
     def _input_message(self, message: str) -> bool:
         """输入消息"""
         try:
-            # 查找消息输入框
-            input_selectors = [
-                "textarea[placeholder*='消息']",
-                "textarea[placeholder*='打招呼']",
-                "textarea[placeholder*='沟通']",
-                ".message-input",
-                ".chat-input",
-                "textarea.form-control",
-                "#messageContent",
-                "textarea[name='content']"
-            ]
-            
-            input_element = None
-            for selector in input_selectors:
-                try:
-                    input_element = self.driver.find_element(By.CSS_SELECTOR, selector)
-                    if input_element.is_displayed():
-                        break
-                except:
-                    continue
+            # 查找消息输入框，优先可见的
+            input_element = (find_first(self.driver, self.MESSAGE_INPUT_SELECTORS, visible=True)
+                             or find_first(self.driver, self.MESSAGE_INPUT_SELECTORS))
             
             if not input_element:
                 log.error("未找到消息输入框")
                 return False
             
+            # 快速模式：一次execute_script写入并触发事件，读回校验失败时回退到逐字符输入
+            if settings.INPUT_MODE == "js" and self._inject_message(input_element, message):
+                return True
+            
             # 清空并输入消息
             input_element.clear()
             input_element.send_keys(message)
@@ -215,6 +290,37 @@ class InteractionManager:
             log.error(f"输入消息失败: {e}")
             return False
     
+    # 通过原生setter赋值（兼容React/Vue受控组件），再派发input/change事件，最后读回当前值
+    _INJECT_MESSAGE_SCRIPT = """
+        var el = arguments[0], value = arguments[1];
+        var proto = el.tagName === 'TEXTAREA' ? HTMLTextAreaElement.prototype : HTMLInputElement.prototype;
+        var setter = Object.getOwnPropertyDescriptor(proto, 'value');
+        el.focus();
+        if (el.isContentEditable) {
+            el.textContent = value;
+        } else if (setter && setter.set) {
+            setter.set.call(el, value);
+        } else {
+            el.value = value;
+        }
+        el.dispatchEvent(new Event('input', {bubbles: true}));
+        el.dispatchEvent(new Event('change', {bubbles: true}));
+        return el.isContentEditable ? el.textContent : el.value;
+    """
+    
+    def _inject_message(self, input_element, message: str) -> bool:
+        """用JS一次性写入消息，返回读回的值是否与消息一致"""
+        try:
+            value = self.driver.execute_script(self._INJECT_MESSAGE_SCRIPT, input_element, message)
+            if value == message:
+                return True
+            log.debug("JS输入校验失败，回退到逐字符输入")
+            return False
+        except Exception as e:
+            log.debug(f"JS输入失败，回退到逐字符输入: {e}")
+            return False
+    
+    @traced('greeting.send_message')
     def _send_message(self) -> bool:
         """发送消息"""
         try:
@@ -229,29 +335,18 @@ class InteractionManager:
                 "button[type='submit']"
             ]
             
-            for selector in send_selectors:
-                try:
-                    if selector.startswith("//"):
-                        button = self.driver.find_element(By.XPATH, selector)
-                    else:
-                        button = self.driver.find_element(By.CSS_SELECTOR, selector)
-                    
-                    if button.is_displayed() and button.is_enabled():
-                        button.click()
-                        time.sleep(1)
-                        return True
-                        
-                except:
-                    continue
+            button = find_first(self.driver, send_selectors, clickable=True)
+            if button is not None:
+                button.click()
+                time.sleep(1)
+                return True
             
             # 如果没有找到发送按钮，尝试按回车键
-            try:
-                input_element = self.driver.find_element(By.CSS_SELECTOR, "textarea")
+            input_element = find_first(self.driver, ["textarea"])
+            if input_element is not None:
                 input_element.send_keys(Keys.RETURN)
                 time.sleep(1)
                 return True
-            except:
-                pass
             
             return False
             
@@ -260,7 +355,7 @@ class InteractionManager:
             return False
     
     def batch_greeting(self, 
-                      candidates: List[Dict], 
+                      candidates: Iterable[Dict], 
                       message_template: str = None,
                       delay_range: tuple = (3, 8),
                       max_count: int = 50) -> Dict:
@@ -268,7 +363,7 @@ class InteractionManager:
         批量发送打招呼消息
         
         Args:
-            candidates: 候选人列表
+            candidates: 候选人列表，也可以是 iter_candidates 产出的生成器（边搜索边打招呼）
             message_template: 消息模板
             delay_range: 发送间隔范围（秒）
             max_count: 最大发送数量
@@ -277,7 +372,14 @@ class InteractionManager:
             发送结果统计
         """
         try:
-            log.info(f"开始批量发送打招呼，候选人数量: {len(candidates)}")
+            # 候选人列表一次性预渲染消息并预检缺失字段；流式候选人逐个渲染
+            rendered_messages = {}
+            if isinstance(candidates, list):
+                log.info(f"开始批量发送打招呼，候选人数量: {len(candidates)}")
+                if not message_template:
+                    rendered_messages = self.template_engine.render_batch(candidates[:max_count])
+            else:
+                log.info("开始批量发送打招呼（流式候选人）")
             
             results = {
                 'total': 0,
@@ -298,12 +400,15 @@ class InteractionManager:
                         log.warning(f"候选人 {candidate.get('name', '未知')} 没有详情页URL")
                         continue
                     
+                    message = message_template or rendered_messages.get(profile_url) or self.render_greeting(candidate)
+                    
                     # 发送打招呼
                     success = self.send_greeting(
                         candidate_url=profile_url,
-                        message=message_template,
+                        message=message,
                         company=candidate.get('company', '我们公司'),
-                        position=candidate.get('name', '相关职位')
+                        position=candidate.get('name', '相关职位'),
+                        chat_id=candidate.get('chat_id')
                     )
                     
                     result_detail = {
@@ -346,7 +451,7 @@ class InteractionManager:
     def check_message_status(self, candidate_url: str) -> Dict:
         """检查消息状态"""
         try:
-            self.driver.get(candidate_url)
+            load_page(self.driver, candidate_url, 'chat')
             time.sleep(settings.REQUEST_DELAY)
             
             status = {
@@ -368,7 +473,7 @@ class InteractionManager:
     def get_conversation_history(self, candidate_url: str) -> List[Dict]:
         """获取对话历史"""
         try:
-            self.driver.get(candidate_url)
+            load_page(self.driver, candidate_url, 'chat')
             time.sleep(settings.REQUEST_DELAY)
             
             messages = []
@@ -388,7 +493,7 @@ class InteractionManager:
             log.info(f"发送跟进消息: {candidate_url}")
             
             # 访问对话页面
-            self.driver.get(candidate_url)
+            load_page(self.driver, candidate_url, 'chat')
             time.sleep(settings.REQUEST_DELAY)
             
             # 输入并发送消息
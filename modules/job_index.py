@@ -0,0 +1,248 @@
+"""
+本地职位索引 - 用SQLite FTS5为已抓取的职位详情建立全文索引，重复查询直接在本地完成
+"""
+import json
+import time
+import sqlite3
+import threading
+from typing import Dict, Iterable, List, Optional
+
+from config import settings
+from utils import log
+from .normalizer import normalize_candidate, tokenize
+from .candidate_filter import CandidateFilter
+
+# normalize_candidate 写入的数值字段，合并后按新的文本字段重新计算
+_NORMALIZED_FIELDS = ('salary_min', 'salary_max', 'experience_min', 'experience_max', 'education_level')
+
+
+class LocalJobIndex:
+    """本地职位索引
+
+    jobs 表保存每个职位的完整字典和规范化数值字段；jobs_fts 为FTS5全文索引，行号与 jobs 的 rowid 一致，
+    索引内容是职位名、公司、技能、详情文本和自我评价经 tokenize 切分后的词（中文按相邻两字），
+    这样两个字的中文查询词也能命中。SQLite 未编译FTS5时退化为 LIKE 匹配。
+    """
+
+    def __init__(self, db_file: str = None):
+        self.db_file = db_file or settings.JOB_INDEX_FILE
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(self.db_file, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.fts_enabled = True
+        self._create_schema()
+
+    def _create_schema(self):
+        with self.lock, self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    url TEXT PRIMARY KEY,
+                    name TEXT,
+                    company TEXT,
+                    salary_min REAL,
+                    salary_max REAL,
+                    experience_min REAL,
+                    experience_max REAL,
+                    education_level INTEGER,
+                    has_detail INTEGER DEFAULT 0,
+                    fetched_at REAL,
+                    search_text TEXT,
+                    data TEXT
+                )
+            """)
+            try:
+                # 旧版本按 url 列关联（url 未建索引，每次更新都要全表扫描），按 rowid 重建
+                columns = [row[1] for row in self.conn.execute("PRAGMA table_info(jobs_fts)")]
+                if 'url' in columns:
+                    log.info("升级本地全文索引结构")
+                    self.conn.execute("DROP TABLE jobs_fts")
+                    columns = []
+                self.conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5(content)")
+                if not columns:
+                    self._rebuild_fts()
+            except sqlite3.OperationalError as e:
+                log.warning(f"SQLite不支持FTS5，本地搜索改用LIKE匹配: {e}")
+                self.fts_enabled = False
+
+    def _rebuild_fts(self):
+        """由 jobs 表重新生成全文索引"""
+        rows = self.conn.execute("SELECT rowid, search_text FROM jobs").fetchall()
+        self.conn.executemany(
+            "INSERT INTO jobs_fts (rowid, content) VALUES (?, ?)",
+            ((row['rowid'], " ".join(tokenize(row['search_text'] or ''))) for row in rows)
+        )
+
+    @staticmethod
+    def _url(job: Dict) -> str:
+        return job.get('profile_url') or job.get('url') or ''
+
+    @staticmethod
+    def _search_text(job: Dict) -> str:
+        """需要被全文检索的字段"""
+        parts = [job.get('name', ''), job.get('company', '')]
+        skills = job.get('skills') or []
+        parts.append(" ".join(skills) if isinstance(skills, (list, tuple)) else str(skills))
+        parts.append(job.get('description', ''))
+        parts.append(job.get('self_evaluation', ''))
+        for experience in job.get('work_experience') or []:
+            if isinstance(experience, dict):
+                parts.extend(str(value) for value in experience.values())
+        return "\n".join(str(part) for part in parts if part)
+
+    @staticmethod
+    def _merge(existing: Dict, job: Dict) -> Dict:
+        """把新数据合并到已保存的职位上：只有非空字段覆盖旧值（详情页解析失败时的"未知"占位也算空）"""
+        merged = dict(existing)
+        for key, value in job.items():
+            if value in (None, '', [], {}) or (isinstance(value, str) and value.startswith('未知')):
+                continue
+            merged[key] = value
+        for key in _NORMALIZED_FIELDS:
+            merged.pop(key, None)
+        return merged
+
+    def add(self, job: Dict, has_detail: bool = None) -> bool:
+        """添加或更新一个职位（搜索结果或详情）"""
+        return self.add_many([job], has_detail) == 1
+
+    def add_many(self, jobs: Iterable[Dict], has_detail: bool = None) -> int:
+        """
+        批量添加或更新职位
+
+        Args:
+            jobs: 职位字典（search_candidates 或 get_candidate_detail 的结果）
+            has_detail: 是否为详情数据；为None时根据是否有 description 字段判断。
+                已有详情的职位不会被后来的搜索结果覆盖；详情合并到已保存的卡片数据上，
+                卡片上的名称、公司、薪资等字段在详情缺失时保留
+
+        Returns:
+            写入的数量
+        """
+        now = time.time()
+        count = 0
+        with self.lock, self.conn:
+            for job in jobs:
+                url = self._url(job)
+                if not url or job.get('error'):
+                    continue
+
+                detail = bool(job.get('description')) if has_detail is None else has_detail
+                row = self.conn.execute("SELECT rowid, has_detail, data FROM jobs WHERE url = ?", (url,)).fetchone()
+                if row and row['has_detail'] and not detail:
+                    continue
+
+                if row and row['data']:
+                    job = self._merge(json.loads(row['data']), job)
+                    detail = detail or bool(row['has_detail'])
+                normalize_candidate(job)
+                search_text = self._search_text(job)
+                cursor = self.conn.execute(
+                    """INSERT OR REPLACE INTO jobs (url, name, company, salary_min, salary_max, experience_min,
+                       experience_max, education_level, has_detail, fetched_at, search_text, data)
+                       VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                    (url, job.get('name'), job.get('company'), job.get('salary_min'), job.get('salary_max'),
+                     job.get('experience_min'), job.get('experience_max'), job.get('education_level'),
+                     int(detail), now, search_text, json.dumps(job, ensure_ascii=False))
+                )
+                if self.fts_enabled:
+                    # REPLACE 会删除旧行并分配新的 rowid，全文索引按 rowid 同步
+                    if row:
+                        self.conn.execute("DELETE FROM jobs_fts WHERE rowid = ?", (row['rowid'],))
+                    self.conn.execute(
+                        "INSERT INTO jobs_fts (rowid, content) VALUES (?, ?)",
+                        (cursor.lastrowid, " ".join(tokenize(search_text)))
+                    )
+                count += 1
+        return count
+
+    def get(self, url: str, detail_only: bool = False) -> Optional[Dict]:
+        """按URL取回已保存的职位；detail_only 为True时只返回已收录详情的职位（不返回只有搜索卡片的行）"""
+        sql = "SELECT data FROM jobs WHERE url = ?" + (" AND has_detail = 1" if detail_only else "")
+        with self.lock:
+            row = self.conn.execute(sql, (url,)).fetchone()
+        return json.loads(row['data']) if row else None
+
+    def is_fresh(self, url: str, max_age: float = None) -> bool:
+        """职位详情是否已在索引中且未过期（max_age 为秒，默认 JOB_INDEX_MAX_AGE_HOURS）"""
+        max_age = settings.JOB_INDEX_MAX_AGE_HOURS * 3600 if max_age is None else max_age
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT fetched_at FROM jobs WHERE url = ? AND has_detail = 1", (url,)
+            ).fetchone()
+        return bool(row) and time.time() - row['fetched_at'] <= max_age
+
+    def stale_urls(self, urls: Iterable[str], max_age: float = None) -> List[str]:
+        """返回需要重新抓取的URL（未收录详情或已过期）"""
+        return [url for url in urls if url and not self.is_fresh(url, max_age)]
+
+    def search_local(self,
+                     query: str = "",
+                     filters=None,
+                     limit: int = 50,
+                     max_age: float = None) -> List[Dict]:
+        """
+        在本地索引中搜索职位
+
+        Args:
+            query: 查询词（职位、技能、公司、详情中的任意词），为空时只按筛选条件
+            filters: CandidateFilter 或其参数字典（salary_min / education_levels / experience_min / experience_max）
+            limit: 最多返回条数
+            max_age: 只返回该秒数内抓取的职位
+
+        Returns:
+            职位字典列表，有查询词时按相关度排序，否则按抓取时间倒序
+        """
+        started = time.perf_counter()
+        if isinstance(filters, dict):
+            filters = CandidateFilter.from_params(filters)
+
+        # 没有额外筛选时直接在SQL中截断，否则取出全部命中再逐条筛选
+        sql_limit = limit if filters is None and max_age is None else None
+        rows = self._match(query, sql_limit)
+        results = []
+        cutoff = time.time() - max_age if max_age is not None else None
+        for row in rows:
+            if cutoff is not None and row['fetched_at'] < cutoff:
+                continue
+            job = json.loads(row['data'])
+            if filters is not None and not filters.matches(job):
+                continue
+            results.append(job)
+            if limit is not None and len(results) >= limit:
+                break
+
+        log.debug(f"本地搜索 \"{query}\" 返回 {len(results)} 条，耗时 {(time.perf_counter() - started) * 1000:.1f}ms")
+        return results
+
+    def _match(self, query: str, limit: int = None) -> List[sqlite3.Row]:
+        terms = list(dict.fromkeys(tokenize(query)))
+        limit_clause = f" LIMIT {int(limit)}" if limit is not None else ""
+        with self.lock:
+            if not terms:
+                return self.conn.execute(
+                    "SELECT data, fetched_at FROM jobs ORDER BY fetched_at DESC" + limit_clause
+                ).fetchall()
+
+            if self.fts_enabled:
+                # 每个词作为带引号的短语，全部命中才返回，按bm25排序
+                match = " AND ".join('"' + term.replace('"', '""') + '"' for term in terms)
+                return self.conn.execute(
+                    """SELECT jobs.data, jobs.fetched_at FROM jobs_fts
+                       JOIN jobs ON jobs.rowid = jobs_fts.rowid
+                       WHERE jobs_fts MATCH ? ORDER BY bm25(jobs_fts)""" + limit_clause,
+                    (match,)
+                ).fetchall()
+
+            clauses = " AND ".join("LOWER(search_text) LIKE ?" for _ in terms)
+            return self.conn.execute(
+                f"SELECT data, fetched_at FROM jobs WHERE {clauses} ORDER BY fetched_at DESC" + limit_clause,
+                [f"%{term}%" for term in terms]
+            ).fetchall()
+
+    def count(self) -> int:
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
@@ -8,22 +8,39 @@ from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
 from PIL import Image
 import base64
 
 from config import settings
-from utils import log
+from utils import log, metrics
+from .browser_profiles import build_chrome_prefs, apply_resource_profile, collect_page_metrics
+from .page_loader import launch_page_load_strategy, load_page, wait_for_any, find_first
+from .network_capture import NetworkCapture
+from .driver_resolver import ChromeDriverResolver
+from .user_data import account_profile_dir
+
+
+BROWSER_STARTUP_SECONDS = metrics.gauge('zhilian_browser_startup_seconds', '最近一次浏览器启动各阶段耗时（秒）', ('phase',))
+LOGGED_IN = metrics.gauge('zhilian_logged_in', '最近一次检查时是否已登录（1/0）')
 
 
 class ZhilianLogin:
     """智联招聘登录类"""
     
-    def __init__(self):
+    def __init__(self, user_data_dir: str = None):
+        """
+        Args:
+            user_data_dir: Chrome用户数据目录，默认为当前账号的持久化模板（未配置 CHROME_PROFILE_DIR 时不使用）
+        """
+        self.user_data_dir = user_data_dir or account_profile_dir()
         self.driver = None
         self.wait = None
+        self.resource_profile = None
+        self.network_capture = None
+        self.startup_metrics = {}
         self._setup_driver()
     
     def _setup_driver(self):
@@ -31,6 +48,9 @@ class ZhilianLogin:
         try:
             chrome_options = Options()
             
+            # 页面加载策略：抓取页面使用eager，DOM就绪即返回，不等待图片等子资源
+            chrome_options.page_load_strategy = launch_page_load_strategy()
+            
             if settings.HEADLESS:
                 chrome_options.add_argument("--headless")
             
@@ -44,21 +64,95 @@ class ZhilianLogin:
             # 设置用户代理
             chrome_options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
             
-            service = Service(ChromeDriverManager().install())
-            self.driver = webdriver.Chrome(service=service, options=chrome_options)
+            # 持久化用户数据：保留登录态、HTTP缓存和站点数据，重启后不必重新登录和冷加载
+            if self.user_data_dir:
+                chrome_options.add_argument(f"--user-data-dir={self.user_data_dir}")
+                log.info(f"使用浏览器用户数据目录: {self.user_data_dir}")
+            
+            # 开启performance日志，供网络抓包读取XHR响应和WebSocket地址
+            if settings.NETWORK_CAPTURE:
+                chrome_options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+            
+            # 资源拦截：启动时的首选项（图片开关只能在启动时设置）
+            if settings.RESOURCE_BLOCKING:
+                chrome_options.add_experimental_option("prefs", build_chrome_prefs(settings.RESOURCE_LAUNCH_PROFILE))
+            
+            self.driver = self._launch_browser(chrome_options)
             
             # 执行脚本隐藏webdriver特征
             self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
             
-            self.driver.implicitly_wait(settings.IMPLICIT_WAIT)
+            # 默认不使用隐式等待：每次查找未命中都会白等IMPLICIT_WAIT秒
+            if settings.IMPLICIT_WAIT:
+                self.driver.implicitly_wait(settings.IMPLICIT_WAIT)
             self.wait = WebDriverWait(self.driver, settings.BROWSER_TIMEOUT)
             
+            # 资源拦截：运行时的URL屏蔽规则
+            if settings.RESOURCE_BLOCKING:
+                self.use_resource_profile(settings.RESOURCE_LAUNCH_PROFILE)
+            
+            self.network_capture = NetworkCapture(self.driver)
+            
             log.info("浏览器驱动初始化成功")
             
         except Exception as e:
             log.error(f"浏览器驱动初始化失败: {e}")
             raise
     
+    def _launch_browser(self, chrome_options):
+        """解析chromedriver并启动浏览器，记录启动耗时"""
+        resolver = ChromeDriverResolver()
+        started = time.perf_counter()
+        driver_path = resolver.resolve()
+        
+        launch_started = time.perf_counter()
+        try:
+            driver = webdriver.Chrome(service=Service(driver_path), options=chrome_options)
+        except Exception as e:
+            # 浏览器升级后本地驱动版本不匹配：清除清单，允许下载时跳过本地驱动重新下载一次
+            if "only supports Chrome version" not in str(e) or not settings.CHROMEDRIVER_AUTO_DOWNLOAD:
+                raise
+            log.warning(f"chromedriver与浏览器版本不匹配，重新下载: {e}")
+            resolver.invalidate()
+            driver_path = resolver.resolve(force_download=True)
+            launch_started = time.perf_counter()
+            driver = webdriver.Chrome(service=Service(driver_path), options=chrome_options)
+        
+        finished = time.perf_counter()
+        self.startup_metrics = {
+            'driver_version': resolver.last_resolution.get('version'),
+            'driver_source': resolver.last_resolution.get('source'),
+            'driver_resolve_ms': resolver.last_resolution.get('resolve_ms'),
+            'browser_launch_ms': round((finished - launch_started) * 1000, 1),
+            'startup_ms': round((finished - started) * 1000, 1)
+        }
+        for phase in ('driver_resolve', 'browser_launch', 'startup'):
+            BROWSER_STARTUP_SECONDS.set((self.startup_metrics[f'{phase}_ms'] or 0) / 1000, phase=phase)
+        log.info(f"浏览器启动耗时 {self.startup_metrics['startup_ms']:.0f}ms"
+                 f"（驱动解析 {self.startup_metrics['driver_resolve_ms']:.0f}ms，"
+                 f"浏览器启动 {self.startup_metrics['browser_launch_ms']:.0f}ms）")
+        return driver
+    
+    def use_resource_profile(self, profile_name: str) -> bool:
+        """
+        切换资源拦截配置
+        
+        login: 保留图片（验证码、二维码），只屏蔽统计脚本
+        scrape: 屏蔽图片、字体、媒体和统计脚本
+        none: 不拦截
+        """
+        if not settings.RESOURCE_BLOCKING or profile_name == self.resource_profile:
+            return True
+        
+        if apply_resource_profile(self.driver, profile_name):
+            self.resource_profile = profile_name
+            return True
+        return False
+    
+    def get_page_metrics(self) -> dict:
+        """当前页面的加载耗时和传输字节数"""
+        return collect_page_metrics(self.driver)
+    
     def login_with_sms(self, phone_number: str = None) -> bool:
         """使用手机验证码登录"""
         try:
@@ -72,8 +166,7 @@ class ZhilianLogin:
             log.info("开始手机验证码登录...")
             
             # 访问登录页面
-            self.driver.get(settings.ZHILIAN_LOGIN_URL)
-            time.sleep(2)
+            load_page(self.driver, settings.ZHILIAN_LOGIN_URL, 'login')
             
             # 输入手机号
             try:
@@ -87,12 +180,8 @@ class ZhilianLogin:
                 log.error(f"输入手机号失败: {e}")
                 return False
             
-            # 勾选用户协议 - 增强稳定性
+            # 勾选用户协议 - 等待复选框出现，不固定等待
             try:
-                # 等待页面稳定
-                time.sleep(2)
-                
-                # 查找并勾选用户协议复选框
                 agreement_selectors = [
                     "//input[@type='checkbox']",
                     "//span[contains(text(), '已阅读并同意')]/../input",
@@ -105,57 +194,31 @@ class ZhilianLogin:
                     "#protocol"
                 ]
                 
-                agreement_checked = False
-                for selector in agreement_selectors:
-                    try:
-                        # 重新查找元素，避免stale element
-                        if selector.startswith("//"):
-                            checkbox = self.driver.find_element(By.XPATH, selector)
-                        else:
-                            checkbox = self.driver.find_element(By.CSS_SELECTOR, selector)
-                        
-                        if checkbox.is_displayed():
-                            # 检查是否已经勾选
-                            if not checkbox.is_selected():
-                                # 使用JavaScript点击，更稳定
-                                try:
-                                    self.driver.execute_script("arguments[0].click();", checkbox)
-                                    log.info("已勾选用户服务协议（JavaScript方式）")
-                                except:
-                                    # 如果JavaScript失败，尝试普通点击
-                                    try:
-                                        checkbox.click()
-                                        log.info("已勾选用户服务协议（普通方式）")
-                                    except:
-                                        # 尝试点击父元素
-                                        parent = checkbox.find_element(By.XPATH, "..")
-                                        parent.click()
-                                        log.info("已勾选用户服务协议（点击父元素）")
-                                
-                                agreement_checked = True
-                                break
-                            else:
-                                log.info("用户服务协议已勾选")
-                                agreement_checked = True
-                                break
-                    except Exception as inner_e:
-                        log.debug(f"尝试选择器 {selector} 失败: {inner_e}")
-                        continue
-                
-                if not agreement_checked:
+                checkbox = wait_for_any(self.driver, agreement_selectors, visible=True)
+                if checkbox is None:
                     log.warning("未找到用户协议复选框，继续执行...")
-                
-                time.sleep(1)
+                elif checkbox.is_selected():
+                    log.info("用户服务协议已勾选")
+                else:
+                    # 使用JavaScript点击，更稳定
+                    try:
+                        self.driver.execute_script("arguments[0].click();", checkbox)
+                        log.info("已勾选用户服务协议（JavaScript方式）")
+                    except:
+                        # 如果JavaScript失败，尝试普通点击
+                        try:
+                            checkbox.click()
+                            log.info("已勾选用户服务协议（普通方式）")
+                        except:
+                            # 尝试点击父元素
+                            checkbox.find_element(By.XPATH, "..").click()
+                            log.info("已勾选用户服务协议（点击父元素）")
                 
             except Exception as e:
                 log.warning(f"勾选用户协议失败，继续执行: {e}")
             
-            # 点击获取验证码按钮 - 重新查找元素避免stale element
+            # 点击获取验证码按钮 - 等待按钮可点击，所有选择器共享一个超时
             try:
-                # 等待一下确保页面稳定
-                time.sleep(1)
-                
-                # 重新查找获取验证码按钮，尝试多种选择器
                 sms_button_selectors = [
                     "//button[contains(text(), '获取验证码')]",
                     "//button[contains(text(), '发送验证码')]",
@@ -167,20 +230,7 @@ class ZhilianLogin:
                     "#getCodeBtn"
                 ]
                 
-                sms_button = None
-                for selector in sms_button_selectors:
-                    try:
-                        if selector.startswith("//"):
-                            button = self.driver.find_element(By.XPATH, selector)
-                        else:
-                            button = self.driver.find_element(By.CSS_SELECTOR, selector)
-                        
-                        if button.is_displayed() and button.is_enabled():
-                            sms_button = button
-                            break
-                    except:
-                        continue
-                
+                sms_button = wait_for_any(self.driver, sms_button_selectors, clickable=True)
                 if sms_button:
                     # 使用JavaScript点击，避免元素被遮挡
                     try:
@@ -190,8 +240,6 @@ class ZhilianLogin:
                         # 如果JavaScript点击失败，尝试普通点击
                         sms_button.click()
                         log.info("已点击获取验证码按钮（普通方式）")
-                    
-                    time.sleep(2)
                 else:
                     # 可能验证码按钮已经被点击过，或者页面结构发生变化
                     log.warning("未找到获取验证码按钮，可能已经发送过验证码")
@@ -212,18 +260,10 @@ class ZhilianLogin:
                             "//input[@type='text'][contains(@name, 'verify')]"
                         ]
                         
-                        code_input_found = False
-                        for selector in code_input_selectors:
-                            try:
-                                code_input = self.driver.find_element(By.XPATH, selector)
-                                if code_input.is_displayed():
-                                    log.info(f"发现验证码输入框（选择器: {selector}），继续等待用户输入...")
-                                    code_input_found = True
-                                    break
-                            except:
-                                continue
-                        
-                        if not code_input_found:
+                        code_input_found = wait_for_any(self.driver, code_input_selectors, visible=True) is not None
+                        if code_input_found:
+                            log.info("发现验证码输入框，继续等待用户输入...")
+                        else:
                             # 尝试查找所有可见的文本输入框
                             all_inputs = self.driver.find_elements(By.XPATH, "//input[@type='text']")
                             visible_inputs = [inp for inp in all_inputs if inp.is_displayed()]
@@ -315,19 +355,8 @@ class ZhilianLogin:
                         "//div[contains(@class, 'login')]//input[@type='text'][last()]"  # 最后一个文本输入框
                     ]
                     
-                    sms_input = None
-                    found_selector = None
-                    for selector in sms_input_selectors:
-                        try:
-                            input_elem = self.driver.find_element(By.XPATH, selector)
-                            if input_elem.is_displayed():
-                                sms_input = input_elem
-                                found_selector = selector
-                                log.info(f"🔍 在检测循环中找到验证码输入框: {selector}")
-                                break
-                        except:
-                            continue
-                    
+                    # 本身就在轮询，这里只立即查找一次，不额外等待
+                    sms_input = find_first(self.driver, sms_input_selectors, visible=True)
                     if not sms_input:
                         # 如果找不到验证码输入框，可能页面结构发生变化
                         # 尝试查找所有可见的文本输入框
@@ -362,28 +391,7 @@ class ZhilianLogin:
                             time.sleep(2)
                             
                             # 重新获取验证码输入框（避免stale element）
-                            # 优先使用之前成功的选择器
-                            fresh_sms_input = None
-                            if found_selector:
-                                try:
-                                    input_elem = self.driver.find_element(By.XPATH, found_selector)
-                                    if input_elem.is_displayed():
-                                        fresh_sms_input = input_elem
-                                        log.debug(f"使用之前成功的选择器重新找到验证码输入框: {found_selector}")
-                                except:
-                                    pass
-                            
-                            # 如果优先选择器失败，尝试所有选择器
-                            if not fresh_sms_input:
-                                for selector in sms_input_selectors:
-                                    try:
-                                        input_elem = self.driver.find_element(By.XPATH, selector)
-                                        if input_elem.is_displayed():
-                                            fresh_sms_input = input_elem
-                                            log.debug(f"重新找到验证码输入框: {selector}")
-                                            break
-                                    except:
-                                        continue
+                            fresh_sms_input = find_first(self.driver, sms_input_selectors, visible=True)
                             
                             # 如果重新获取失败，使用原来的输入框
                             if not fresh_sms_input:
@@ -411,22 +419,16 @@ class ZhilianLogin:
                                     ]
                                     
                                     log.info("🔍 查找登录按钮...")
+                                    login_btn = wait_for_any(self.driver, login_button_selectors, clickable=True)
                                     login_clicked = False
-                                    for i, selector in enumerate(login_button_selectors):
+                                    if login_btn:
                                         try:
-                                            login_btn = self.driver.find_element(By.XPATH, selector)
-                                            if login_btn.is_displayed() and login_btn.is_enabled():
-                                                log.info(f"🎯 找到登录按钮 {i+1}: {login_btn.text}")
-                                                # 使用JavaScript点击，更稳定
-                                                self.driver.execute_script("arguments[0].click();", login_btn)
-                                                log.info(f"✅ 已点击登录按钮: {login_btn.text}")
-                                                login_clicked = True
-                                                break
-                                            else:
-                                                log.debug(f"❌ 按钮 {i+1} 不可用: displayed={login_btn.is_displayed()}, enabled={login_btn.is_enabled()}")
+                                            # 使用JavaScript点击，更稳定
+                                            self.driver.execute_script("arguments[0].click();", login_btn)
+                                            log.info(f"✅ 已点击登录按钮: {login_btn.text}")
+                                            login_clicked = True
                                         except Exception as btn_e:
-                                            log.debug(f"❌ 按钮选择器 {i+1} 失败: {btn_e}")
-                                            continue
+                                            log.debug(f"❌ 点击登录按钮失败: {btn_e}")
                                     
                                     if not login_clicked:
                                         log.warning("🔄 未找到登录按钮，尝试按回车键提交")
@@ -437,11 +439,8 @@ class ZhilianLogin:
                                         except Exception as key_e:
                                             log.warning(f"❌ 按回车键失败: {key_e}")
                                     
-                                    # 等待登录完成
+                                    # 等待登录成功（轮询跳转，成功即返回）
                                     log.info("⏳ 等待登录结果...")
-                                    time.sleep(5)
-                                    
-                                    # 等待登录成功
                                     if self._wait_for_login_success(timeout=30):
                                         return True
                                     else:
@@ -484,7 +483,7 @@ class ZhilianLogin:
             log.info("开始二维码登录...")
             
             # 访问登录页面
-            self.driver.get(settings.ZHILIAN_LOGIN_URL)
+            load_page(self.driver, settings.ZHILIAN_LOGIN_URL, 'login')
             time.sleep(2)
             
             # 切换到二维码登录
@@ -529,13 +528,9 @@ class ZhilianLogin:
                     return True
                 
                 # 检查是否需要验证码
-                try:
-                    captcha = self.driver.find_element(By.CLASS_NAME, "captcha")
-                    if captcha.is_displayed():
-                        log.warning("需要输入验证码，请手动处理")
-                        input("请手动输入验证码并按回车继续...")
-                except:
-                    pass
+                if find_first(self.driver, [(By.CLASS_NAME, "captcha")], visible=True):
+                    log.warning("需要输入验证码，请手动处理")
+                    input("请手动输入验证码并按回车继续...")
                 
                 time.sleep(1)
             
@@ -550,39 +545,32 @@ class ZhilianLogin:
         """检查是否已登录"""
         try:
             # 访问需要登录的页面
-            self.driver.get("https://i.zhaopin.com")
-            time.sleep(2)
+            load_page(self.driver, "https://i.zhaopin.com")
             
             # 检查是否重定向到登录页面
             current_url = self.driver.current_url
             if "login" in current_url:
+                LOGGED_IN.set(0)
                 return False
             
-            # 检查是否有用户信息
-            try:
-                user_info = self.driver.find_element(By.CLASS_NAME, "user-info")
-                return user_info.is_displayed()
-            except:
-                return False
+            # 等待用户信息出现，出现即返回，不固定等待
+            user_info = wait_for_any(self.driver, [(By.CLASS_NAME, "user-info")],
+                                     timeout=settings.SELECTOR_TIMEOUT, visible=True)
+            logged_in = user_info is not None
+            LOGGED_IN.set(int(logged_in))
+            return logged_in
                 
         except Exception as e:
             log.error(f"检查登录状态失败: {e}")
+            LOGGED_IN.set(0)
             return False
     
-    def find_element_safely(self, selectors, element_type="元素"):
-        """安全地查找元素，避免stale element问题"""
-        for selector in selectors:
-            try:
-                if selector.startswith("//"):
-                    element = self.driver.find_element(By.XPATH, selector)
-                else:
-                    element = self.driver.find_element(By.CSS_SELECTOR, selector)
-                
-                if element.is_displayed():
-                    return element
-            except:
-                continue
-        return None
+    def find_element_safely(self, selectors, element_type="元素", timeout=None, clickable=False):
+        """等待任一选择器命中可见（或可点击）的元素，超时返回None；timeout 默认 SELECTOR_TIMEOUT"""
+        element = wait_for_any(self.driver, selectors, timeout=timeout, visible=True, clickable=clickable)
+        if element is None:
+            log.debug(f"未找到{element_type}")
+        return element
 
     def get_verification_code_input_robust(self):
         """稳定获取验证码输入框"""
@@ -597,7 +585,8 @@ class ZhilianLogin:
             "//input[@type='text'][contains(@id, 'verify')]"
         ]
         
-        element = self.find_element_safely(selectors, "验证码输入框")
+        # 在轮询循环中调用，只立即查找一次
+        element = find_first(self.driver, selectors, visible=True)
         if element:
             return element
         
@@ -621,8 +610,7 @@ class ZhilianLogin:
             log.info("开始稳定短信验证码登录...")
             
             # 访问登录页面
-            self.driver.get("https://passport.zhaopin.com/login")
-            time.sleep(3)
+            load_page(self.driver, "https://passport.zhaopin.com/login", 'login')
             log.info(f"📄 当前页面: {self.driver.title}")
             
             # 1. 输入手机号
@@ -633,7 +621,7 @@ class ZhilianLogin:
                 "//input[@type='tel']"
             ]
             
-            phone_input = self.find_element_safely(phone_selectors, "手机号输入框")
+            phone_input = self.find_element_safely(phone_selectors, "手机号输入框", timeout=settings.BROWSER_TIMEOUT)
             if phone_input:
                 phone_input.clear()
                 # 使用配置中的手机号
@@ -647,10 +635,9 @@ class ZhilianLogin:
                 log.error("❌ 未找到手机号输入框")
                 return False
             
-            time.sleep(2)
-            
             # 2. 勾选协议
             try:
+                wait_for_any(self.driver, ["//input[@type='checkbox']"])
                 checkboxes = self.driver.find_elements(By.XPATH, "//input[@type='checkbox']")
                 for checkbox in checkboxes:
                     if not checkbox.is_selected():
@@ -660,23 +647,19 @@ class ZhilianLogin:
             except:
                 log.warning("⚠️ 勾选协议失败")
             
-            time.sleep(2)
-            
             # 3. 点击获取验证码
             sms_selectors = [
                 "//button[contains(text(), '获取验证码')]",
                 "//button[contains(text(), '发送验证码')]"
             ]
             
-            sms_button = self.find_element_safely(sms_selectors, "获取验证码按钮")
+            sms_button = self.find_element_safely(sms_selectors, "获取验证码按钮", clickable=True)
             if sms_button:
                 self.driver.execute_script("arguments[0].click();", sms_button)
                 log.info("✅ 已点击获取验证码")
             else:
                 log.warning("⚠️ 未找到获取验证码按钮，继续...")
             
-            time.sleep(3)
-            
             # 4. 等待验证码输入
             log.info("📱 请输入验证码，程序将自动检测...")
             
@@ -727,7 +710,7 @@ class ZhilianLogin:
                                         "//button[@type='submit']"
                                     ]
                                     
-                                    login_btn = self.find_element_safely(login_selectors, "登录按钮")
+                                    login_btn = self.find_element_safely(login_selectors, "登录按钮", clickable=True)
                                     if login_btn:
                                         self.driver.execute_script("arguments[0].click();", login_btn)
                                         log.info("✅ 已点击登录按钮")
@@ -736,8 +719,13 @@ class ZhilianLogin:
                                         from selenium.webdriver.common.keys import Keys
                                         fresh_input.send_keys(Keys.RETURN)
                                     
-                                    # 等待结果
-                                    time.sleep(5)
+                                    # 等待跳转离开登录页，跳转即继续
+                                    try:
+                                        WebDriverWait(self.driver, 5).until(
+                                            lambda d: "login" not in d.current_url and "passport" not in d.current_url
+                                        )
+                                    except TimeoutException:
+                                        pass
                                     
                                     # 检查登录状态
                                     new_url = self.driver.current_url
@@ -769,26 +757,62 @@ class ZhilianLogin:
     def auto_login(self) -> bool:
         """自动登录（根据配置选择登录方式）"""
         try:
+            # 登录阶段需要加载验证码/二维码图片
+            self.use_resource_profile("login")
+            
             # 先检查是否已经登录
             if self.is_logged_in():
                 log.info("已经登录，无需重复登录")
-                return True
-            
-            if settings.LOGIN_TYPE == "sms":
-                return self.login_with_sms_robust()  # 使用稳定版本
+                success = True
+            elif settings.LOGIN_TYPE == "sms":
+                success = self.login_with_sms_robust()  # 使用稳定版本
             elif settings.LOGIN_TYPE == "qrcode":
-                return self.login_with_qrcode()
+                success = self.login_with_qrcode()
             elif settings.LOGIN_TYPE == "password":
                 log.warning("密码登录已不被支持，尝试使用手机验证码登录")
-                return self.login_with_sms_robust()  # 使用稳定版本
+                success = self.login_with_sms_robust()  # 使用稳定版本
             else:
                 log.error(f"不支持的登录方式: {settings.LOGIN_TYPE}")
                 return False
+            
+            LOGGED_IN.set(int(bool(success)))
+            
+            # 登录完成后切换到抓取配置，屏蔽图片、字体等重资源
+            if success:
+                self.use_resource_profile("scrape")
+            return success
                 
         except Exception as e:
             log.error(f"自动登录失败: {e}")
             return False
     
+    def export_cookies(self) -> list:
+        """导出当前登录态cookies"""
+        try:
+            return self.driver.get_cookies()
+        except Exception as e:
+            log.error(f"导出cookies失败: {e}")
+            return []
+    
+    def import_cookies(self, cookies: list, url: str = None) -> bool:
+        """导入cookies复用其他浏览器实例的登录态"""
+        try:
+            # 必须先打开对应域名的页面才能写入cookies
+            self.driver.get(url or settings.ZHILIAN_BASE_URL)
+            for cookie in cookies:
+                cookie = {k: v for k, v in cookie.items() if k in ('name', 'value', 'domain', 'path', 'secure', 'httpOnly', 'expiry')}
+                try:
+                    self.driver.add_cookie(cookie)
+                except Exception as e:
+                    log.debug(f"写入cookie失败 {cookie.get('name')}: {e}")
+            self.driver.refresh()
+            self.use_resource_profile("scrape")
+            log.info(f"已导入 {len(cookies)} 个cookies")
+            return True
+        except Exception as e:
+            log.error(f"导入cookies失败: {e}")
+            return False
+    
     def close(self):
         """关闭浏览器"""
         if self.driver:
@@ -3,16 +3,19 @@
 """
 import json
 import time
-import asyncio
 import threading
 from typing import Dict, List, Optional, Callable
 import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
-import aiohttp
 
 from config import settings
-from utils import log
+from utils import log, metrics, tracer
+
+
+QUEUE_DEPTH = metrics.gauge('zhilian_forwarder_queue_depth', '待转发消息数')
+FORWARDED = metrics.counter('zhilian_forwarder_messages_total', '转发消息结果', ('result',))
+BATCH_SECONDS = metrics.histogram('zhilian_forwarder_batch_seconds', '批量转发请求耗时（秒）')
 
 
 class MessageForwarder:
@@ -114,6 +117,7 @@ class MessageForwarder:
                         batch_size = min(10, len(self.message_queue))
                         messages_to_send = self.message_queue[:batch_size]
                         self.message_queue = self.message_queue[batch_size:]
+                    QUEUE_DEPTH.set(len(self.message_queue))
                 
                 if messages_to_send:
                     self._send_batch_messages(messages_to_send)
@@ -139,8 +143,9 @@ class MessageForwarder:
             # 添加到队列
             with self.queue_lock:
                 self.message_queue.append(forward_data)
+                QUEUE_DEPTH.set(len(self.message_queue))
             
-            log.debug(f"消息已添加到转发队列: {message_type}")
+            log.debug("消息已添加到转发队列: {}", message_type)
             return True
             
         except Exception as e:
@@ -214,13 +219,15 @@ class MessageForwarder:
             }
             
             # 发送到中心服务器
-            response = self.session.post(
-                f"{self.center_server_url}/messages/batch",
-                json=batch_data,
-                timeout=30
-            )
+            with BATCH_SECONDS.time(), tracer.span('forwarder.batch', size=len(messages)):
+                response = self.session.post(
+                    f"{self.center_server_url}/messages/batch",
+                    json=batch_data,
+                    timeout=30
+                )
             
             if response.status_code == 200:
+                FORWARDED.inc(len(messages), result='sent')
                 log.info(f"成功转发 {len(messages)} 条消息")
                 return True
             else:
@@ -228,25 +235,31 @@ class MessageForwarder:
                 
                 # 如果是客户端错误，不重试
                 if 400 <= response.status_code < 500:
+                    FORWARDED.inc(len(messages), result='dropped')
                     return False
                 
                 # 服务器错误，重新加入队列
-                with self.queue_lock:
-                    self.message_queue.extend(messages)
+                self._requeue(messages)
                 return False
                 
         except requests.exceptions.RequestException as e:
             log.error(f"发送消息网络错误: {e}")
             
             # 网络错误，重新加入队列
-            with self.queue_lock:
-                self.message_queue.extend(messages)
+            self._requeue(messages)
             return False
             
         except Exception as e:
             log.error(f"发送批量消息失败: {e}")
             return False
     
+    def _requeue(self, messages: List[Dict]):
+        """发送失败的消息放回队列，等待下一轮重试"""
+        FORWARDED.inc(len(messages), result='requeued')
+        with self.queue_lock:
+            self.message_queue.extend(messages)
+            QUEUE_DEPTH.set(len(self.message_queue))
+    
     def send_heartbeat(self) -> bool:
         """发送心跳包"""
         try:
@@ -365,6 +378,7 @@ class MessageForwarder:
         """清空消息队列"""
         with self.queue_lock:
             self.message_queue.clear()
+            QUEUE_DEPTH.set(0)
         log.info("消息队列已清空")
     
     def get_status(self) -> Dict:
@@ -0,0 +1,230 @@
+"""
+网络抓包模块 - 通过CDP读取站点XHR返回的JSON，直接构建候选人、聊天列表和消息
+"""
+import re
+import json
+import time
+import threading
+from collections import deque
+from typing import Dict, List, Optional, Sequence
+
+from config import settings
+from utils import log
+
+
+# 各类记录的特征字段：JSON中含有这些键的对象列表被认为是对应的数据
+JOB_HINT_KEYS = {'jobName', 'positionName', 'positionURL', 'positionUrl', 'companyName', 'salary60', 'jobId'}
+CHAT_HINT_KEYS = {'unreadCount', 'unread', 'sessionId', 'chatId', 'lastMessage', 'lastMsg'}
+MESSAGE_HINT_KEYS = {'msgId', 'messageId', 'content', 'sendTime', 'msgType', 'fromUserId'}
+
+
+class NetworkCapture:
+    """CDP网络响应捕获器
+
+    依赖浏览器开启 performance 日志（goog:loggingPrefs）。performance日志读取后即被清空，
+    因此同一个driver上的所有消费方（候选人解析、聊天、WebSocket地址提取）应共用一个实例。
+    """
+
+    def __init__(self, driver, max_responses: int = 200):
+        self.driver = driver
+        self.responses = deque(maxlen=max_responses)
+        self.websocket_urls: List[str] = []
+        self._pending = {}  # requestId -> (url, mimeType)
+        self._lock = threading.Lock()
+        self.enabled = settings.NETWORK_CAPTURE
+
+    def drain(self, fetch_bodies: bool = True) -> int:
+        """
+        读取performance日志，抓取已完成的JSON响应体，返回新增响应数
+
+        Args:
+            fetch_bodies: 为False时只消费日志（仍记录WebSocket地址），不经CDP获取响应体
+        """
+        if not self.enabled:
+            return 0
+
+        added = 0
+        with self._lock:
+            try:
+                entries = self.driver.get_log('performance')
+            except Exception as e:
+                log.debug(f"读取performance日志失败，停用网络抓包: {e}")
+                self.enabled = False
+                return 0
+
+            for entry in entries:
+                try:
+                    message = json.loads(entry['message'])['message']
+                except Exception:
+                    continue
+
+                method = message.get('method')
+                params = message.get('params', {})
+
+                if method == 'Network.responseReceived' and fetch_bodies:
+                    response = params.get('response', {})
+                    mime_type = response.get('mimeType', '')
+                    if 'json' in mime_type or params.get('type') in ('XHR', 'Fetch'):
+                        self._pending[params.get('requestId')] = response.get('url', '')
+
+                elif method == 'Network.loadingFinished':
+                    request_id = params.get('requestId')
+                    url = self._pending.pop(request_id, None)
+                    if url is not None and fetch_bodies:
+                        data = self._fetch_body(request_id)
+                        if data is not None:
+                            self.responses.append({'url': url, 'data': data, 'timestamp': time.time()})
+                            added += 1
+
+                elif method == 'Network.webSocketCreated':
+                    ws_url = params.get('url', '')
+                    if ws_url and ws_url not in self.websocket_urls:
+                        self.websocket_urls.append(ws_url)
+
+        if added:
+            log.debug("捕获到 {} 个JSON响应", added)
+        return added
+
+    def _fetch_body(self, request_id: str):
+        """通过CDP获取响应体并解析为JSON，非JSON返回None"""
+        try:
+            result = self.driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': request_id})
+            body = result.get('body', '')
+            if result.get('base64Encoded'):
+                return None
+            body = body.strip()
+            if not body or body[0] not in '{[':
+                return None
+            return json.loads(body)
+        except Exception:
+            return None
+
+    def clear(self):
+        """清空已捕获的响应（加载新页面前调用，避免混入上一页的数据），积压的日志直接丢弃，不获取响应体"""
+        self.drain(fetch_bodies=False)
+        with self._lock:
+            self.responses.clear()
+            self._pending.clear()
+
+    def find_responses(self, url_patterns: Sequence[str]) -> List[Dict]:
+        """返回URL匹配任意一个模式的已捕获响应"""
+        compiled = [re.compile(pattern) for pattern in url_patterns]
+        with self._lock:
+            return [item for item in self.responses if any(p.search(item['url']) for p in compiled)]
+
+    def wait_for_records(self, url_patterns: Sequence[str], hint_keys: set, timeout: float = None) -> List[Dict]:
+        """等待匹配的响应出现并从中提取记录列表，超时返回空列表"""
+        timeout = settings.SELECTOR_TIMEOUT if timeout is None else timeout
+        deadline = time.time() + timeout
+        while True:
+            self.drain()
+            for response in reversed(self.find_responses(url_patterns)):
+                records = extract_records(response['data'], hint_keys)
+                if records:
+                    log.debug("从接口响应中提取到 {} 条记录: {}", len(records), response['url'])
+                    return records
+            if time.time() >= deadline or not self.enabled:
+                return []
+            time.sleep(0.2)
+
+
+def extract_records(data, hint_keys: set) -> List[Dict]:
+    """在JSON中查找含特征字段最多的对象列表"""
+    best = []
+    best_score = 0
+    stack = [data]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            stack.extend(node.values())
+        elif isinstance(node, list):
+            dict_items = [item for item in node if isinstance(item, dict)]
+            if dict_items:
+                score = len(hint_keys & set(dict_items[0].keys()))
+                if score > best_score or (score == best_score and score and len(dict_items) > len(best)):
+                    best, best_score = dict_items, score
+            stack.extend(node)
+    return best if best_score else []
+
+
+def _pick(record: Dict, keys: Sequence[str], default=""):
+    """按顺序取第一个非空字段；嵌套对象取其 name/display/value"""
+    for key in keys:
+        value = record
+        for part in key.split('.'):
+            value = value.get(part) if isinstance(value, dict) else None
+        if isinstance(value, dict):
+            value = value.get('name') or value.get('display') or value.get('value')
+        if isinstance(value, list):
+            value = [item.get('name') or item.get('value') if isinstance(item, dict) else item for item in value]
+            value = [str(item) for item in value if item]
+        if value not in (None, "", []):
+            return value
+    return default
+
+
+def map_job_record(record: Dict) -> Optional[Dict]:
+    """把接口返回的职位记录映射为候选人字典（字段与DOM解析结果一致）"""
+    name = _pick(record, ('name', 'jobName', 'positionName', 'title'))
+    if not name:
+        return None
+
+    profile_url = _pick(record, ('positionURL', 'positionUrl', 'jobUrl', 'positionDetailUrl', 'url'))
+    if profile_url and profile_url.startswith('//'):
+        profile_url = f"https:{profile_url}"
+
+    candidate = {
+        'name': str(name).strip(),
+        'profile_url': profile_url,
+        'salary': _pick(record, ('salary60', 'salary', 'salaryReal', 'salaryDesc'), "面议"),
+        'location': _pick(record, ('workCity', 'city', 'cityDistrict', 'jobCity'), "未知地点"),
+        'experience': _pick(record, ('workingExp', 'workExp', 'experience'), "经验不限"),
+        'education': _pick(record, ('education', 'eduLevel', 'educationLevel'), "学历不限"),
+        'company': _pick(record, ('companyName', 'company.name', 'company'), "未知公司"),
+        'publish_time': _pick(record, ('publishTime', 'updateDate', 'createDate'), "未知时间"),
+        'source': 'api'
+    }
+
+    skills = _pick(record, ('skillLabel', 'jobSkillTags', 'skills', 'welfareTagList'), [])
+    if skills:
+        candidate['skills'] = skills if isinstance(skills, list) else [str(skills)]
+
+    # 只认 chatId：imUserId / sessionId 在职位记录里是发布者或登录会话的ID，不是可发消息的会话
+    chat_id = _pick(record, ('chatId',))
+    if chat_id:
+        candidate['chat_id'] = str(chat_id)
+
+    job_id = _pick(record, ('number', 'jobId', 'positionNumber'))
+    if job_id:
+        candidate['job_id'] = str(job_id)
+
+    return candidate
+
+
+def map_chat_record(record: Dict) -> Dict:
+    """把接口返回的会话记录映射为聊天列表项"""
+    unread = _pick(record, ('unreadCount', 'unread', 'unreadNum'), 0)
+    try:
+        unread = int(unread)
+    except (TypeError, ValueError):
+        unread = 0
+
+    return {
+        'id': str(_pick(record, ('chatId', 'sessionId', 'id'))),
+        'name': _pick(record, ('name', 'nickName', 'userName', 'targetName')),
+        'avatar': _pick(record, ('avatar', 'headUrl', 'avatarUrl')),
+        'last_message': _pick(record, ('lastMessage.content', 'lastMsg.content', 'lastMessage', 'lastMsg', 'content')),
+        'last_time': str(_pick(record, ('lastTime', 'updateTime', 'lastMessage.sendTime', 'time'))),
+        'unread_count': unread
+    }
+
+
+def map_message_record(record: Dict) -> Dict:
+    """把接口返回的消息记录映射为聊天消息"""
+    return {
+        'id': str(_pick(record, ('msgId', 'messageId', 'id'))),
+        'sender': str(_pick(record, ('senderName', 'fromUserName', 'fromUserId', 'sender'))),
+        'content': _pick(record, ('content', 'text', 'body.content', 'msg')),
+        'timestamp': str(_pick(record, ('sendTime', 'timestamp', 'createTime', 'time'))),
+        'type': _pick(record, ('msgType', 'type'), 'text')
+    }
@@ -0,0 +1,151 @@
+"""
+字段规范化模块 - 把页面/接口上的薪资、经验、学历文本解析为可比较的数值
+"""
+import re
+from typing import Dict, List, Optional, Tuple
+
+
+# 按月折算的系数：日薪按每月21.75个工作日，时薪按每天8小时
+_PERIOD_FACTORS = (
+    (('/年', '年薪', '每年'), 1 / 12),
+    (('/天', '/日', '日薪', '每天'), 21.75),
+    (('/时', '/小时', '时薪'), 21.75 * 8),
+)
+
+_UNIT_FACTORS = {'万': 10000, 'w': 10000, '千': 1000, 'k': 1000, '元': 1, '': 1}
+
+_SALARY_PART = re.compile(r'(\d+(?:\.\d+)?)\s*(万|w|千|k|元)?')
+_RANGE_SPLIT = re.compile(r'\s*(?:-|~|—|–|至|到)\s*')
+
+# 学历等级：数值越大要求越高，0 表示不限
+EDUCATION_LEVELS = (
+    (('博士',), 6),
+    (('硕士', '研究生', 'mba', 'emba'), 5),
+    (('本科', '学士'), 4),
+    (('大专', '专科'), 3),
+    (('高中', '中专', '中技', '技校', '职高'), 2),
+    (('初中',), 1),
+    (('不限',), 0),
+)
+
+
+def parse_salary(text) -> Tuple[Optional[float], Optional[float]]:
+    """
+    解析薪资文本为月薪范围（元），无法解析（如"面议"）时返回 (None, None)
+
+    支持 "1.5万-2万"、"8千-1.2万"、"15-25K·13薪"、"8000-12000元"、"10-20万/年"、"200-300元/天" 等格式，
+    "·13薪" 之类的年终月数不计入月薪。"1万以上"、"8千起" 的上限为None，表示不设上限。
+    """
+    if text is None:
+        return None, None
+    text = str(text).strip().lower().replace(',', '')
+    text = text.split('·')[0] if '·' in text else text
+    if not re.search(r'\d', text):
+        return None, None
+
+    factor = 1.0
+    for markers, period_factor in _PERIOD_FACTORS:
+        if any(marker in text for marker in markers):
+            factor = period_factor
+            break
+
+    values = []
+    units = []
+    for part in _RANGE_SPLIT.split(text)[:2]:
+        match = _SALARY_PART.search(part)
+        if not match:
+            continue
+        values.append(float(match.group(1)))
+        units.append(match.group(2) or '')
+
+    if not values:
+        return None, None
+
+    # "15-25K"：左侧没有单位时沿用右侧单位
+    if len(units) == 2 and not units[0]:
+        units[0] = units[1]
+
+    amounts = [value * _UNIT_FACTORS[unit] * factor for value, unit in zip(values, units)]
+    low = amounts[0]
+    if len(amounts) == 1 and ('以上' in text or '起' in text):
+        return round(low, 2), None
+    high = amounts[1] if len(amounts) > 1 else amounts[0]
+    return round(low, 2), round(high, 2)
+
+
+def parse_experience(text) -> Tuple[Optional[float], Optional[float]]:
+    """
+    解析工作经验文本为年限范围，上限为None表示不设上限
+
+    "经验不限" -> (0, None)，"无经验"/"应届" -> (0, 0)，"1年以下" -> (0, 1)，
+    "3-5年" -> (3, 5)，"10年以上" -> (10, None)；无法解析时返回 (None, None)。
+    """
+    if text is None:
+        return None, None
+    text = str(text).strip()
+    if not text:
+        return None, None
+
+    if '不限' in text:
+        return 0.0, None
+    if any(marker in text for marker in ('无经验', '应届', '在校', '无需经验')):
+        return 0.0, 0.0
+
+    numbers = [float(n) for n in re.findall(r'\d+(?:\.\d+)?', text)]
+    if not numbers:
+        return None, None
+    if len(numbers) >= 2:
+        return numbers[0], numbers[1]
+    if '以下' in text or '以内' in text:
+        return 0.0, numbers[0]
+    if '以上' in text:
+        return numbers[0], None
+    return numbers[0], numbers[0]
+
+
+def education_level(text) -> Optional[int]:
+    """学历文本转换为等级（见 EDUCATION_LEVELS），无法识别返回None"""
+    if text is None:
+        return None
+    text = str(text).strip().lower()
+    for names, level in EDUCATION_LEVELS:
+        if any(name in text for name in names):
+            return level
+    return None
+
+
+# normalize_candidate 写入的数值字段
+NORMALIZED_FIELDS = ('salary_min', 'salary_max', 'experience_min', 'experience_max', 'education_level')
+
+
+def normalize_candidate(candidate: Dict) -> Dict:
+    """
+    为候选人字典补充数值字段（原地修改并返回）
+
+    salary_min/salary_max 为月薪（元），experience_min/experience_max 为年限，
+    education_level 为学历等级；无法解析的字段为None，已规范化过的字典不重复解析。
+    """
+    if 'salary_min' in candidate and 'education_level' in candidate:
+        return candidate
+    candidate['salary_min'], candidate['salary_max'] = parse_salary(candidate.get('salary'))
+    candidate['experience_min'], candidate['experience_max'] = parse_experience(candidate.get('experience'))
+    candidate['education_level'] = education_level(candidate.get('education'))
+    return candidate
+
+
+_ASCII_WORD = re.compile(r'[a-z0-9][a-z0-9+#.]*')
+_CJK_RUN = re.compile(r'[一-鿿]+')
+
+
+def tokenize(text: str) -> List[str]:
+    """英文/数字按单词切分（保留 c++、c#、.net 这类写法），中文按相邻两字切分"""
+    if not text:
+        return []
+    text = str(text).lower()
+    tokens = [word.rstrip('.') for word in _ASCII_WORD.findall(text)]
+    for run in _CJK_RUN.findall(text):
+        if len(run) == 1:
+            tokens.append(run)
+        else:
+            tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+    return [token for token in tokens if token]
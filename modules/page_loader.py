@@ -0,0 +1,147 @@
+"""
+页面加载与元素查找工具 - 按页面类型控制加载等待，使用短超时的显式等待代替隐式等待
+"""
+import time
+from contextlib import contextmanager
+from typing import List, Sequence, Tuple, Union
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import TimeoutException
+
+from config import settings
+from utils import log, metrics, tracer
+
+
+PAGE_LOADS = metrics.counter('zhilian_page_loads_total', '页面加载次数', ('page_type',))
+PAGE_LOAD_SECONDS = metrics.histogram('zhilian_page_load_seconds', '页面加载耗时（秒）', ('page_type',))
+SELECTOR_MISSES = metrics.counter('zhilian_selector_misses_total', '等待选择器超时未命中的次数')
+
+Locator = Union[str, Tuple[str, str]]
+
+# 页面加载策略的等待程度，数值越大等待越久
+_STRATEGY_LEVELS = {'none': 0, 'eager': 1, 'normal': 2}
+
+
+def launch_page_load_strategy() -> str:
+    """
+    浏览器启动时使用的加载策略
+
+    driver级别的策略在会话创建后无法修改，因此以所有页面类型中等待最少的策略启动，
+    需要完整加载的页面类型由 load_page 额外等待 document.readyState == 'complete'。
+    """
+    strategies = [settings.PAGE_LOAD_STRATEGY] + list(settings.PAGE_LOAD_STRATEGIES.values())
+    strategies = [s for s in strategies if s in _STRATEGY_LEVELS]
+    return min(strategies, key=lambda s: _STRATEGY_LEVELS[s]) if strategies else 'normal'
+
+
+def page_strategy(page_type: str) -> str:
+    """页面类型对应的加载策略"""
+    return settings.PAGE_LOAD_STRATEGIES.get(page_type, settings.PAGE_LOAD_STRATEGY)
+
+
+def load_page(driver, url: str, page_type: str = 'default', timeout: float = None):
+    """按页面类型加载页面：normal 等待全部子资源，eager 在DOM就绪后返回"""
+    started = time.perf_counter()
+    try:
+        with tracer.span('load_page', page_type=page_type, url=url):
+            _load_page(driver, url, page_type, timeout)
+    finally:
+        PAGE_LOADS.inc(page_type=page_type)
+        PAGE_LOAD_SECONDS.observe(time.perf_counter() - started, page_type=page_type)
+
+
+def _load_page(driver, url: str, page_type: str, timeout: float = None):
+    driver.get(url)
+
+    # driver.get 已按启动策略等待过，只有页面类型要求更完整的加载时才额外等待
+    required = _STRATEGY_LEVELS.get(page_strategy(page_type), 2)
+    if required <= _STRATEGY_LEVELS[launch_page_load_strategy()]:
+        return
+    target_state = ('complete',) if required == 2 else ('interactive', 'complete')
+
+    try:
+        WebDriverWait(driver, timeout or settings.BROWSER_TIMEOUT).until(
+            lambda d: d.execute_script("return document.readyState") in target_state
+        )
+    except TimeoutException:
+        log.warning(f"页面加载等待超时（{page_type}）: {url}")
+
+
+def to_locator(selector: Locator) -> Tuple[str, str]:
+    """XPath字符串（以 // 开头）、CSS字符串或 (By, value) 元组统一转换为定位器"""
+    if isinstance(selector, tuple):
+        return selector
+    if selector.startswith("//") or selector.startswith("(//"):
+        return (By.XPATH, selector)
+    return (By.CSS_SELECTOR, selector)
+
+
+def find_first(root, selectors: Sequence[Locator], visible: bool = False, clickable: bool = False):
+    """
+    按顺序立即查找第一个匹配的元素，找不到返回None
+
+    使用 find_elements 而不是 find_element，未命中时既不抛异常也不触发隐式等待。
+    """
+    for selector in selectors:
+        by, value = to_locator(selector)
+        try:
+            for element in root.find_elements(by, value):
+                if clickable and not (element.is_displayed() and element.is_enabled()):
+                    continue
+                if visible and not element.is_displayed():
+                    continue
+                return element
+        except Exception:
+            continue
+    return None
+
+
+def wait_for_any(driver, selectors: Sequence[Locator], timeout: float = None,
+                 visible: bool = False, clickable: bool = False):
+    """
+    在一个超时预算内等待任意一个选择器命中，返回命中的元素，超时返回None
+
+    所有候选选择器共享同一个等待时间，避免逐个选择器各等一个完整超时。
+    """
+    timeout = settings.SELECTOR_TIMEOUT if timeout is None else timeout
+    with tracer.span('wait_for_any', timeout=timeout, selectors=len(selectors)) as span:
+        try:
+            return WebDriverWait(driver, timeout, poll_frequency=0.2).until(
+                lambda d: find_first(d, selectors, visible=visible, clickable=clickable)
+            )
+        except TimeoutException:
+            SELECTOR_MISSES.inc()
+            span.set(missed=True)
+            return None
+
+
+def find_all(root, selectors: Sequence[Locator]) -> List:
+    """返回第一个有匹配的选择器对应的全部元素"""
+    for selector in selectors:
+        by, value = to_locator(selector)
+        try:
+            elements = root.find_elements(by, value)
+            if elements:
+                return elements
+        except Exception:
+            continue
+    return []
+
+
+@contextmanager
+def command_timeout(driver, seconds: float):
+    """
+    临时限制单个WebDriver命令的HTTP超时（秒），超时的命令抛出异常而不是一直阻塞调用方
+
+    浏览器端的命令不会因此中断，只是不再等待其结果；无法设置时（如测试中的假driver）不做限制。
+    """
+    config = getattr(getattr(driver, 'command_executor', None), 'client_config', None)
+    if config is None or not hasattr(config, 'timeout'):
+        yield
+        return
+    previous = config.timeout
+    config.timeout = seconds
+    try:
+        yield
+    finally:
+        config.timeout = previous
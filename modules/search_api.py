@@ -0,0 +1,136 @@
+"""
+搜索接口客户端 - 复用浏览器登录态直接请求站点的搜索JSON接口，代替逐页加载搜索页面
+"""
+import time
+from typing import Dict, Iterator, List, Optional
+from urllib.parse import urlsplit, urlunsplit, parse_qsl
+
+from config import settings
+from utils import log, traced
+from .http_session import build_session_from_driver, sync_cookies_from_driver
+from .network_capture import NetworkCapture, JOB_HINT_KEYS, extract_records, map_job_record
+
+
+class ZhilianSearchClient:
+    """搜索JSON接口客户端
+
+    接口地址优先使用配置 ZHILIAN_SEARCH_API_URL；未配置时从已捕获的搜索请求中学习，
+    并把该请求的其余查询参数（来源代码、渠道等）作为模板沿用。
+    学到的每页条数也会沿用，页面第1页之后从第2页接着请求时页码边界才能对齐。
+    """
+
+    def __init__(self, driver, network_capture: NetworkCapture = None):
+        self.driver = driver
+        self.network_capture = network_capture
+        self.session = None
+        self.endpoint: Optional[str] = settings.ZHILIAN_SEARCH_API_URL
+        self.base_params: Dict[str, str] = {}
+        self.page_size: Optional[int] = None
+        self.param_names = settings.SEARCH_API_PARAM_NAMES
+
+    def learn_endpoint(self) -> bool:
+        """从捕获的响应中找出返回职位列表的搜索请求，记录其地址和查询参数"""
+        if self.endpoint:
+            return True
+        if self.network_capture is None:
+            return False
+
+        try:
+            self.network_capture.drain()
+            for response in reversed(self.network_capture.find_responses(settings.CAPTURE_SEARCH_PATTERNS)):
+                if not extract_records(response['data'], JOB_HINT_KEYS):
+                    continue
+
+                parts = urlsplit(response['url'])
+                self.endpoint = urlunsplit((parts.scheme, parts.netloc, parts.path, '', ''))
+                # 搜索条件相关的参数每次请求重新设置，其余参数原样保留
+                managed = set(self.param_names.values())
+                query = dict(parse_qsl(parts.query))
+                self.base_params = {key: value for key, value in query.items() if key not in managed}
+                page_size = query.get(self.param_names['page_size'], '')
+                self.page_size = int(page_size) if page_size.isdigit() and int(page_size) > 0 else None
+                log.info(f"已学习到搜索接口: {self.endpoint}")
+                return True
+        except Exception as e:
+            log.debug(f"学习搜索接口失败: {e}")
+        return False
+
+    @property
+    def available(self) -> bool:
+        return bool(self.endpoint)
+
+    def build_params(self, page: int = 1, **filters) -> Dict[str, str]:
+        """把搜索条件转换为接口查询参数（条件含义与 CandidateManager._build_search_url 相同）"""
+        params = dict(self.base_params)
+        for field, value in filters.items():
+            name = self.param_names.get(field)
+            if name and value:
+                params[name] = value
+        params[self.param_names['page']] = page
+        params[self.param_names['page_size']] = self.page_size or settings.SEARCH_API_PAGE_SIZE
+        return params
+
+    @traced('search_api.fetch_page')
+    def fetch_page(self, params: Dict) -> Optional[List[Dict]]:
+        """请求一页搜索结果，返回原始职位记录；请求失败或接口报错时返回None"""
+        try:
+            response = self.session.get(self.endpoint, params=params, timeout=settings.BROWSER_TIMEOUT)
+            if response.status_code != 200:
+                log.warning(f"搜索接口返回状态码 {response.status_code}")
+                return None
+
+            data = response.json()
+            code = data.get('code') if isinstance(data, dict) else None
+            if code not in (None, 0, 200, '0', '200'):
+                log.warning(f"搜索接口返回错误: {code} {data.get('message', '')}")
+                return None
+
+            return extract_records(data, JOB_HINT_KEYS)
+        except Exception as e:
+            log.warning(f"请求搜索接口失败: {e}")
+            return None
+
+    def iter_search(self, page_limit: int = 5, start_page: int = 1, **filters) -> Iterator[Dict]:
+        """
+        逐页请求搜索接口并产出候选人字典（字段与页面解析结果一致）
+
+        Args:
+            page_limit: 最后一页的页码
+            start_page: 起始页码
+            **filters: location（地区代码）、keyword、experience、education、salary_range、company_type
+
+        Yields:
+            候选人信息字典
+        """
+        if not self.available:
+            return
+
+        if self.session is None:
+            self.session = build_session_from_driver(self.driver, referer=settings.ZHILIAN_SEARCH_URL)
+        else:
+            sync_cookies_from_driver(self.session, self.driver)
+
+        seen_first = None
+        for page in range(start_page, page_limit + 1):
+            log.info(f"正在通过接口搜索第 {page} 页...")
+            records = self.fetch_page(self.build_params(page=page, **filters))
+            if not records:
+                if records is not None:
+                    log.info("没有更多候选人，停止搜索")
+                break
+
+            candidates = [c for c in (map_job_record(record) for record in records) if c]
+            if not candidates:
+                break
+
+            # 接口忽略分页参数时会重复返回同一页，此时停止
+            first_url = candidates[0].get('profile_url')
+            if first_url and first_url == seen_first:
+                log.warning("搜索接口返回了重复的页面，停止翻页")
+                break
+            seen_first = first_url
+
+            log.info(f"第 {page} 页找到 {len(candidates)} 个候选人")
+            yield from candidates
+
+            time.sleep(settings.REQUEST_DELAY)
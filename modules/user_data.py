@@ -0,0 +1,64 @@
+"""
+Chrome用户数据目录管理 - 每个账号一个持久化的 --user-data-dir 模板，额外的浏览器实例使用其副本
+"""
+import os
+import re
+import shutil
+from typing import Optional
+
+from config import settings
+from utils import log
+
+
+# 复制模板时跳过的文件：运行中实例的锁、崩溃报告和可以重建的GPU缓存
+_CLONE_IGNORE = shutil.ignore_patterns(
+    'Singleton*', 'lockfile', '*.lock', 'LOCK', 'Crashpad', 'Crash Reports', 'ShaderCache', 'GrShaderCache'
+)
+
+
+def default_account() -> str:
+    """当前配置的账号名（与打招呼调度器的账号一致）"""
+    return settings.ZHILIAN_USERNAME or settings.USERNAME or "default"
+
+
+def _safe_name(name: str) -> str:
+    return re.sub(r'[^\w.-]', '_', str(name)) or "default"
+
+
+def account_profile_dir(account: str = None) -> Optional[str]:
+    """账号的模板目录，未配置 CHROME_PROFILE_DIR 时返回None（使用临时空白配置）"""
+    if not settings.CHROME_PROFILE_DIR:
+        return None
+    path = os.path.abspath(os.path.join(settings.CHROME_PROFILE_DIR, _safe_name(account or default_account()), 'template'))
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def clone_profile(account: str = None, lane_index: int = 1, refresh: bool = False) -> Optional[str]:
+    """
+    为第 lane_index 个额外实例准备模板的副本
+
+    同一个用户数据目录不能被两个Chrome进程同时使用，因此额外实例各用一份副本。
+    副本已存在时直接复用（保留其缓存），refresh=True 时按模板重新复制。
+
+    Returns:
+        副本目录，未配置 CHROME_PROFILE_DIR 时返回None
+    """
+    template = account_profile_dir(account)
+    if template is None:
+        return None
+
+    clone = os.path.join(os.path.dirname(template), f'lane-{lane_index}')
+    if os.path.isdir(clone) and not refresh:
+        return clone
+
+    try:
+        if os.path.isdir(clone):
+            shutil.rmtree(clone)
+        shutil.copytree(template, clone, ignore=_CLONE_IGNORE)
+        log.info(f"已从模板复制浏览器配置: {clone}")
+    except Exception as e:
+        # 模板正被主浏览器使用时个别文件可能复制失败，保留已复制的部分继续使用
+        log.warning(f"复制浏览器配置不完整: {e}")
+        os.makedirs(clone, exist_ok=True)
+    return clone
@@ -3,25 +3,54 @@ WebSocket实时聊天模块
 """
 import json
 import time
-import asyncio
+import uuid
+import random
 import threading
 from typing import Dict, List, Callable, Optional
 import websocket
+from websocket import WebSocketTimeoutException
 import requests
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
 from config import settings
-from utils import log
+from utils import log, metrics
+from .page_loader import load_page, wait_for_any
+from .network_capture import (
+    NetworkCapture, CHAT_HINT_KEYS, MESSAGE_HINT_KEYS, map_chat_record, map_message_record
+)
+
+
+WS_FRAMES = metrics.counter('zhilian_ws_frames_total', 'WebSocket收发帧数', ('direction',))
+WS_RECONNECTS = metrics.counter('zhilian_ws_reconnects_total', 'WebSocket重连次数')
+WS_CONNECTED = metrics.gauge('zhilian_ws_connected', 'WebSocket是否已连接（1/0）')
+WS_CONNECTED_SINCE = metrics.gauge('zhilian_ws_connected_since_seconds', '当前WebSocket连接建立的时间（Unix时间，未连接时为0）')
+WS_CONNECTION_SECONDS = metrics.histogram(
+    'zhilian_ws_connection_seconds', '每次WebSocket连接持续的时间（秒）',
+    buckets=(1, 10, 30, 60, 300, 900, 1800, 3600, 7200, 21600, 86400)
+)
+
+WS_LAST_FRAME = metrics.gauge('zhilian_ws_last_frame_seconds', '最近一次收到WebSocket帧（消息或pong）的时间（Unix时间）')
+WS_DEAD_PEERS = metrics.counter('zhilian_ws_dead_peer_total', '心跳超时未收到pong而断开的次数')
+
+# 握手被拒绝或服务端按这些状态码关闭时视为登录态失效，重连前重新获取连接地址和cookies
+AUTH_HTTP_STATUS = (401, 403)
+AUTH_CLOSE_CODES = (1008, 4001, 4003, 4401, 4403)
+
+# deliver_chat_message 的发送结果
+SEND_SENT = 'sent'
+SEND_UNACKED = 'unacked'
+SEND_FAILED = 'failed'
 
 
 class WebSocketChatManager:
     """WebSocket聊天管理器"""
     
-    def __init__(self, driver):
+    def __init__(self, driver, network_capture: NetworkCapture = None, wait: WebDriverWait = None):
         self.driver = driver
-        self.wait = WebDriverWait(driver, settings.BROWSER_TIMEOUT)
+        self.wait = wait or WebDriverWait(driver, settings.BROWSER_TIMEOUT)
+        self.network_capture = network_capture or NetworkCapture(driver)
         self.ws = None
         self.ws_url = None
         self.is_connected = False
@@ -31,9 +60,28 @@ class WebSocketChatManager:
         self.reconnect_interval = settings.WS_RECONNECT_INTERVAL
         self.running = False
         
+        # 连接由唯一的监督线程创建、运行和重连
+        self.supervisor_thread = None
+        self.stop_event = threading.Event()
+        self.connected_at = None
+        self.auth_expired = False
+        
+        # driver 只能由创建它的线程使用：监督线程需要新的连接地址和cookies时置位 refresh_requested，
+        # 由持有driver的线程调用 refresh_connection_info() 完成后置位 info_ready
+        self.headers: List[str] = []
+        self.refresh_requested = threading.Event()
+        self.info_ready = threading.Event()
+        
+        # 心跳：最近一次收到帧（消息或pong）和pong的时间
+        self.last_frame_at = None
+        self.last_pong_at = None
+        
         # 消息队列
         self.message_queue = []
         self.queue_lock = threading.Lock()
+        
+        # 等待服务端确认的消息：客户端消息ID -> 收到确认/回显时置位
+        self.pending_acks: Dict[str, threading.Event] = {}
     
     def extract_websocket_info(self) -> bool:
         """从页面中提取WebSocket连接信息"""
@@ -42,7 +90,7 @@ class WebSocketChatManager:
             
             # 访问聊天页面
             chat_url = "https://i.zhaopin.com/chat"
-            self.driver.get(chat_url)
+            load_page(self.driver, chat_url, 'chat')
             time.sleep(3)
             
             # 从页面源码中提取WebSocket URL
@@ -78,18 +126,14 @@ class WebSocketChatManager:
     def _extract_from_network_requests(self) -> bool:
         """从网络请求中提取WebSocket信息"""
         try:
-            # 获取浏览器的网络日志
-            logs = self.driver.get_log('performance')
+            # 网络日志由抓包器统一读取，WebSocket地址记录在抓包器中
+            self.network_capture.drain()
             
-            for log_entry in logs:
-                message = json.loads(log_entry['message'])
-                
-                if message['message']['method'] == 'Network.webSocketCreated':
-                    ws_url = message['message']['params']['url']
-                    if 'zhaopin' in ws_url:
-                        self.ws_url = ws_url
-                        log.info(f"从网络日志中找到WebSocket URL: {ws_url}")
-                        return True
+            for ws_url in self.network_capture.websocket_urls:
+                if 'zhaopin' in ws_url:
+                    self.ws_url = ws_url
+                    log.info(f"从网络日志中找到WebSocket URL: {ws_url}")
+                    return True
             
             return False
             
@@ -98,51 +142,186 @@ class WebSocketChatManager:
             return False
     
     def connect(self) -> bool:
-        """连接WebSocket"""
+        """
+        启动WebSocket监督线程，等待首次连接建立（之后断线由监督线程自动重连）
+        
+        需在持有driver的线程中调用，连接地址和cookies在这里读取。
+        """
         try:
             if not self.ws_url:
                 if not self.extract_websocket_info():
                     log.error("无法获取WebSocket连接信息")
                     return False
-            
-            log.info(f"正在连接WebSocket: {self.ws_url}")
-            
-            # 获取必要的headers和cookies
-            headers = self._get_websocket_headers()
-            
-            # 创建WebSocket连接
-            self.ws = websocket.WebSocketApp(
-                self.ws_url,
-                header=headers,
-                on_open=self._on_open,
-                on_message=self._on_message,
-                on_error=self._on_error,
-                on_close=self._on_close
-            )
-            
-            # 在新线程中运行WebSocket
-            self.running = True
-            ws_thread = threading.Thread(target=self.ws.run_forever)
-            ws_thread.daemon = True
-            ws_thread.start()
+            self.headers = self._get_websocket_headers()
+            if self.refresh_requested.is_set():
+                # 监督线程正在等待新的连接信息
+                self.refresh_requested.clear()
+                self.info_ready.set()
+            
+            if not (self.supervisor_thread and self.supervisor_thread.is_alive()):
+                self.running = True
+                self.stop_event.clear()
+                self.refresh_requested.clear()
+                self.info_ready.clear()
+                self.reconnect_attempts = 0
+                self.supervisor_thread = threading.Thread(target=self._supervise, name="websocket-supervisor", daemon=True)
+                self.supervisor_thread.start()
             
             # 等待连接建立
-            timeout = 10
-            start_time = time.time()
-            while not self.is_connected and time.time() - start_time < timeout:
+            deadline = time.time() + settings.WS_CONNECT_TIMEOUT
+            while not self.is_connected and time.time() < deadline and self.running:
                 time.sleep(0.1)
             
             if self.is_connected:
                 log.info("WebSocket连接成功")
                 return True
+            elif self.running:
+                log.error("WebSocket连接超时，将在后台继续重试")
+                return False
             else:
-                log.error("WebSocket连接超时")
+                log.error("WebSocket连接失败")
                 return False
                 
         except Exception as e:
             log.error(f"WebSocket连接失败: {e}")
             return False
     
+    def _supervise(self):
+        """
+        监督循环：在本线程中运行连接，断开后按带抖动的指数退避重连
+        
+        连接稳定超过 WS_STABLE_SECONDS 后重连计数清零；登录态失效时请持有driver的线程重新提取连接地址，
+        本线程不直接操作driver。
+        """
+        while self.running:
+            if self.auth_expired:
+                log.info("WebSocket登录态失效，重新获取连接地址和cookies")
+                self.auth_expired = False
+                self.ws_url = None
+            
+            if not self.ws_url and not self._wait_for_refresh():
+                break
+            
+            if self.ws_url:
+                self._run_connection()
+            else:
+                log.error("无法获取WebSocket连接信息")
+            
+            if not self.running:
+                break
+            
+            # 稳定运行过一段时间的连接断开后从头开始退避
+            uptime = self._close_connection()
+            if uptime is not None and uptime >= settings.WS_STABLE_SECONDS:
+                self.reconnect_attempts = 0
+            
+            self.reconnect_attempts += 1
+            if self.max_reconnect_attempts and self.reconnect_attempts > self.max_reconnect_attempts:
+                log.error(f"WebSocket连续 {self.max_reconnect_attempts} 次重连失败，停止重连")
+                self.running = False
+                break
+            
+            delay = self._backoff_delay(self.reconnect_attempts)
+            WS_RECONNECTS.inc()
+            log.info(f"{delay:.1f}s 后重连WebSocket ({self.reconnect_attempts}/{self.max_reconnect_attempts or '∞'})")
+            if self.stop_event.wait(delay):
+                break
+        
+        self._close_connection()
+    
+    def _wait_for_refresh(self) -> bool:
+        """请求持有driver的线程重新获取连接信息并等待完成，停止时返回False"""
+        self.info_ready.clear()
+        self.refresh_requested.set()
+        log.info("等待主线程重新获取WebSocket连接信息")
+        self.info_ready.wait()
+        return self.running
+    
+    def refresh_connection_info(self) -> bool:
+        """
+        在持有driver的线程中定期调用：监督线程请求时重新提取连接地址并读取cookies
+        
+        Returns:
+            是否执行了刷新
+        """
+        if not self.refresh_requested.is_set():
+            return False
+        self.refresh_requested.clear()
+        try:
+            if self.extract_websocket_info():
+                self.headers = self._get_websocket_headers()
+        finally:
+            self.info_ready.set()
+        return True
+    
+    def _backoff_delay(self, attempt: int) -> float:
+        """第 attempt 次重连前的等待时间：指数增长到上限，取其一半加上随机的另一半"""
+        delay = min(settings.WS_RECONNECT_MAX_INTERVAL, self.reconnect_interval * 2 ** min(attempt - 1, 16))
+        return delay / 2 + random.uniform(0, delay / 2)
+    
+    def _run_connection(self):
+        """创建一个连接并阻塞运行到断开"""
+        try:
+            log.info(f"正在连接WebSocket: {self.ws_url}")
+            
+            # cookies 由持有driver的线程在 connect()/refresh_connection_info() 中读取
+            self.ws = websocket.WebSocketApp(
+                self.ws_url,
+                header=list(self.headers),
+                on_open=self._on_open,
+                on_message=self._on_message,
+                on_error=self._on_error,
+                on_close=self._on_close,
+                on_pong=self._on_pong
+            )
+            if self.running:
+                self.ws.run_forever(reconnect=0, **self._ping_options())
+            
+        except Exception as e:
+            log.error(f"WebSocket连接失败: {e}")
+    
+    @staticmethod
+    def _ping_options() -> Dict:
+        """
+        协议层心跳参数：每个连接由 websocket-client 的一个ping线程每 WS_PING_INTERVAL 秒发送ping，
+        连接结束时随之停止；发出ping后 WS_PING_TIMEOUT 秒内没有pong即判定对端失联并断开，
+        因此半开连接最多 WS_PING_INTERVAL + WS_PING_TIMEOUT 秒后被发现。
+        """
+        interval = settings.WS_PING_INTERVAL or 0
+        timeout = settings.WS_PING_TIMEOUT or None
+        if interval and timeout and timeout >= interval:
+            log.warning(f"WS_PING_TIMEOUT({timeout}) 需小于 WS_PING_INTERVAL({interval})，按 {interval / 2} 处理")
+            timeout = interval / 2
+        return {'ping_interval': interval, 'ping_timeout': timeout if interval else None}
+    
+    def _mark_frame(self):
+        self.last_frame_at = time.time()
+        WS_LAST_FRAME.set(self.last_frame_at)
+    
+    @property
+    def last_frame_age(self) -> Optional[float]:
+        """距最近一次收到帧的秒数，未收到过时为None"""
+        last_frame_at = self.last_frame_at
+        return time.time() - last_frame_at if last_frame_at else None
+    
+    def _close_connection(self) -> Optional[float]:
+        """记录连接结束，返回该连接持续的秒数（未建立过连接时为None）"""
+        self.is_connected = False
+        WS_CONNECTED.set(0)
+        WS_CONNECTED_SINCE.set(0)
+        if self.connected_at is None:
+            return None
+        uptime = time.time() - self.connected_at
+        self.connected_at = None
+        WS_CONNECTION_SECONDS.observe(uptime)
+        return uptime
+    
+    @property
+    def uptime(self) -> float:
+        """当前连接已持续的秒数，未连接时为0"""
+        connected_at = self.connected_at
+        return time.time() - connected_at if connected_at else 0.0
+    
     def _get_websocket_headers(self) -> List[str]:
         """获取WebSocket连接所需的headers"""
         try:
@@ -170,15 +349,18 @@ class WebSocketChatManager:
         """WebSocket连接打开回调"""
         log.info("WebSocket连接已打开")
         self.is_connected = True
-        self.reconnect_attempts = 0
-        
-        # 发送心跳包
-        self._start_heartbeat()
+        self.connected_at = time.time()
+        WS_CONNECTED.set(1)
+        WS_CONNECTED_SINCE.set(self.connected_at)
+        self._mark_frame()
     
     def _on_message(self, ws, message):
         """WebSocket消息接收回调"""
         try:
-            log.debug(f"收到WebSocket消息: {message}")
+            WS_FRAMES.inc(direction='in')
+            self._mark_frame()
+            log.debug("收到WebSocket消息: {}", message)
+            self._match_ack(message)
             
             # 解析消息
             msg_data = json.loads(message)
@@ -201,52 +383,43 @@ class WebSocketChatManager:
         except Exception as e:
             log.error(f"处理WebSocket消息失败: {e}")
     
+    def _match_ack(self, message):
+        """服务端的确认或回显帧会带回客户端消息ID，命中时唤醒等待的发送方"""
+        if not self.pending_acks or not isinstance(message, str):
+            return
+        for client_msg_id, event in list(self.pending_acks.items()):
+            if client_msg_id in message:
+                event.set()
+    
     def _on_error(self, ws, error):
         """WebSocket错误回调"""
         log.error(f"WebSocket错误: {error}")
         self.is_connected = False
+        WS_CONNECTED.set(0)
+        if getattr(error, 'status_code', None) in AUTH_HTTP_STATUS:
+            self.auth_expired = True
+        elif isinstance(error, WebSocketTimeoutException) and 'ping/pong' in str(error):
+            WS_DEAD_PEERS.inc()
+            log.warning(f"WebSocket心跳超时，最近一次收到帧在 {self.last_frame_age or 0:.1f}s 前，断开重连")
     
     def _on_close(self, ws, close_status_code, close_msg):
-        """WebSocket连接关闭回调"""
+        """WebSocket连接关闭回调（重连由监督线程负责）"""
         log.info(f"WebSocket连接已关闭: {close_status_code}, {close_msg}")
         self.is_connected = False
-        
-        # 尝试重连
-        if self.running and self.reconnect_attempts < self.max_reconnect_attempts:
-            self._reconnect()
-    
-    def _reconnect(self):
-        """重连WebSocket"""
-        try:
-            self.reconnect_attempts += 1
-            log.info(f"尝试重连WebSocket ({self.reconnect_attempts}/{self.max_reconnect_attempts})")
-            
-            time.sleep(self.reconnect_interval)
-            
-            if self.connect():
-                log.info("WebSocket重连成功")
-            else:
-                log.error("WebSocket重连失败")
-                
-        except Exception as e:
-            log.error(f"WebSocket重连失败: {e}")
+        WS_CONNECTED.set(0)
+        if close_status_code in AUTH_CLOSE_CODES:
+            self.auth_expired = True
     
-    def _start_heartbeat(self):
-        """启动心跳包"""
-        def heartbeat():
-            while self.is_connected and self.running:
-                try:
-                    # 发送心跳包
-                    heartbeat_msg = json.dumps({"type": "ping", "timestamp": int(time.time())})
-                    self.ws.send(heartbeat_msg)
-                    time.sleep(30)  # 每30秒发送一次心跳
-                except Exception as e:
-                    log.error(f"发送心跳包失败: {e}")
-                    break
-        
-        heartbeat_thread = threading.Thread(target=heartbeat)
-        heartbeat_thread.daemon = True
-        heartbeat_thread.start()
+    def _on_pong(self, ws, data):
+        """收到pong：更新心跳时间，需要时顺带发送应用层心跳（与协议层ping共用同一个计时）"""
+        self.last_pong_at = time.time()
+        WS_FRAMES.inc(direction='pong')
+        self._mark_frame()
+        if settings.WS_APP_PING:
+            try:
+                ws.send(json.dumps({"type": "ping", "timestamp": int(time.time())}))
+            except Exception as e:
+                log.debug("发送应用层心跳失败: {}", e)
     
     def send_message(self, message_data: Dict) -> bool:
         """发送消息"""
@@ -257,29 +430,61 @@ class WebSocketChatManager:
             
             message_json = json.dumps(message_data, ensure_ascii=False)
             self.ws.send(message_json)
-            log.debug(f"发送WebSocket消息: {message_json}")
+            WS_FRAMES.inc(direction='out')
+            log.debug("发送WebSocket消息: {}", message_json)
             return True
             
         except Exception as e:
             log.error(f"发送WebSocket消息失败: {e}")
             return False
     
-    def send_chat_message(self, recipient_id: str, content: str, message_type: str = "text") -> bool:
-        """发送聊天消息"""
+    def send_chat_message(self, recipient_id: str, content: str, message_type: str = "text",
+                          ack_timeout: float = None) -> bool:
+        """
+        发送聊天消息
+        
+        Args:
+            ack_timeout: 大于0时等待服务端带回 client_msg_id 的确认或回显帧，
+                超时未收到返回False（帧写入socket不代表服务端接受了消息）
+        """
+        return self.deliver_chat_message(recipient_id, content, message_type, ack_timeout) == SEND_SENT
+    
+    def deliver_chat_message(self, recipient_id: str, content: str, message_type: str = "text",
+                             ack_timeout: float = None) -> str:
+        """
+        发送聊天消息并返回结果
+        
+        Returns:
+            SEND_SENT: 已确认（或未要求确认时已写入socket）；
+            SEND_UNACKED: 帧已写入socket但超时未收到确认，消息可能已送达，调用方不应换通道重发；
+            SEND_FAILED: 未能发出
+        """
+        client_msg_id = uuid.uuid4().hex
+        event = None
         try:
             message_data = {
                 "type": "chat_message",
                 "recipient_id": recipient_id,
                 "content": content,
                 "message_type": message_type,
+                "client_msg_id": client_msg_id,
                 "timestamp": int(time.time() * 1000)
             }
             
-            return self.send_message(message_data)
+            if ack_timeout:
+                event = self.pending_acks[client_msg_id] = threading.Event()
+            if not self.send_message(message_data):
+                return SEND_FAILED
+            if event is None or event.wait(ack_timeout):
+                return SEND_SENT
+            log.warning(f"{ack_timeout}s 内未收到聊天消息确认: {recipient_id}")
+            return SEND_UNACKED
             
         except Exception as e:
             log.error(f"发送聊天消息失败: {e}")
-            return False
+            return SEND_FAILED
+        finally:
+            self.pending_acks.pop(client_msg_id, None)
     
     def add_message_handler(self, handler: Callable):
         """添加消息处理器"""
@@ -307,8 +512,17 @@ class WebSocketChatManager:
         """获取聊天列表"""
         try:
             # 访问聊天列表页面
-            self.driver.get("https://i.zhaopin.com/chat")
-            time.sleep(2)
+            self.network_capture.clear()
+            load_page(self.driver, "https://i.zhaopin.com/chat", 'chat')
+            
+            # 优先使用会话列表接口的JSON响应
+            records = self.network_capture.wait_for_records(
+                settings.CAPTURE_CHAT_LIST_PATTERNS, CHAT_HINT_KEYS, timeout=2
+            )
+            if records:
+                chat_list = [map_chat_record(record) for record in records]
+                log.info(f"从接口响应获取到 {len(chat_list)} 个聊天")
+                return chat_list
             
             chat_list = []
             
@@ -374,13 +588,14 @@ class WebSocketChatManager:
         """进入指定聊天"""
         try:
             chat_url = f"https://i.zhaopin.com/chat/{chat_id}"
-            self.driver.get(chat_url)
+            load_page(self.driver, chat_url, 'chat')
             time.sleep(2)
             
             # 等待聊天界面加载
-            self.wait.until(
-                EC.presence_of_element_located((By.CLASS_NAME, "chat-content"))
-            )
+            if wait_for_any(self.driver, [(By.CLASS_NAME, "chat-content")],
+                            timeout=settings.PAGE_READY_TIMEOUT) is None:
+                log.error(f"聊天界面加载超时: {chat_id}")
+                return False
             
             log.info(f"已进入聊天: {chat_id}")
             return True
@@ -392,9 +607,19 @@ class WebSocketChatManager:
     def get_chat_history(self, chat_id: str, limit: int = 50) -> List[Dict]:
         """获取聊天历史"""
         try:
+            self.network_capture.clear()
             if not self.enter_chat(chat_id):
                 return []
             
+            # 优先使用消息历史接口的JSON响应
+            records = self.network_capture.wait_for_records(
+                settings.CAPTURE_CHAT_MESSAGE_PATTERNS, MESSAGE_HINT_KEYS, timeout=0
+            )
+            if records:
+                messages = [map_message_record(record) for record in records[-limit:]]
+                log.info(f"从接口响应获取到 {len(messages)} 条聊天历史")
+                return messages
+            
             messages = []
             
             # 获取消息列表
@@ -446,11 +671,18 @@ class WebSocketChatManager:
         """断开WebSocket连接"""
         try:
             self.running = False
+            self.stop_event.set()
+            self.info_ready.set()
             self.is_connected = False
             
             if self.ws:
                 self.ws.close()
-                self.ws = None
+            
+            supervisor = self.supervisor_thread
+            if supervisor and supervisor is not threading.current_thread():
+                supervisor.join(timeout=5)
+            self.supervisor_thread = None
+            self.ws = None
             
             log.info("WebSocket连接已断开")
             
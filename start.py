@@ -5,21 +5,148 @@
 import argparse
 import sys
 import os
+import time
+from contextlib import nullcontext
 
 from zhilian_bot import ZhilianBot
 from utils import log
+from utils.profiling import Profiler, PROFILER_KINDS
+
+
+def run_mode(args) -> int:
+    """按 --mode 运行，返回退出码"""
+    if args.mode == "full":
+        # 完整模式：运行所有功能
+        log.info("启动完整模式...")
+        bot = ZhilianBot()
+        bot.run()
+        
+    elif args.mode == "search":
+        # 搜索模式：只搜索候选人
+        log.info("启动搜索模式...")
+        bot = ZhilianBot()
+        
+        if not bot.initialize(mode="search") or not bot.login():
+            log.error("初始化或登录失败")
+            return 1
+        
+        log.info(f"启动到开始搜索耗时 {(time.perf_counter() - bot.started_at) * 1000:.0f}ms")
+        
+        search_params = {
+            'keyword': args.keyword or 'Python开发',
+            'location': args.location or '北京',
+            'page_limit': 3
+        }
+        
+        # 保存结果
+        if args.output.endswith(".jsonl"):
+            # 流式写入：每解析一个候选人立即落盘，中途中断也保留已有结果
+            count = bot.candidate_manager.save_candidates_to_jsonl(
+                bot.candidate_manager.iter_candidates(**search_params, buffer_pages=False),
+                args.output
+            )
+            log.info(f"找到 {count} 个候选人")
+        else:
+            candidates = bot.candidate_manager.search_candidates(**search_params)
+            log.info(f"找到 {len(candidates)} 个候选人")
+            bot.candidate_manager.save_candidates_to_file(candidates, args.output)
+        bot.stop()
+        
+    elif args.mode == "monitor":
+        # 监控模式：只监控聊天
+        log.info("启动监控模式...")
+        bot = ZhilianBot()
+        
+        if not bot.initialize(mode="monitor") or not bot.login():
+            log.error("初始化或登录失败")
+            return 1
+        
+        bot.start_message_forwarding()
+        bot.start_websocket_chat()
+        bot.is_running = True
+        
+        log.info("开始监控聊天消息，按Ctrl+C停止...")
+        bot.monitor_chats()
+        
+    elif args.mode == "test":
+        # 测试模式：测试各个功能
+        log.info("启动测试模式...")
+        bot = ZhilianBot()
+        
+        if not bot.initialize(mode="test"):
+            log.error("初始化失败")
+            return 1
+        
+        # 测试登录
+        if bot.login():
+            log.info("✓ 登录测试通过")
+        else:
+            log.error("✗ 登录测试失败")
+            return 1
+        
+        # 测试搜索
+        try:
+            candidates = bot.candidate_manager.search_candidates(
+                keyword="测试", page_limit=1
+            )
+            log.info(f"✓ 搜索测试通过，找到 {len(candidates)} 个候选人")
+        except Exception as e:
+            log.error(f"✗ 搜索测试失败: {e}")
+        
+        # 测试WebSocket
+        try:
+            if bot.start_websocket_chat():
+                log.info("✓ WebSocket测试通过")
+            else:
+                log.warning("✗ WebSocket测试失败")
+        except Exception as e:
+            log.error(f"✗ WebSocket测试失败: {e}")
+        
+        # 测试消息转发
+        try:
+            bot.start_message_forwarding()
+            if bot.message_forwarder.test_connection():
+                log.info("✓ 消息转发测试通过")
+            else:
+                log.warning("✗ 消息转发测试失败（可能是服务器未配置）")
+        except Exception as e:
+            log.error(f"✗ 消息转发测试失败: {e}")
+        
+        bot.stop()
+        log.info("测试完成")
+    
+    elif args.mode == "export":
+        # 导出模式：只读本地职位索引，不启动浏览器
+        log.info("启动导出模式...")
+        bot = ZhilianBot()
+        
+        if not bot.initialize(mode="export") or not bot.job_index:
+            log.error("本地职位索引未启用或初始化失败")
+            return 1
+        
+        filters = {'salary_min': args.salary_min} if args.salary_min else None
+        bot.export_local(args.output, query=args.keyword or "", filters=filters, limit=args.limit)
+        bot.stop()
+    
+    return 0
 
 
 def main():
     """主函数"""
     parser = argparse.ArgumentParser(description="智联招聘自动化工具")
-    parser.add_argument("--mode", choices=["full", "search", "monitor", "test"], 
+    parser.add_argument("--mode", choices=["full", "search", "monitor", "test", "export"], 
                        default="full", help="运行模式")
     parser.add_argument("--headless", action="store_true", help="无头模式运行")
     parser.add_argument("--config", help="配置文件路径")
     parser.add_argument("--keyword", help="搜索关键词")
     parser.add_argument("--location", help="工作地点")
     parser.add_argument("--max-candidates", type=int, default=20, help="最大候选人数量")
+    parser.add_argument("--output", default="candidates.json",
+                       help="搜索结果文件，以.jsonl结尾时边搜索边逐条追加写入")
+    parser.add_argument("--salary-min", type=int, help="最低月薪（元，export模式筛选）")
+    parser.add_argument("--limit", type=int, help="export模式最多导出的职位数，默认全部导出")
+    parser.add_argument("--profile", choices=list(PROFILER_KINDS),
+                       help="剖析本次运行：cprofile（只记录主线程）或 sampling（采样所有线程，可生成火焰图），结果写入 PROFILE_DIR")
     
     args = parser.parse_args()
     
@@ -31,99 +158,17 @@ def main():
     if args.config:
         os.environ['CONFIG_FILE'] = args.config
     
+    # 剖析：整个运行（含浏览器启动和初始化）在剖析器中执行
+    if args.profile:
+        tags = {'mode': args.mode, 'keyword': args.keyword, 'location': args.location,
+                'max_candidates': args.max_candidates, 'headless': args.headless}
+        profiler = Profiler(args.profile, tags=tags)
+    else:
+        profiler = nullcontext()
+    
     try:
-        if args.mode == "full":
-            # 完整模式：运行所有功能
-            log.info("启动完整模式...")
-            bot = ZhilianBot()
-            bot.run()
-            
-        elif args.mode == "search":
-            # 搜索模式：只搜索候选人
-            log.info("启动搜索模式...")
-            bot = ZhilianBot()
-            
-            if not bot.initialize() or not bot.login():
-                log.error("初始化或登录失败")
-                return 1
-            
-            search_params = {
-                'keyword': args.keyword or 'Python开发',
-                'location': args.location or '北京',
-                'page_limit': 3
-            }
-            
-            candidates = bot.candidate_manager.search_candidates(**search_params)
-            log.info(f"找到 {len(candidates)} 个候选人")
-            
-            # 保存结果
-            bot.candidate_manager.save_candidates_to_file(candidates)
-            bot.stop()
-            
-        elif args.mode == "monitor":
-            # 监控模式：只监控聊天
-            log.info("启动监控模式...")
-            bot = ZhilianBot()
-            
-            if not bot.initialize() or not bot.login():
-                log.error("初始化或登录失败")
-                return 1
-            
-            bot.start_message_forwarding()
-            bot.start_websocket_chat()
-            bot.is_running = True
-            
-            log.info("开始监控聊天消息，按Ctrl+C停止...")
-            bot.monitor_chats()
-            
-        elif args.mode == "test":
-            # 测试模式：测试各个功能
-            log.info("启动测试模式...")
-            bot = ZhilianBot()
-            
-            if not bot.initialize():
-                log.error("初始化失败")
-                return 1
-            
-            # 测试登录
-            if bot.login():
-                log.info("✓ 登录测试通过")
-            else:
-                log.error("✗ 登录测试失败")
-                return 1
-            
-            # 测试搜索
-            try:
-                candidates = bot.candidate_manager.search_candidates(
-                    keyword="测试", page_limit=1
-                )
-                log.info(f"✓ 搜索测试通过，找到 {len(candidates)} 个候选人")
-            except Exception as e:
-                log.error(f"✗ 搜索测试失败: {e}")
-            
-            # 测试WebSocket
-            try:
-                if bot.start_websocket_chat():
-                    log.info("✓ WebSocket测试通过")
-                else:
-                    log.warning("✗ WebSocket测试失败")
-            except Exception as e:
-                log.error(f"✗ WebSocket测试失败: {e}")
-            
-            # 测试消息转发
-            try:
-                bot.start_message_forwarding()
-                if bot.message_forwarder.test_connection():
-                    log.info("✓ 消息转发测试通过")
-                else:
-                    log.warning("✗ 消息转发测试失败（可能是服务器未配置）")
-            except Exception as e:
-                log.error(f"✗ 消息转发测试失败: {e}")
-            
-            bot.stop()
-            log.info("测试完成")
-        
-        return 0
+        with profiler:
+            return run_mode(args)
         
     except KeyboardInterrupt:
         log.info("用户中断程序")
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+用 python -X importtime 测量各启动路径的导入耗时，并检查是否加载了不需要的重依赖
+"""
+import sys
+import os
+import argparse
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 启动路径 -> 要执行的导入语句
+TARGETS = {
+    'start.py': "import start",
+    'zhilian_bot': "import zhilian_bot",
+    'export': "import zhilian_bot, modules; modules.LocalJobIndex",
+    'monitor': "import zhilian_bot, modules; modules.ZhilianLogin; modules.WebSocketChatManager; modules.MessageForwarder",
+    'full': "import zhilian_bot, modules; [getattr(modules, name) for name in modules.__all__]"
+}
+
+HEAVY_MODULES = ('selenium', 'websocket', 'requests', 'aiohttp', 'numpy', 'bs4', 'PIL', 'webdriver_manager')
+
+
+def measure(statement: str):
+    """在独立进程中执行导入，返回 (总耗时ms, 模块累计耗时字典, 已加载的重依赖)"""
+    check = f"; import sys; print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement + check],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr else "导入失败")
+
+    cumulative = {}
+    total = 0.0
+    for line in result.stderr.splitlines():
+        parts = line[len("import time:"):].split("|") if line.startswith("import time:") else []
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue  # 表头行或其他输出
+        ms = int(parts[1]) / 1000
+        name = parts[2].rstrip()
+        cumulative[name.strip()] = ms
+        # 没有缩进的是顶层导入，其累计耗时之和即总导入耗时
+        if not name.startswith("  "):
+            total += ms
+
+    loaded = [name for name in result.stdout.strip().splitlines()[-1].split(",") if name] if result.stdout.strip() else []
+    return total, cumulative, loaded
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="启动导入耗时基准")
+    parser.add_argument("--rounds", type=int, default=5, help="每个路径重复次数（取中位数）")
+    parser.add_argument("--top", type=int, default=8, help="显示累计耗时最高的模块数")
+    args = parser.parse_args()
+
+    print("🧪 启动导入耗时基准（python -X importtime）")
+    print("=" * 50)
+
+    print(f"{'路径':<14}{'中位数(ms)':>12}  已加载的重依赖")
+    details = {}
+    for target, statement in TARGETS.items():
+        runs = [measure(statement) for _ in range(args.rounds)]
+        totals = sorted(run[0] for run in runs)
+        details[target] = runs[-1][1]
+        print(f"{target:<14}{totals[len(totals) // 2]:>12.0f}  {', '.join(runs[-1][2]) or '-'}")
+
+    print(f"\n📊 full 路径累计耗时最高的 {args.top} 个模块:")
+    for name, ms in sorted(details['full'].items(), key=lambda item: -item[1])[:args.top]:
+        print(f"  {ms:>8.1f}ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
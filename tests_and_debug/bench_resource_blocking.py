@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+对比不同资源拦截配置下的页面加载耗时和传输字节数
+"""
+import sys
+import os
+import time
+import argparse
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.login import ZhilianLogin
+from modules.browser_profiles import list_profiles
+from modules.candidate import CandidateManager
+
+
+def bench_profile(login_manager, profile_name, urls, rounds):
+    """在指定配置下加载页面并统计平均指标"""
+    login_manager.use_resource_profile(profile_name)
+    
+    samples = []
+    for _ in range(rounds):
+        for url in urls:
+            start = time.time()
+            login_manager.driver.get(url)
+            wall_ms = (time.time() - start) * 1000
+            metrics = login_manager.get_page_metrics()
+            metrics['wall_ms'] = wall_ms
+            samples.append(metrics)
+    
+    def avg(key):
+        values = [sample.get(key, 0) for sample in samples]
+        return sum(values) / len(values) if values else 0
+    
+    return {
+        'wall_ms': avg('wall_ms'),
+        'load_ms': avg('load_ms'),
+        'transfer_kb': avg('transfer_bytes') / 1024,
+        'resources': avg('resource_count')
+    }
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="资源拦截效果对比")
+    parser.add_argument("--keyword", default="Python开发")
+    parser.add_argument("--location", default="北京")
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+    
+    print("🧪 资源拦截效果对比")
+    print("=" * 50)
+    
+    login_manager = ZhilianLogin()
+    try:
+        # 禁用缓存，保证每次都是完整加载
+        login_manager.driver.execute_cdp_cmd('Network.setCacheDisabled', {'cacheDisabled': True})
+        
+        search_url = CandidateManager(login_manager.driver)._build_search_url(
+            keyword=args.keyword, location=args.location
+        )
+        
+        results = {}
+        for profile_name in list_profiles():
+            # 切换前重置，避免同名配置被跳过
+            login_manager.resource_profile = None
+            results[profile_name] = bench_profile(login_manager, profile_name, [search_url], args.rounds)
+        
+        print(f"{'配置':<10}{'总耗时(ms)':>12}{'load(ms)':>12}{'传输(KB)':>12}{'资源数':>8}")
+        for profile_name, result in results.items():
+            print(f"{profile_name:<10}{result['wall_ms']:>12.0f}{result['load_ms']:>12.0f}"
+                  f"{result['transfer_kb']:>12.1f}{result['resources']:>8.0f}")
+    finally:
+        login_manager.close()
+
+
+if __name__ == "__main__":
+    main()
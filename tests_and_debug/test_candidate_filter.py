@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+测试候选人筛选和搜索漏斗提前结束的脚本（使用模拟driver，不需要浏览器）
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import settings
+from modules.normalizer import parse_salary, parse_experience, education_level
+from modules.candidate_filter import CandidateFilter
+from modules.candidate_table import CandidateTable
+from modules.candidate import CandidateManager
+
+
+def test_normalizer():
+    """测试薪资、经验、学历解析"""
+    print("🔢 测试字段解析...")
+    salary_cases = {
+        '1.5万-2万': (15000, 20000),
+        '8千-1.2万': (8000, 12000),
+        '15-25K·13薪': (15000, 25000),
+        '8000-12000元': (8000, 12000),
+        '12-24万/年': (10000, 20000),
+        '1万以上': (10000, None),
+        '8千起': (8000, None),
+        '1万': (10000, 10000),
+        '面议': (None, None)
+    }
+    for text, expected in salary_cases.items():
+        result = parse_salary(text)
+        print(f"   {text} -> {result}")
+        assert result == expected, f"{text}: {result} != {expected}"
+
+    assert parse_experience('3-5年') == (3, 5)
+    assert parse_experience('经验不限') == (0, None)
+    assert parse_experience('1年以下') == (0, 1)
+    assert parse_experience('10年以上') == (10, None)
+    assert parse_experience('无经验') == (0, 0)
+    assert education_level('本科') == 4 and education_level('学历不限') == 0
+    print("✅ 字段解析通过")
+
+
+def test_filter():
+    """测试筛选条件"""
+    print("🧹 测试筛选条件...")
+    candidate_filter = CandidateFilter(salary_min=15000, education_levels=['本科'], experience_max=5)
+    assert candidate_filter.matches({'salary': '1万-2万', 'education': '本科', 'experience': '3-5年'})
+    assert candidate_filter.reject_reason({'salary': '8千-1万'}) == 'salary'
+    assert candidate_filter.reject_reason({'salary': '2万-3万', 'education': '硕士'}) == 'education'
+    assert candidate_filter.reject_reason({'salary': '2万-3万', 'experience': '10年以上'}) == 'experience'
+    assert candidate_filter.matches({'salary': '面议', 'education': '学历不限'})
+
+    # "1万以上" 不设上限，不会因上限低于期望被淘汰；向量化筛选结果一致
+    strict = CandidateFilter(salary_min=30000, keep_unknown=False)
+    open_ended = [{'salary': '1万以上'}, {'salary': '1万'}, {'salary': '面议'}]
+    assert [strict.matches(candidate) for candidate in open_ended] == [True, False, False]
+    assert list(strict.mask(CandidateTable(open_ended))) == [True, False, False]
+    assert CandidateFilter.from_params({'keyword': 'Python'}) is None
+    print("✅ 筛选条件通过")
+
+
+class MockDriver:
+    """模拟driver：记录加载过的页面"""
+
+    def __init__(self):
+        self.loaded = []
+
+    def get(self, url):
+        self.loaded.append(url)
+
+    def get_log(self, log_type):
+        return []
+
+
+class MockCandidateManager(CandidateManager):
+    """每页产出20张卡片，偶数卡片薪资不达标，记录实际解析的卡片数"""
+
+    def __init__(self, driver):
+        super().__init__(driver)
+        self.parsed_cards = 0
+
+    def _iter_candidate_list(self):
+        page = len(self.driver.loaded)
+        for i in range(20):
+            self.parsed_cards += 1
+            yield {
+                'name': f'职位{page}-{i}',
+                'profile_url': f'https://jobs.zhaopin.com/{page}-{i}.htm',
+                'salary': '5千-8千' if i % 2 == 0 else '1.5万-2万'
+            }
+
+
+def test_funnel_early_stop():
+    """测试凑够目标数量后停止解析和翻页"""
+    print("🚦 测试搜索漏斗提前结束...")
+    original_delay = settings.REQUEST_DELAY
+    settings.REQUEST_DELAY = 0
+    try:
+        manager = MockCandidateManager(MockDriver())
+        candidates = list(manager.iter_candidates(
+            keyword='Python', page_limit=5, mode='browser',
+            target_count=15, candidate_filter=CandidateFilter(salary_min=10000)
+        ))
+    finally:
+        settings.REQUEST_DELAY = original_delay
+
+    print(f"   结果: {len(candidates)} 个, 加载页面: {len(manager.driver.loaded)}, 解析卡片: {manager.parsed_cards}")
+    assert len(candidates) == 15
+    assert all(c['salary'] == '1.5万-2万' for c in candidates)
+    assert len(manager.driver.loaded) == 2
+    assert manager.parsed_cards == 30
+    print("✅ 搜索漏斗提前结束通过")
+
+
+def main():
+    """主测试函数"""
+    print("🧪 候选人筛选测试")
+    print("=" * 50)
+    test_normalizer()
+    test_filter()
+    test_funnel_early_stop()
+    print("\n🎉 所有测试完成！")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+测试候选人相关度排序的脚本
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.candidate_ranker import CandidateRanker
+from modules.normalizer import tokenize
+
+
+CANDIDATES = [
+    {'name': '销售经理', 'company': '某贸易公司', 'salary': '1万-1.5万', 'experience': '3-5年'},
+    {'name': 'Java开发工程师', 'company': '某科技公司', 'salary': '1.5万-2万', 'experience': '3-5年',
+     'skills': ['Java', 'Spring']},
+    {'name': 'Python开发工程师', 'company': '某数据公司', 'salary': '2万-3万', 'experience': '3-5年',
+     'skills': ['Python', 'Django']},
+    {'name': 'Python实习生', 'company': '某创业公司', 'salary': '3千-4千', 'experience': '无经验',
+     'skills': ['Python']},
+]
+
+
+def test_tokenize():
+    """测试中英文混合分词"""
+    print("✂️ 测试分词...")
+    tokens = tokenize('Python开发工程师 C++/C#')
+    print(f"   {tokens}")
+    assert tokens == ['python', 'c++', 'c#', '开发', '发工', '工程', '程师']
+    print("✅ 分词通过")
+
+
+def test_rank():
+    """测试关键词相关度和数值匹配度"""
+    print("🏆 测试候选人排序...")
+    ranker = CandidateRanker({'keyword': 'Python开发', 'experience': '3-5年', 'salary_min': 15000})
+    ranked = ranker.rank([dict(c) for c in CANDIDATES])
+    for candidate in ranked:
+        print(f"   {candidate['score']:.3f} {candidate['name']}")
+
+    assert ranked[0]['name'] == 'Python开发工程师'
+    assert ranked[-1]['name'] == '销售经理'
+    # 实习岗位关键词相关但薪资和经验都不匹配，排在正式岗位之后
+    names = [c['name'] for c in ranked]
+    assert names.index('Python实习生') > names.index('Python开发工程师')
+
+    top = ranker.rank([dict(c) for c in CANDIDATES], top_k=2)
+    assert len(top) == 2
+    print("✅ 候选人排序通过")
+
+
+def test_no_keyword():
+    """测试没有关键词时只按数值匹配度排序，且同分保持原顺序"""
+    print("📐 测试无关键词排序...")
+    ranked = CandidateRanker({}).rank([dict(c) for c in CANDIDATES])
+    assert [c['name'] for c in ranked] == [c['name'] for c in CANDIDATES]
+    print("✅ 无关键词排序通过")
+
+
+def main():
+    """主测试函数"""
+    print("🧪 候选人排序测试")
+    print("=" * 50)
+    test_tokenize()
+    test_rank()
+    test_no_keyword()
+    print("\n🎉 所有测试完成！")
+
+
+if __name__ == "__main__":
+    main()
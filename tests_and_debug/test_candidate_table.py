@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+测试候选人列式表筛选和排序的脚本
+"""
+import sys
+import os
+import time
+import random
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.candidate_filter import CandidateFilter
+from modules.candidate_table import CandidateTable
+
+
+SAMPLE = [
+    {'name': 'A', 'salary': '1.5万-2万', 'experience': '3-5年', 'education': '本科'},
+    {'name': 'B', 'salary': '8千-1万', 'experience': '1-3年', 'education': '大专'},
+    {'name': 'C', 'salary': '面议', 'experience': '经验不限', 'education': '学历不限'},
+    {'name': 'D', 'salary': '30-50K·14薪', 'experience': '10年以上', 'education': '硕士'},
+]
+
+
+def test_vectorized_matches_scalar():
+    """测试向量化筛选与逐条筛选结果一致"""
+    print("🧮 测试向量化筛选...")
+    table = CandidateTable(SAMPLE)
+    filters = [
+        CandidateFilter(salary_min=12000),
+        CandidateFilter(salary_min=12000, keep_unknown=False),
+        CandidateFilter(education_levels=['本科', '硕士']),
+        CandidateFilter(experience_min=4, experience_max=6),
+        CandidateFilter(salary_min=9000, experience_max=5, education_levels=['大专', '本科'])
+    ]
+    for candidate_filter in filters:
+        vectorized = [record['name'] for record in table.query(candidate_filter)]
+        scalar = [record['name'] for record in SAMPLE if candidate_filter.matches(record)]
+        print(f"   {vectorized}")
+        assert vectorized == scalar
+    print("✅ 向量化筛选通过")
+
+
+def test_sort():
+    """测试排序（未知值排在最后）"""
+    print("📊 测试排序...")
+    table = CandidateTable(SAMPLE)
+    names = [record['name'] for record in table.query(sort_by='salary_max')]
+    print(f"   按薪资上限降序: {names}")
+    assert names == ['D', 'A', 'B', 'C']
+    names = [record['name'] for record in table.query(sort_by='experience_min', descending=False, limit=2)]
+    assert names == ['C', 'B']
+    print("✅ 排序通过")
+
+
+def test_large_table():
+    """测试数万条候选人的查询耗时"""
+    print("⏱️ 测试大表查询...")
+    random.seed(0)
+    candidates = []
+    for i in range(50000):
+        low = random.randint(3, 30)
+        exp = random.randint(0, 10)
+        candidates.append({
+            'name': f'职位{i}',
+            'salary': f'{low}-{low + random.randint(1, 10)}K',
+            'experience': f'{exp}-{exp + 2}年',
+            'education': random.choice(['大专', '本科', '硕士', '学历不限'])
+        })
+
+    start = time.perf_counter()
+    table = CandidateTable(candidates)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    candidate_filter = CandidateFilter(salary_min=20000, education_levels=['本科'], experience_max=5)
+    start = time.perf_counter()
+    result = table.query_indices(candidate_filter, sort_by='salary_max', limit=100)
+    query_ms = (time.perf_counter() - start) * 1000
+
+    print(f"   构建: {build_ms:.1f}ms, 查询: {query_ms:.2f}ms, 结果: {len(result)} 条, 概况: {table.stats(candidate_filter)}")
+    assert len(result) == 100
+    assert query_ms < 200
+    print("✅ 大表查询通过")
+
+
+def main():
+    """主测试函数"""
+    print("🧪 候选人列式表测试")
+    print("=" * 50)
+    test_vectorized_matches_scalar()
+    test_sort()
+    test_large_table()
+    print("\n🎉 所有测试完成！")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+测试职位卡片的快照解析、逐张读取的截止时间和卡住卡片的统计（使用模拟driver，不需要浏览器）
+"""
+import sys
+import os
+import time
+import threading
+from types import SimpleNamespace
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import settings
+from modules.candidate import CandidateManager
+
+
+class MockCard:
+    """模拟职位卡片元素"""
+
+    def __init__(self, index: int, stale: bool = False, hang: bool = False):
+        self.index = index
+        self.stale = stale
+        self.hang = hang
+
+    def snapshot(self):
+        return {
+            'text': f"Python开发{self.index}\n1-1.5万\n上海·浦东\n3-5年\n本科\n某科技有限公司",
+            'has_link': True,
+            'link_text': f"Python开发{self.index}",
+            'href': f"https://jobs.zhaopin.com/{self.index}.htm"
+        }
+
+
+class MockDriver:
+    """模拟driver：批量脚本遇到失效卡片时整体失败；卡住的卡片在命令超时后抛出异常"""
+
+    def __init__(self, cards):
+        self.cards = cards
+        self.script_calls = 0
+        self.command_executor = SimpleNamespace(client_config=SimpleNamespace(timeout=None))
+
+    def find_elements(self, by, value):
+        return self.cards if value == ".jobinfo" else []
+
+    def get_log(self, log_type):
+        return []
+
+    def execute_script(self, script, cards):
+        self.script_calls += 1
+        if len(cards) > 1 and any(card.stale or card.hang for card in cards):
+            raise Exception("stale element reference")
+        if cards[0].hang:
+            time.sleep(self.command_executor.client_config.timeout)
+            raise Exception("Read timed out")
+        return [card.snapshot() for card in cards]
+
+
+def parse(cards):
+    """解析模拟页面；不等待页面就绪（模拟driver上的等待只会一直超时）"""
+    original = settings.PAGE_READY_TIMEOUT
+    settings.PAGE_READY_TIMEOUT = 0
+    try:
+        manager = CandidateManager(MockDriver(cards))
+        candidates = list(manager._iter_candidate_list())
+    finally:
+        settings.PAGE_READY_TIMEOUT = original
+    return manager, candidates
+
+
+def test_snapshot_parsing():
+    """整页卡片只用一次脚本调用"""
+    print("📸 测试整页快照解析...")
+    manager, candidates = parse([MockCard(i) for i in range(20)])
+    assert len(candidates) == 20
+    assert manager.driver.script_calls == 1
+    first = candidates[0]
+    assert first['name'] == "Python开发0" and first['profile_url'].endswith("/0.htm")
+    assert first['salary'] == "1-1.5万" and first['location'].startswith("上海")
+    assert first['experience'] == "3-5年" and first['education'] == "本科"
+    assert manager.last_parse_stats['mode'] == 'snapshot'
+    print(f"✅ 20 张卡片 1 次脚本调用，统计: {manager.last_parse_stats}")
+
+
+def test_per_card_deadline():
+    """快照失败时逐张读取，卡住的卡片按截止时间跳过，且不留下线程"""
+    print("\n⏱️ 测试逐张读取的截止时间...")
+    original = (settings.CARD_PARSE_TIMEOUT, settings.MAX_STUCK_CARDS)
+    settings.CARD_PARSE_TIMEOUT, settings.MAX_STUCK_CARDS = 0.05, 3
+    threads_before = threading.active_count()
+    try:
+        cards = [MockCard(i, stale=(i == 2), hang=(i == 5)) for i in range(10)]
+        manager, candidates = parse(cards)
+        stats = manager.last_parse_stats
+        assert stats['mode'] == 'per_card'
+        assert stats['timeout'] == 1 and stats['ok'] == 9, stats
+        assert len(candidates) == 9
+        assert manager.driver.command_executor.client_config.timeout is None
+
+        # 超时卡片达到上限后放弃剩余卡片
+        started = time.perf_counter()
+        manager, candidates = parse([MockCard(i, hang=(i >= 3)) for i in range(50)])
+        stats = manager.last_parse_stats
+        elapsed = time.perf_counter() - started
+        assert stats['timeout'] == 3 and stats['skipped'] == 44 and len(candidates) == 3, stats
+        assert elapsed < 1, elapsed
+    finally:
+        settings.CARD_PARSE_TIMEOUT, settings.MAX_STUCK_CARDS = original
+
+    assert threading.active_count() == threads_before
+    print(f"✅ 超时 {stats['timeout']} 张后跳过 {stats['skipped']} 张，耗时 {elapsed * 1000:.0f}ms，无遗留线程")
+
+
+def main():
+    """主函数"""
+    print("🧪 职位卡片解析测试")
+    print("=" * 50)
+
+    test_snapshot_parsing()
+    test_per_card_deadline()
+
+    print("\n🎉 所有测试完成！")
+
+
+if __name__ == "__main__":
+    main()
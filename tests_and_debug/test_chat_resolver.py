@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+测试聊天ID解析与缓存的脚本（不需要浏览器）
+"""
+import sys
+import os
+import json
+import time
+import tempfile
+import threading
+from types import SimpleNamespace
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import settings
+from modules.chat_resolver import ChatIdResolver
+from modules.websocket_chat import WebSocketChatManager, SEND_UNACKED
+from modules.interaction import InteractionManager
+
+
+def test_extract_chat_id():
+    """测试从URL和页面源码提取聊天ID"""
+    print("🔍 测试聊天ID提取...")
+    
+    resolver = ChatIdResolver(cache_file=os.path.join(tempfile.mkdtemp(), "chat_ids.json"))
+    test_cases = [
+        ("https://i.zhaopin.com/chat/abc123", "abc123"),
+        ('<script>var conf = {"chatId": "u_998877"};</script>', "u_998877"),
+        ('<div data-chat-id="c-42"></div>', "c-42"),
+        ('{"sessionId": "login_5566", "imUserId": "me_1"}', None),
+        ("<html>没有聊天信息</html>", None)
+    ]
+    
+    for text, expected in test_cases:
+        result = resolver.extract_chat_id(text)
+        mark = "✅" if result == expected else "❌"
+        print(f"{mark} {text[:40]} -> {result}")
+        assert result == expected
+
+
+def test_cache_persistence():
+    """测试缓存读写与URL归一化"""
+    print("💾 测试聊天ID缓存...")
+    
+    cache_file = os.path.join(tempfile.mkdtemp(), "chat_ids.json")
+    resolver = ChatIdResolver(cache_file=cache_file)
+    resolver.learn("https://jobs.zhaopin.com/CC123J456.htm?refcode=1", "chat_1")
+    
+    # 新实例从文件加载，且查询参数不同也能命中
+    reloaded = ChatIdResolver(cache_file=cache_file)
+    result = reloaded.resolve("https://jobs.zhaopin.com/CC123J456.htm?from=search")
+    mark = "✅" if result == "chat_1" else "❌"
+    print(f"{mark} 缓存命中: {result}")
+    assert result == "chat_1"
+
+
+def test_shared_resolver_concurrent_learn():
+    """多个打招呼通道共用一个解析器并发写缓存，文件内容完整且包含所有条目"""
+    print("🧵 测试并发写缓存...")
+
+    cache_file = os.path.join(tempfile.mkdtemp(), "chat_ids.json")
+    resolver = ChatIdResolver(cache_file=cache_file)
+    threads = [
+        threading.Thread(target=lambda lane=lane: [
+            resolver.learn(f"https://jobs.zhaopin.com/L{lane}J{i}.htm", f"chat_{lane}_{i}") for i in range(20)
+        ])
+        for lane in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    with open(cache_file, 'r', encoding='utf-8') as f:
+        saved = json.load(f)
+    assert len(saved) == 80
+    assert ChatIdResolver(cache_file=cache_file).get_cached("https://jobs.zhaopin.com/L3J19.htm") == "chat_3_19"
+    print(f"✅ 4 个通道并发写入 {len(saved)} 条")
+
+
+class CountingSession:
+    """记录请求次数的模拟HTTP会话，页面中没有聊天ID"""
+
+    def __init__(self):
+        self.calls = []
+
+    def get(self, url, timeout=None):
+        self.calls.append(timeout)
+        return SimpleNamespace(status_code=200, text="<html>没有聊天信息</html>")
+
+
+def test_negative_cache():
+    """解析不到聊天ID的URL在有效期内不再请求，且请求使用短超时"""
+    print("🚫 测试未命中缓存...")
+
+    resolver = ChatIdResolver(cache_file=os.path.join(tempfile.mkdtemp(), "chat_ids.json"))
+    resolver.session = CountingSession()
+    url = "https://jobs.zhaopin.com/CC1J2.htm"
+    for _ in range(5):
+        assert resolver.resolve(url + "?from=search", driver=object()) is None
+    assert resolver.session.calls == [settings.CHAT_ID_RESOLVE_TIMEOUT]
+
+    # 过期后重新请求
+    resolver.misses[resolver._normalize_url(url)] -= settings.CHAT_ID_MISS_TTL + 1
+    resolver.resolve(url, driver=object())
+    assert len(resolver.session.calls) == 2
+    print(f"✅ 6 次解析只请求 {len(resolver.session.calls)} 次，超时 {settings.CHAT_ID_RESOLVE_TIMEOUT}s")
+
+
+class EchoSocket:
+    """模拟WebSocket连接：echo 为True时服务端稍后回显带 client_msg_id 的确认帧"""
+
+    def __init__(self, manager, echo):
+        self.manager = manager
+        self.echo = echo
+
+    def send(self, message):
+        if self.echo:
+            client_msg_id = json.loads(message)['client_msg_id']
+            reply = json.dumps({"type": "ack", "client_msg_id": client_msg_id})
+            threading.Timer(0.05, self.manager._on_message, args=(self, reply)).start()
+
+
+def test_websocket_ack():
+    """经WebSocket发送的聊天消息收到服务端确认才算成功"""
+    print("📨 测试WebSocket消息确认...")
+
+    manager = WebSocketChatManager(SimpleNamespace(), network_capture=SimpleNamespace())
+    manager.is_connected = True
+
+    manager.ws = EchoSocket(manager, echo=True)
+    assert manager.send_chat_message("chat_1", "您好", ack_timeout=1)
+
+    manager.ws = EchoSocket(manager, echo=False)
+    started = time.time()
+    assert not manager.send_chat_message("chat_1", "您好", ack_timeout=0.2)
+    assert 0.2 <= time.time() - started < 1
+    assert manager.pending_acks == {}
+    assert manager.deliver_chat_message("chat_1", "您好", ack_timeout=0.1) == SEND_UNACKED
+    print("✅ 收到回显时成功，超时未确认时返回失败")
+
+
+class UnackedWebSocket:
+    """模拟已连接但从不确认的WebSocket管理器"""
+
+    is_connected = True
+
+    def __init__(self):
+        self.sent = []
+
+    def deliver_chat_message(self, chat_id, message, ack_timeout=None):
+        self.sent.append(chat_id)
+        return SEND_UNACKED
+
+
+def test_unacked_greeting_not_resent():
+    """WebSocket帧已发出但未确认时不再走HTTP接口或页面流程重发"""
+    print("🔁 测试未确认的打招呼不重发...")
+
+    websocket_manager = UnackedWebSocket()
+    resolver = ChatIdResolver(cache_file=os.path.join(tempfile.mkdtemp(), "chat_ids.json"))
+    manager = InteractionManager(SimpleNamespace(), websocket_manager=websocket_manager, chat_resolver=resolver)
+    posts = []
+    manager.http_session = SimpleNamespace(post=lambda *args, **kwargs: posts.append(args))
+
+    original_api = settings.ZHILIAN_CHAT_SEND_API
+    settings.ZHILIAN_CHAT_SEND_API = "https://i.zhaopin.com/api/chat/send"
+    try:
+        url = "https://jobs.zhaopin.com/CC9J9.htm"
+        # 页面流程在假driver上会抛异常并返回False，返回True说明没有回退
+        assert manager.send_greeting(url, message="您好", chat_id="chat_9")
+    finally:
+        settings.ZHILIAN_CHAT_SEND_API = original_api
+
+    assert websocket_manager.sent == ["chat_9"]
+    assert posts == []
+    assert resolver.get_cached(url) is None
+    print("✅ 未确认的消息按已发出处理，没有重复发送")
+
+
+def main():
+    """主测试函数"""
+    print("🧪 聊天ID解析测试")
+    print("=" * 50)
+    test_extract_chat_id()
+    print()
+    test_cache_persistence()
+    test_shared_resolver_concurrent_learn()
+    print()
+    test_negative_cache()
+    print()
+    test_websocket_ack()
+    test_unacked_greeting_not_resent()
+    print("\n🎉 所有测试完成！")
+
+
+if __name__ == "__main__":
+    main()
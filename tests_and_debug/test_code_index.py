@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+测试地区/关键词代码索引的脚本
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.code_index import CODE_INDEX
+
+
+def test_location_lookup():
+    """测试地区名称、别名、区县前缀和直接代码"""
+    print("📍 测试地区代码查找...")
+    cases = {
+        '北京': '530',
+        '北京市': '530',
+        'Shanghai': '538',
+        '深圳南山区': '765',
+        'jl653': '653',
+        '全国': '489',
+        '合肥': None,
+        # 表外城市的拼音不能前缀/模糊匹配到表内城市
+        'shijiazhuang': None,
+        'changzhou': None,
+        'xuzhou': None,
+        '常州': None
+    }
+    for name, expected in cases.items():
+        code = CODE_INDEX.location_code(name)
+        print(f"   {name} -> {code}")
+        assert code == expected, f"{name}: {code} != {expected}"
+    print("✅ 地区代码查找通过")
+
+
+def test_keyword_lookup():
+    """测试关键词别名和大小写"""
+    print("🔑 测试关键词代码查找...")
+    assert CODE_INDEX.keyword_code('java') == CODE_INDEX.keyword_code('Java开发工程师')
+    assert CODE_INDEX.keyword_code('python') == '01500O80EO062'
+    assert CODE_INDEX.keyword_code('区块链') is None
+    print("✅ 关键词代码查找通过")
+
+
+def test_index_is_read_only():
+    """测试索引为只读映射"""
+    print("🔒 测试只读映射...")
+    try:
+        CODE_INDEX.locations['test'] = '1'
+        assert False, "索引不应可修改"
+    except TypeError:
+        pass
+    print(f"   代码表版本: {CODE_INDEX.version}, 地区 {len(CODE_INDEX.locations)} 条, 关键词 {len(CODE_INDEX.keywords)} 条")
+    print("✅ 只读映射通过")
+
+
+def main():
+    """主测试函数"""
+    print("🧪 代码索引测试")
+    print("=" * 50)
+    test_location_lookup()
+    test_keyword_lookup()
+    test_index_is_read_only()
+    print("\n🎉 所有测试完成！")
+
+
+if __name__ == "__main__":
+    main()
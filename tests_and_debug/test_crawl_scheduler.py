@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+测试增量抓取调度的脚本
+"""
+import sys
+import os
+import time
+import tempfile
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.job_index import LocalJobIndex
+from modules.crawl_scheduler import CrawlScheduler
+
+
+def make_scheduler(**kwargs):
+    index = LocalJobIndex(os.path.join(tempfile.mkdtemp(), 'job_index.db'))
+    return CrawlScheduler(index, **kwargs)
+
+
+def age(scheduler, url, seconds):
+    """把上次抓取时间往前拨"""
+    with scheduler.lock, scheduler.conn:
+        scheduler.conn.execute(
+            "UPDATE crawl_state SET last_fetch = last_fetch - ? WHERE url = ?", (seconds, url)
+        )
+
+
+def test_new_urls_first():
+    """测试新职位优先、未过期的跳过"""
+    print("🆕 测试新职位优先...")
+    scheduler = make_scheduler(staleness_threshold=0.3, daily_budget=100, prior_interval_hours=72)
+    scheduler.record_fetch('old-fresh', {'name': 'A'})
+    scheduler.record_fetch('old-stale', {'name': 'B'})
+    age(scheduler, 'old-stale', 7 * 86400)
+    assert scheduler.discover(['new-1', 'new-2', 'old-fresh']) == 2
+
+    plan = scheduler.plan(['old-fresh', 'old-stale', 'new-1', 'new-2'])
+    print(f"   计划: {plan}")
+    assert plan == ['new-1', 'new-2', 'old-stale']
+    print("✅ 新职位优先通过")
+
+
+def test_change_rate():
+    """测试经常变化的职位更早过期"""
+    print("📈 测试变化率估计...")
+    scheduler = make_scheduler(staleness_threshold=0.3, prior_interval_hours=72)
+    for version in range(4):
+        # 每天抓取一次，volatile 每次内容都不同，stable 内容不变
+        assert scheduler.record_fetch('volatile', {'name': f'职位v{version}'}) == (version > 0)
+        assert not scheduler.record_fetch('stable', {'name': '职位'})
+        age(scheduler, 'volatile', 86400)
+        age(scheduler, 'stable', 86400)
+
+    volatile = scheduler.get_state('volatile')
+    stable = scheduler.get_state('stable')
+    print(f"   volatile: 变化 {volatile['change_count']} 次, 过期概率 {scheduler.staleness(volatile):.2f}")
+    print(f"   stable:   变化 {stable['change_count']} 次, 过期概率 {scheduler.staleness(stable):.2f}")
+    assert volatile['change_count'] == 3 and stable['change_count'] == 0
+    assert scheduler.staleness(volatile) > scheduler.staleness(stable)
+    assert scheduler.plan(['volatile', 'stable']) == ['volatile']
+    print("✅ 变化率估计通过")
+
+
+def test_budget():
+    """测试每日预算"""
+    print("💰 测试抓取预算...")
+    scheduler = make_scheduler(daily_budget=3)
+    scheduler.discover([f'url-{i}' for i in range(10)])
+    scheduler.record_fetch('url-0', {'name': 'x'})
+    plan = scheduler.plan()
+    print(f"   今日已抓取 {scheduler.fetched_today()} 个, 计划: {plan}")
+    assert plan == ['url-1', 'url-2']
+
+    # 同一职位再次抓取也消耗预算
+    scheduler.record_fetch('url-0', {'name': 'x'})
+    assert scheduler.fetched_today() == 2
+    assert scheduler.plan() == ['url-1']
+    print(f"   统计: {scheduler.stats()}")
+    print("✅ 抓取预算通过")
+
+
+def test_hash_ignores_page_noise():
+    """详情页正文和空白变化不算内容变化，结构化字段变化才算"""
+    print("🧹 测试内容哈希...")
+    job = {'name': 'Python开发', 'salary': '1-1.5万', 'skills': ['Python', 'Django'],
+           'description': '职位描述……\n推荐职位 浏览 123 次', 'self_evaluation': '熟悉 Python'}
+    noisy = dict(job, description='职位描述……\n推荐职位 浏览 456 次', self_evaluation='熟悉  Python\n')
+    assert CrawlScheduler.content_hash(job) == CrawlScheduler.content_hash(noisy)
+    assert CrawlScheduler.content_hash(job) != CrawlScheduler.content_hash(dict(job, salary='1.5-2万'))
+
+    # 旧版本哈希不会被当作内容变化
+    scheduler = make_scheduler()
+    scheduler.record_fetch('upgraded', job)
+    with scheduler.lock, scheduler.conn:
+        scheduler.conn.execute("UPDATE crawl_state SET content_hash = 'da39a3ee' WHERE url = 'upgraded'")
+    assert not scheduler.record_fetch('upgraded', job)
+    assert scheduler.record_fetch('upgraded', dict(job, salary='1.5-2万'))
+    print("✅ 内容哈希通过")
+
+
+def main():
+    """主测试函数"""
+    print("🧪 增量抓取调度测试")
+    print("=" * 50)
+    test_new_urls_first()
+    test_change_rate()
+    test_budget()
+    test_hash_ignores_page_noise()
+    print("\n🎉 所有测试完成！")
+
+
+if __name__ == "__main__":
+    main()
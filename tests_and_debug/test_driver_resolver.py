@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+测试chromedriver解析缓存的脚本（使用模拟的chromedriver脚本，不需要浏览器和网络）
+"""
+import sys
+import os
+import stat
+import tempfile
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import webdriver_manager.chrome
+
+from config import settings
+from modules.driver_resolver import ChromeDriverResolver, chromedriver_version
+
+
+def make_fake_driver(directory, version):
+    path = os.path.join(directory, 'chromedriver')
+    with open(path, 'w') as f:
+        f.write(f'#!/bin/sh\necho "ChromeDriver {version} (fake)"\n')
+    os.chmod(path, os.stat(path).st_mode | stat.S_IEXEC)
+    return path
+
+
+def test_pinned_and_manifest():
+    """测试固定路径写入清单，之后从清单解析"""
+    print("📌 测试固定路径和清单缓存...")
+    directory = tempfile.mkdtemp()
+    driver_path = make_fake_driver(directory, '120.0.6099.109')
+    assert chromedriver_version(driver_path) == '120.0.6099.109'
+
+    original_path = settings.CHROMEDRIVER_PATH
+    try:
+        settings.CHROMEDRIVER_PATH = driver_path
+        resolver = ChromeDriverResolver(os.path.join(directory, 'manifest.json'))
+        assert resolver.resolve(allow_download=False) == driver_path
+        assert resolver.last_resolution['source'] == 'pinned'
+
+        settings.CHROMEDRIVER_PATH = None
+        resolver = ChromeDriverResolver(os.path.join(directory, 'manifest.json'))
+        assert resolver.resolve(allow_download=False) == driver_path
+        print(f"   {resolver.last_resolution}")
+        assert resolver.last_resolution['source'] == 'manifest'
+        assert resolver.load_manifest()['version'] == '120.0.6099.109'
+    finally:
+        settings.CHROMEDRIVER_PATH = original_path
+    print("✅ 固定路径和清单缓存通过")
+
+
+def test_offline_failure():
+    """测试离线且没有本地驱动时给出明确错误而不是尝试下载"""
+    print("📴 测试离线无驱动...")
+    directory = tempfile.mkdtemp()
+    original_path = settings.CHROMEDRIVER_PATH
+    original_env_path = os.environ.get('PATH', '')
+    try:
+        settings.CHROMEDRIVER_PATH = os.path.join(directory, 'missing-chromedriver')
+        os.environ['PATH'] = directory
+        resolver = ChromeDriverResolver(os.path.join(directory, 'manifest.json'))
+        try:
+            resolver.resolve(allow_download=False)
+            assert False, "应当抛出RuntimeError"
+        except RuntimeError as e:
+            print(f"   {e}")
+    finally:
+        settings.CHROMEDRIVER_PATH = original_path
+        os.environ['PATH'] = original_env_path
+    print("✅ 离线无驱动通过")
+
+
+def test_force_download():
+    """版本不匹配重试时跳过本地驱动，下载新版本并写入清单"""
+    print("⬇️ 测试跳过本地驱动重新下载...")
+    directory = tempfile.mkdtemp()
+    local_path = make_fake_driver(directory, '120.0.6099.109')
+    download_dir = tempfile.mkdtemp()
+    downloaded_path = make_fake_driver(download_dir, '131.0.6778.85')
+
+    class FakeManager:
+        """代替 webdriver-manager，不访问网络"""
+        installs = 0
+
+        def install(self):
+            FakeManager.installs += 1
+            return downloaded_path
+
+    original_path = settings.CHROMEDRIVER_PATH
+    original_manager = webdriver_manager.chrome.ChromeDriverManager
+    try:
+        settings.CHROMEDRIVER_PATH = local_path
+        webdriver_manager.chrome.ChromeDriverManager = FakeManager
+        resolver = ChromeDriverResolver(os.path.join(directory, 'manifest.json'))
+        assert resolver.resolve(allow_download=True) == local_path
+        assert FakeManager.installs == 0
+
+        resolver.invalidate()
+        assert resolver.resolve(force_download=True) == downloaded_path
+        print(f"   {resolver.last_resolution}")
+        assert FakeManager.installs == 1
+        assert resolver.load_manifest()['version'] == '131.0.6778.85'
+    finally:
+        settings.CHROMEDRIVER_PATH = original_path
+        webdriver_manager.chrome.ChromeDriverManager = original_manager
+    print("✅ 跳过本地驱动重新下载通过")
+
+
+def main():
+    """主测试函数"""
+    print("🧪 chromedriver解析测试")
+    print("=" * 50)
+    test_pinned_and_manifest()
+    test_offline_failure()
+    test_force_download()
+    print("\n🎉 所有测试完成！")
+
+
+if __name__ == "__main__":
+    main()
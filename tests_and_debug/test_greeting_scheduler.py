@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+测试打招呼调度器的脚本（使用模拟通道，不需要浏览器）
+"""
+import sys
+import os
+import json
+import time
+import tempfile
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.greeting_scheduler import GreetingScheduler, TokenBucket
+
+
+class MockLane:
+    """模拟打招呼通道"""
+    
+    def __init__(self, fail_urls=()):
+        self.sent = []
+        self.fail_urls = set(fail_urls)
+    
+    def send_greeting(self, candidate_url, **kwargs):
+        self.sent.append(candidate_url)
+        return candidate_url not in self.fail_urls
+
+
+def make_candidates(count):
+    return [{'name': f'职位{i}', 'profile_url': f'https://jobs.zhaopin.com/{i}.htm'} for i in range(count)]
+
+
+def make_scheduler(lanes, state_file, **kwargs):
+    params = dict(account='test', rate_per_minute=6000, burst=10, daily_quota=100,
+                  jitter_range=(0, 0), state_file=state_file)
+    params.update(kwargs)
+    return GreetingScheduler(lanes, **params)
+
+
+def test_daily_quota():
+    """测试每日配额：失败不占配额，用完后剩余候选人留在队列"""
+    print("📊 测试每日配额...")
+    state_file = os.path.join(tempfile.mkdtemp(), "state.json")
+    lane = MockLane(fail_urls={'https://jobs.zhaopin.com/0.htm'})
+    scheduler = make_scheduler([lane], state_file, daily_quota=3)
+    
+    results = scheduler.run(make_candidates(6))
+    print(f"   结果: 成功 {results['success']}, 失败 {results['failed']}, 待续发 {results['remaining']}")
+    assert results['success'] == 3
+    assert results['failed'] == 1
+    assert results['remaining'] == 2
+    print("✅ 配额测试通过")
+
+
+def test_resume():
+    """测试中断后从队列续发，不重复发送"""
+    print("🔁 测试断点续发...")
+    state_file = os.path.join(tempfile.mkdtemp(), "state.json")
+    candidates = make_candidates(5)
+    
+    first = make_scheduler([MockLane()], state_file)
+    first.run(candidates, max_count=2)
+    
+    lane = MockLane()
+    second = make_scheduler([lane], state_file)
+    results = second.run(candidates)
+    print(f"   第二次发送: {lane.sent}")
+    assert results['success'] == 3
+    assert len(set(lane.sent)) == 3
+    print("✅ 续发测试通过")
+
+
+def test_parallel_lanes():
+    """测试多通道并行发送"""
+    print("🛣️  测试多通道...")
+    state_file = os.path.join(tempfile.mkdtemp(), "state.json")
+    lanes = [MockLane(), MockLane(), MockLane()]
+    scheduler = make_scheduler(lanes, state_file)
+    
+    results = scheduler.run(make_candidates(12))
+    sent = [url for lane in lanes for url in lane.sent]
+    print(f"   各通道发送数: {[len(lane.sent) for lane in lanes]}")
+    assert results['success'] == 12
+    assert len(set(sent)) == 12
+    print("✅ 多通道测试通过")
+
+
+def test_state_writes():
+    """入队不逐个重写状态文件，发送结果立即落盘"""
+    print("💾 测试状态写入次数...")
+    state_file = os.path.join(tempfile.mkdtemp(), "state.json")
+    lane = MockLane()
+    scheduler = make_scheduler([lane], state_file)
+    writes = []
+    original_write = scheduler._write_state
+    scheduler._write_state = lambda: (writes.append(len(scheduler.pending)), original_write())
+
+    candidates = make_candidates(2000)
+    started = time.perf_counter()
+    results = scheduler.run(candidates, max_count=3)
+    elapsed = time.perf_counter() - started
+    print(f"   入队 {len(candidates)} 个、发送 {results['total']} 个，写入 {len(writes)} 次，耗时 {elapsed * 1000:.0f}ms")
+    assert results['success'] == 3 and results['remaining'] == 1997
+    assert len(writes) <= 2 + results['total'], writes
+
+    with open(state_file, 'r', encoding='utf-8') as f:
+        saved = json.load(f)['test']
+    assert len(saved['pending']) == 1997 and len(saved['greeted']) == 3
+
+    # 重复入队在内存中去重
+    assert not scheduler._enqueue(candidates[10])
+    assert not scheduler._enqueue(candidates[0])
+    print("✅ 状态写入测试通过")
+
+
+def test_token_bucket():
+    """测试令牌桶容量"""
+    print("🪣 测试令牌桶...")
+    bucket = TokenBucket(rate_per_minute=60000, capacity=3)
+    for _ in range(5):
+        assert bucket.acquire()
+    print("✅ 令牌桶测试通过")
+
+
+def main():
+    """主测试函数"""
+    print("🧪 打招呼调度器测试")
+    print("=" * 50)
+    test_token_bucket()
+    test_daily_quota()
+    test_resume()
+    test_parallel_lanes()
+    test_state_writes()
+    print("\n🎉 所有测试完成！")
+
+
+if __name__ == "__main__":
+    main()
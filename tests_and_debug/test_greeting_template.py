@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+测试打招呼模板引擎的脚本（不需要浏览器）
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.greeting_template import GreetingTemplateEngine
+
+
+def test_validation():
+    """测试加载时校验模板字段"""
+    print("🔍 测试模板校验...")
+    for bad_template in ["您好{unknown}", "您好{0}", "您好{company.name}"]:
+        try:
+            GreetingTemplateEngine([bad_template])
+            print(f"❌ 未拒绝非法模板: {bad_template}")
+            assert False
+        except ValueError as e:
+            print(f"✅ 已拒绝: {e}")
+
+
+def test_render_from_candidate():
+    """测试从候选人字典取值，并优先选择字段齐全的模板"""
+    print("📝 测试模板渲染...")
+    engine = GreetingTemplateEngine([
+        "您好，{company}的{position}职位很适合您。",
+        "您好，看到您在{skill}方面经验丰富。"
+    ])
+    candidate = {'name': 'Python开发工程师', 'company': '某某科技', 'profile_url': 'u1'}
+    
+    for _ in range(10):
+        message = engine.render(candidate)
+        assert message == "您好，某某科技的Python开发工程师职位很适合您。", message
+    print(f"✅ 渲染结果: {message}")
+    
+    # 覆盖值优先于候选人字段
+    assert "{skill}" not in engine.render(candidate, skill="Django")
+
+
+def test_batch_check():
+    """测试批量预检缺失字段"""
+    print("📊 测试批量预检...")
+    engine = GreetingTemplateEngine(["您好，我们是一家{industry}公司，{company}诚邀您。"])
+    candidates = [
+        {'company': 'A公司', 'profile_url': 'u1'},
+        {'company': '未知公司', 'industry': '金融', 'profile_url': 'u2'}
+    ]
+    missing = engine.check_batch(candidates)
+    print(f"   缺失统计: {missing}")
+    assert missing == {'industry': 1, 'company': 1}
+    
+    messages = engine.render_batch(candidates)
+    assert messages['u1'] == "您好，我们是一家互联网公司，A公司诚邀您。"
+    assert messages['u2'] == "您好，我们是一家金融公司，我们公司诚邀您。"
+    print("✅ 批量渲染通过")
+
+
+def main():
+    """主测试函数"""
+    print("🧪 打招呼模板引擎测试")
+    print("=" * 50)
+    test_validation()
+    test_render_from_candidate()
+    test_batch_check()
+    print("\n🎉 所有测试完成！")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+测试本地职位全文索引的脚本
+"""
+import sys
+import os
+import time
+import tempfile
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.job_index import LocalJobIndex
+
+
+DETAILS = [
+    {'url': 'https://jobs.zhaopin.com/1.htm', 'name': 'Python开发工程师', 'company': '某数据公司',
+     'salary': '2万-3万', 'experience': '3-5年', 'skills': ['Python', 'Django'],
+     'description': '负责数据平台后端开发，熟悉Kafka和分布式系统'},
+    {'url': 'https://jobs.zhaopin.com/2.htm', 'name': 'Java开发工程师', 'company': '某科技公司',
+     'salary': '1.5万-2万', 'experience': '1-3年', 'skills': ['Java', 'Spring'],
+     'description': '负责交易系统开发，熟悉微服务'},
+    {'url': 'https://jobs.zhaopin.com/3.htm', 'name': '数据分析师', 'company': '某零售公司',
+     'salary': '8千-1.2万', 'experience': '经验不限', 'skills': ['SQL', 'Python'],
+     'description': '负责销售数据分析和报表'},
+]
+
+
+def make_index():
+    db_file = os.path.join(tempfile.mkdtemp(), 'job_index.db')
+    index = LocalJobIndex(db_file)
+    index.add_many([dict(detail) for detail in DETAILS])
+    return index
+
+
+def test_search_local():
+    """测试全文搜索和筛选条件"""
+    print("🔎 测试本地搜索...")
+    index = make_index()
+    print(f"   FTS5: {index.fts_enabled}, 职位数: {index.count()}")
+
+    names = [job['name'] for job in index.search_local('python')]
+    print(f"   python -> {names}")
+    assert set(names) == {'Python开发工程师', '数据分析师'}
+
+    names = [job['name'] for job in index.search_local('数据')]
+    print(f"   数据 -> {names}")
+    assert set(names) == {'Python开发工程师', '数据分析师'}
+
+    names = [job['name'] for job in index.search_local('分布式')]
+    assert names == ['Python开发工程师']
+
+    names = [job['name'] for job in index.search_local('python', {'salary_min': 15000})]
+    assert names == ['Python开发工程师']
+
+    assert index.search_local('区块链') == []
+    print("✅ 本地搜索通过")
+
+
+def test_freshness():
+    """测试详情新鲜度和搜索结果不覆盖详情"""
+    print("🕒 测试详情新鲜度...")
+    index = make_index()
+    url = DETAILS[0]['url']
+    assert index.is_fresh(url)
+    assert not index.is_fresh(url, max_age=-1)
+    assert index.stale_urls([url, 'https://jobs.zhaopin.com/new.htm']) == ['https://jobs.zhaopin.com/new.htm']
+
+    # 搜索结果（无详情）不会覆盖已有详情
+    index.add({'profile_url': url, 'name': 'Python开发工程师（搜索卡片）'})
+    assert index.get(url)['description'].startswith('负责数据平台')
+
+    # 只有搜索卡片的职位不当作详情返回
+    card_url = 'https://jobs.zhaopin.com/card-only.htm'
+    index.add({'profile_url': card_url, 'name': 'Go开发工程师'})
+    assert index.get(card_url)['name'] == 'Go开发工程师'
+    assert index.get(card_url, detail_only=True) is None
+    assert index.get(url, detail_only=True) is not None
+    print("✅ 详情新鲜度通过")
+
+
+def test_detail_merges_card():
+    """详情合并到卡片数据上，卡片字段不被空值或"未知"占位覆盖"""
+    print("🧩 测试详情合并...")
+    index = LocalJobIndex(os.path.join(tempfile.mkdtemp(), 'job_index.db'))
+    url = 'https://jobs.zhaopin.com/card.htm'
+    index.add({'profile_url': url, 'name': 'Go开发工程师', 'company': '某云计算公司',
+               'salary': '2万-3万', 'experience': '3-5年', 'education': '本科'})
+    index.add({'profile_url': url, 'name': '未知', 'company': None, 'salary': '',
+               'description': '负责容器平台开发'}, has_detail=True)
+
+    job = index.get(url)
+    assert job['name'] == 'Go开发工程师'
+    assert job['company'] == '某云计算公司'
+    assert job['salary_min'] == 20000 and job['education_level'] is not None
+    assert job['description'] == '负责容器平台开发'
+    assert index.is_fresh(url)
+    assert [job['name'] for job in index.search_local('云计算')] == ['Go开发工程师']
+    assert [job['name'] for job in index.search_local('容器')] == ['Go开发工程师']
+    print("✅ 详情合并通过")
+
+
+def test_speed():
+    """测试数千条职位的查询耗时"""
+    print("⏱️ 测试查询耗时...")
+    index = make_index()
+    index.add_many({
+        'url': f'https://jobs.zhaopin.com/bulk{i}.htm', 'name': f'后端开发{i}', 'company': f'公司{i % 50}',
+        'skills': ['Go', 'Redis'] if i % 2 else ['Java'], 'description': '负责后端服务开发和维护' * 5
+    } for i in range(5000))
+
+    start = time.perf_counter()
+    results = index.search_local('go redis', limit=20)
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"   5003 条职位中查询 go redis: {len(results)} 条，{elapsed:.1f}ms")
+    assert len(results) == 20
+    print("✅ 查询耗时通过")
+
+
+def bulk_jobs(start, count):
+    return [{
+        'url': f'https://jobs.zhaopin.com/bulk{i}.htm', 'name': f'后端开发{i}', 'company': f'公司{i % 50}',
+        'skills': ['Go', 'Redis'] if i % 2 else ['Java'], 'description': '负责后端服务开发和维护' * 5
+    } for i in range(start, start + count)]
+
+
+def test_upsert_speed():
+    """已有大量职位时写入不应明显变慢（全文索引按rowid更新，不做全表扫描）"""
+    print("⏱️ 测试已填充索引上的写入耗时...")
+    index = make_index()
+    start = time.perf_counter()
+    index.add_many(bulk_jobs(0, 5000))
+    first = time.perf_counter() - start
+
+    # 第二批：一半更新已有职位，一半新增
+    start = time.perf_counter()
+    index.add_many(bulk_jobs(2500, 5000))
+    second = time.perf_counter() - start
+    print(f"   空索引写入5000条 {first:.2f}s，已有5000条时再写入5000条 {second:.2f}s")
+    assert index.count() == 7503
+    assert second < first * 2 + 0.5, (first, second)
+
+    # 更新后旧内容不再命中，新内容可以命中
+    index.add({'url': 'https://jobs.zhaopin.com/bulk0.htm', 'name': '区块链工程师', 'description': '智能合约'})
+    assert [job['name'] for job in index.search_local('区块链')] == ['区块链工程师']
+    assert all(job['name'] != '后端开发0' for job in index.search_local('后端开发', limit=None))
+
+    start = time.perf_counter()
+    for i in range(100):
+        index.add({'url': f'https://jobs.zhaopin.com/bulk{i}.htm', 'name': f'更新{i}', 'description': '更新'})
+    single = (time.perf_counter() - start) * 10
+    print(f"   单条更新 {single:.2f}ms")
+    print("✅ 写入耗时通过")
+
+
+def test_schema_upgrade():
+    """旧版本按url关联的全文索引会按rowid重建"""
+    print("🔧 测试全文索引升级...")
+    import sqlite3
+    db_file = os.path.join(tempfile.mkdtemp(), 'job_index.db')
+    index = LocalJobIndex(db_file)
+    index.add_many([dict(detail) for detail in DETAILS])
+    if not index.fts_enabled:
+        print("   SQLite不支持FTS5，跳过")
+        return
+    index.close()
+
+    conn = sqlite3.connect(db_file)
+    conn.execute("DROP TABLE jobs_fts")
+    conn.execute("CREATE VIRTUAL TABLE jobs_fts USING fts5(url UNINDEXED, content)")
+    conn.commit()
+    conn.close()
+
+    index = LocalJobIndex(db_file)
+    assert {job['name'] for job in index.search_local('python')} == {'Python开发工程师', '数据分析师'}
+    print("✅ 全文索引升级通过")
+
+
+def main():
+    """主测试函数"""
+    print("🧪 本地职位索引测试")
+    print("=" * 50)
+    test_search_local()
+    test_freshness()
+    test_detail_merges_card()
+    test_speed()
+    test_upsert_speed()
+    test_schema_upgrade()
+    print("\n🎉 所有测试完成！")
+
+
+if __name__ == "__main__":
+    main()
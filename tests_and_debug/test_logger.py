@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+测试日志采样、延迟格式化和结构化JSON输出
+"""
+import os
+import sys
+import json
+import time
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from loguru import logger
+from utils.logger import ModuleSampler, QueuedWriter
+
+
+class Expensive:
+    """记录是否被格式化"""
+
+    formatted = 0
+
+    def __format__(self, spec):
+        Expensive.formatted += 1
+        return "expensive"
+
+
+def test_module_sampler():
+    """按模块前缀采样，WARNING及以上不采样"""
+    print("🎲 测试按模块采样...")
+    sampler = ModuleSampler({'modules': 1.0, 'modules.websocket_chat': 0.1, 'modules.candidate': 0.0})
+    assert sampler.rate_for('modules.websocket_chat') == 0.1
+    assert sampler.rate_for('modules.interaction') == 1.0
+    assert sampler.rate_for('modules.websocket_chat_extra') == 1.0
+    assert sampler.rate_for('zhilian_bot') == 1.0
+
+    logger.remove()
+    kept = []
+    logger.add(lambda message: kept.append(message.record), level="DEBUG", filter=sampler)
+    ws_logger = logger.patch(lambda record: record.update(name='modules.websocket_chat'))
+    candidate_logger = logger.patch(lambda record: record.update(name='modules.candidate'))
+    for _ in range(2000):
+        ws_logger.debug("收到WebSocket消息")
+    candidate_logger.info("解析卡片")
+    candidate_logger.warning("解析超时")
+    logger.remove()
+
+    ws_count = sum(1 for record in kept if record['name'] == 'modules.websocket_chat')
+    assert 100 < ws_count < 300, ws_count
+    assert [record['level'].name for record in kept if record['name'] == 'modules.candidate'] == ['WARNING']
+    print(f"✅ websocket_chat 保留 {ws_count}/2000 条，candidate 只保留WARNING")
+
+
+def test_lazy_formatting():
+    """级别未开启时参数不会被格式化"""
+    print("\n💤 测试延迟格式化...")
+    logger.remove()
+    logger.add(lambda message: None, level="INFO")
+    value = Expensive()
+
+    logger.debug("收到WebSocket消息: {}", value)
+    assert Expensive.formatted == 0
+    logger.info("收到WebSocket消息: {}", value)
+    assert Expensive.formatted == 1
+
+    frame = json.dumps({'type': 'chat', 'content': 'x' * 2000})
+    start = time.perf_counter()
+    for _ in range(20000):
+        logger.debug(f"收到WebSocket消息: {frame}")
+    eager = time.perf_counter() - start
+    start = time.perf_counter()
+    for _ in range(20000):
+        logger.debug("收到WebSocket消息: {}", frame)
+    lazy = time.perf_counter() - start
+    logger.remove()
+    print(f"✅ DEBUG关闭时每条: f-string {eager / 20000 * 1e6:.2f}µs，延迟格式化 {lazy / 20000 * 1e6:.2f}µs")
+
+
+def test_queued_json_sink():
+    """后台线程写出的JSON日志"""
+    print("\n📝 测试后台JSON日志...")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bot.jsonl")
+        logger.remove()
+        logger.add(QueuedWriter(path), level="INFO", serialize=True)
+        start = time.perf_counter()
+        for i in range(2000):
+            logger.info("转发消息 {}", i)
+        queued = time.perf_counter() - start
+        logger.remove()  # 移除时写完队列中剩余的日志
+
+        lines = [json.loads(line) for line in open(path, encoding='utf-8')]
+        assert len(lines) == 2000
+        assert lines[-1]['record']['message'] == "转发消息 1999"
+        assert lines[0]['record']['level']['name'] == 'INFO'
+
+        logger.add(os.path.join(tmp, "sync.jsonl"), level="INFO", serialize=True)
+        start = time.perf_counter()
+        for i in range(2000):
+            logger.info("转发消息 {}", i)
+        sync = time.perf_counter() - start
+        logger.remove()
+        print(f"✅ 写入 {len(lines)} 条，调用方每条: 后台写出 {queued / 2000 * 1e6:.0f}µs，同步写入 {sync / 2000 * 1e6:.0f}µs")
+
+
+def test_queued_rotation():
+    """按大小轮转并保留全部日志"""
+    print("\n🔄 测试日志轮转...")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bot.log")
+        logger.remove()
+        logger.add(QueuedWriter(path, rotation_bytes=4096, retention_days=7), level="INFO", format="{message}")
+        for i in range(1000):
+            logger.info("消息 {:04d}", i)
+            if i % 100 == 0:
+                time.sleep(0.01)
+        logger.remove()
+
+        files = sorted(os.listdir(tmp))
+        rotated = [name for name in files if name != "bot.log"]
+        assert rotated and all(name.startswith("bot.") and name.endswith(".log") for name in rotated)
+        total = sum(len(open(os.path.join(tmp, name), encoding='utf-8').read().splitlines()) for name in files)
+        assert total == 1000, total
+        print(f"✅ 轮转出 {len(rotated)} 个文件，共 {total} 条")
+
+
+def main():
+    """主函数"""
+    print("🧪 日志测试")
+    print("=" * 50)
+
+    test_module_sampler()
+    test_lazy_formatting()
+    test_queued_json_sink()
+    test_queued_rotation()
+
+    print("\n🎉 所有测试完成！")
+
+
+if __name__ == "__main__":
+    main()
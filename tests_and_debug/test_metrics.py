@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+测试进程内指标注册表和本地HTTP端点
+"""
+import os
+import sys
+import json
+import threading
+import urllib.request
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.metrics import MetricsRegistry
+
+
+def test_counter_gauge():
+    """计数器与仪表"""
+    print("🔢 测试计数器与仪表...")
+    registry = MetricsRegistry()
+    loads = registry.counter('test_page_loads_total', '页面加载次数', ('page_type',))
+    loads.inc(page_type='search')
+    loads.inc(2, page_type='search')
+    loads.inc(page_type='detail')
+    assert loads.value(page_type='search') == 3
+    assert registry.counter('test_page_loads_total', '页面加载次数', ('page_type',)) is loads
+
+    depth = registry.gauge('test_queue_depth', '队列长度')
+    depth.set(5)
+    depth.dec()
+    assert depth.value() == 4
+
+    try:
+        loads.inc(kind='x')
+        assert False, "标签不匹配应报错"
+    except ValueError:
+        pass
+
+    # 多线程累加不丢失
+    threads = [threading.Thread(target=lambda: [loads.inc(page_type='chat') for _ in range(1000)]) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert loads.value(page_type='chat') == 4000
+    print("✅ 计数器与仪表正常")
+
+
+def test_histogram_and_render():
+    """直方图与Prometheus文本格式"""
+    print("\n📊 测试直方图与文本格式...")
+    registry = MetricsRegistry()
+    seconds = registry.histogram('test_parse_seconds', '解析耗时', buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 3.0):
+        seconds.observe(value)
+    with seconds.time():
+        pass
+
+    text = registry.render()
+    print(text)
+    assert '# TYPE test_parse_seconds histogram' in text
+    assert 'test_parse_seconds_bucket{le="0.1"} 2' in text
+    assert 'test_parse_seconds_bucket{le="1"} 4' in text
+    assert 'test_parse_seconds_bucket{le="+Inf"} 5' in text
+    assert 'test_parse_seconds_count 5' in text
+
+    registry.counter('test_greetings_total', '打招呼', ('result',)).inc(result='a"b')
+    assert 'test_greetings_total{result="a\\"b"} 1' in registry.render()
+
+    snapshot = registry.snapshot()
+    assert snapshot['test_parse_seconds']['count'] == 5
+    assert snapshot['test_greetings_total'] == {'a"b': 1}
+    print("✅ 直方图与文本格式正常")
+
+
+def test_http_endpoint():
+    """本地HTTP端点"""
+    print("\n🌐 测试HTTP端点...")
+    registry = MetricsRegistry()
+    registry.counter('test_ws_frames_total', '帧数', ('direction',)).inc(direction='in')
+    server = registry.start_server(0)
+    try:
+        port = server.server_address[1]
+        text = urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics", timeout=5).read().decode('utf-8')
+        assert 'test_ws_frames_total{direction="in"} 1' in text
+        data = json.loads(urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics.json", timeout=5).read())
+        assert data['test_ws_frames_total'] == {'in': 1}
+    finally:
+        registry.stop_server()
+    print("✅ HTTP端点正常")
+
+
+def test_port_in_use():
+    """端口被占用时记录警告并返回None，不抛出异常"""
+    print("\n🚧 测试端口被占用...")
+    first = MetricsRegistry()
+    server = first.start_server(0)
+    try:
+        second = MetricsRegistry()
+        assert second.start_server(server.server_address[1]) is None
+        assert second.server is None
+    finally:
+        first.stop_server()
+    print("✅ 端口被占用时继续运行")
+
+
+def main():
+    """主函数"""
+    print("🧪 指标注册表测试")
+    print("=" * 50)
+
+    test_counter_gauge()
+    test_histogram_and_render()
+    test_http_endpoint()
+    test_port_in_use()
+
+    print("\n🎉 所有测试完成！")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+测试网络抓包解析的脚本（使用模拟driver，不需要浏览器）
+"""
+import sys
+import os
+import json
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.network_capture import (
+    NetworkCapture, JOB_HINT_KEYS, CHAT_HINT_KEYS, extract_records, map_job_record, map_chat_record
+)
+
+
+SEARCH_RESPONSE = {
+    'code': 200,
+    'data': {
+        'count': 2,
+        'list': [
+            {
+                'number': 'CC001J001',
+                'name': 'Python开发工程师',
+                'positionURL': '//jobs.zhaopin.com/CC001J001.htm',
+                'salary60': '1.5万-2万',
+                'workCity': '北京',
+                'workingExp': {'name': '3-5年'},
+                'education': '本科',
+                'companyName': '某某科技有限公司',
+                'skillLabel': [{'value': 'Python'}, {'value': 'Django'}]
+            },
+            {
+                'number': 'CC002J002',
+                'name': 'Java开发',
+                'positionURL': 'https://jobs.zhaopin.com/CC002J002.htm',
+                'salary60': '面议',
+                'workCity': '上海',
+                'companyName': '另一家公司',
+                'chatId': 'chat_002',
+                'imUserId': 'publisher_9'
+            }
+        ]
+    },
+    'meta': {'filters': [{'name': '城市', 'value': '530'}]}
+}
+
+
+class MockDriver:
+    """模拟driver：返回预设的performance日志和响应体"""
+    
+    def __init__(self, bodies):
+        self.bodies = bodies
+        self.logged = False
+        self.body_requests = 0
+    
+    def get_log(self, log_type):
+        if self.logged:
+            return []
+        self.logged = True
+        entries = []
+        for request_id, (url, _) in self.bodies.items():
+            entries.append({'message': json.dumps({'message': {
+                'method': 'Network.responseReceived',
+                'params': {'requestId': request_id, 'type': 'XHR',
+                           'response': {'url': url, 'mimeType': 'application/json'}}
+            }})})
+            entries.append({'message': json.dumps({'message': {
+                'method': 'Network.loadingFinished', 'params': {'requestId': request_id}
+            }})})
+        entries.append({'message': json.dumps({'message': {
+            'method': 'Network.webSocketCreated', 'params': {'url': 'wss://im.zhaopin.com/ws'}
+        }})})
+        return entries
+    
+    def execute_cdp_cmd(self, cmd, params):
+        self.body_requests += 1
+        return {'body': json.dumps(self.bodies[params['requestId']][1]), 'base64Encoded': False}
+
+
+def test_capture_search_response():
+    """测试从搜索接口响应构建候选人"""
+    print("🔍 测试搜索接口解析...")
+    driver = MockDriver({'1': ('https://fe-api.zhaopin.com/c/i/search/positions?pageIndex=1', SEARCH_RESPONSE)})
+    capture = NetworkCapture(driver)
+    capture.enabled = True
+    
+    records = capture.wait_for_records([r'search/positions'], JOB_HINT_KEYS, timeout=0)
+    candidates = [map_job_record(record) for record in records]
+    for candidate in candidates:
+        print(f"   {candidate['name']} | {candidate['company']} | {candidate['salary']} | {candidate['profile_url']}")
+    
+    assert len(candidates) == 2
+    assert candidates[0]['profile_url'] == 'https://jobs.zhaopin.com/CC001J001.htm'
+    assert candidates[0]['experience'] == '3-5年'
+    assert candidates[0]['skills'] == ['Python', 'Django']
+    assert candidates[1]['experience'] == '经验不限'
+    # 只有 chatId 才作为聊天ID，imUserId / sessionId 不算
+    assert 'chat_id' not in candidates[0] and candidates[1]['chat_id'] == 'chat_002'
+    assert 'chat_id' not in map_job_record({'name': 'Go开发', 'positionURL': '//jobs.zhaopin.com/CC3J3.htm',
+                                            'imUserId': 'publisher_1', 'sessionId': 'login_1'})
+    assert capture.websocket_urls == ['wss://im.zhaopin.com/ws']
+    print("✅ 搜索接口解析通过")
+
+
+def test_clear_skips_bodies():
+    """clear() 丢弃积压的日志，不获取响应体，但保留WebSocket地址"""
+    print("🧹 测试清空抓包...")
+    driver = MockDriver({str(i): (f'https://fe-api.zhaopin.com/c/i/search/positions?pageIndex={i}', SEARCH_RESPONSE)
+                         for i in range(20)})
+    capture = NetworkCapture(driver)
+    capture.enabled = True
+
+    capture.clear()
+    assert driver.body_requests == 0
+    assert not capture.responses and not capture._pending
+    assert capture.websocket_urls == ['wss://im.zhaopin.com/ws']
+    print("✅ 清空抓包通过")
+
+
+def test_hint_keys():
+    """只有 number 字段的列表不会被当作职位"""
+    print("🔑 测试职位特征字段...")
+    data = {'data': {'orders': [{'number': 'A1', 'amount': 3}], 'list': SEARCH_RESPONSE['data']['list']}}
+    assert extract_records(data, JOB_HINT_KEYS) == SEARCH_RESPONSE['data']['list']
+    assert extract_records({'orders': [{'number': 'A1', 'amount': 3}]}, JOB_HINT_KEYS) == []
+    print("✅ 职位特征字段通过")
+
+
+def test_chat_mapping():
+    """测试会话列表映射"""
+    print("💬 测试会话列表映射...")
+    record = {'sessionId': 's1', 'nickName': '张三', 'unreadCount': '3',
+              'lastMessage': {'content': '您好', 'sendTime': 1700000000000}}
+    chat = map_chat_record(record)
+    print(f"   {chat}")
+    assert chat['id'] == 's1' and chat['unread_count'] == 3 and chat['last_message'] == '您好'
+    print("✅ 会话列表映射通过")
+
+
+def main():
+    """主测试函数"""
+    print("🧪 网络抓包解析测试")
+    print("=" * 50)
+    test_capture_search_response()
+    test_clear_skips_bodies()
+    test_hint_keys()
+    test_chat_mapping()
+    print("\n🎉 所有测试完成！")
+
+
+if __name__ == "__main__":
+    main()
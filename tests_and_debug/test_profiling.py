@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+测试运行剖析（cProfile / 采样）的输出文件
+"""
+import os
+import sys
+import json
+import time
+import tempfile
+import threading
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.profiling import Profiler, SamplingProfiler
+
+
+def busy_parse(seconds: float):
+    """模拟解析热点"""
+    deadline = time.perf_counter() + seconds
+    total = 0
+    while time.perf_counter() < deadline:
+        total += sum(range(200))
+    return total
+
+
+def waiting_worker(stop: threading.Event):
+    """模拟等待中的工作线程"""
+    stop.wait()
+
+
+def test_sampling_profiler():
+    """采样剖析器能找到热点函数，并记录等待中的线程"""
+    print("🔥 测试采样剖析...")
+    stop = threading.Event()
+    worker = threading.Thread(target=waiting_worker, args=(stop,), name="forwarder-worker")
+    worker.start()
+
+    sampler = SamplingProfiler(interval=0.002)
+    sampler.start()
+    busy_parse(0.3)
+    sampler.stop()
+    stop.set()
+    worker.join()
+
+    assert sampler.samples > 20, sampler.samples
+    # 空闲线程每次也会被采样，排名可能与热点函数并列，因此按采样数判断
+    top = sampler.top_functions(None)
+    busy = [total for name, _, total in top if name.startswith("busy_parse")]
+    print(f"   采样 {sampler.samples} 次，热点: {[name for name, _, _ in top[:3]]}")
+    assert busy and busy[0] >= sampler.samples * 0.8, busy
+    assert any(stack.startswith("thread:forwarder-worker;") and "waiting_worker" in stack
+               for stack in sampler.stacks)
+    print("✅ 采样剖析正常")
+
+
+def test_profiler_outputs():
+    """两种剖析方式都按模式和参数写出结果文件"""
+    print("\n📁 测试剖析输出...")
+    with tempfile.TemporaryDirectory() as tmp:
+        for kind, extensions in (('sampling', {'.folded', '.txt', '.json'}), ('cprofile', {'.prof', '.txt', '.json'})):
+            with Profiler(kind, tags={'mode': 'search', 'keyword': 'Python'}, output_dir=tmp, interval=0.002) as profiler:
+                busy_parse(0.1)
+            assert {os.path.splitext(path)[1] for path in profiler.files} == extensions, profiler.files
+            assert os.path.basename(profiler.prefix).endswith(f"-search-{kind}")
+            meta = json.load(open(profiler.prefix + ".json", encoding='utf-8'))
+            assert meta['tags'] == {'mode': 'search', 'keyword': 'Python'} and meta['kind'] == kind
+
+        folded = [path for path in os.listdir(tmp) if path.endswith(".folded")][0]
+        for line in open(os.path.join(tmp, folded), encoding='utf-8'):
+            stack, count = line.rsplit(" ", 1)
+            assert stack.startswith("thread:") and int(count) > 0
+        print(f"✅ 输出文件: {sorted(os.listdir(tmp))}")
+
+    try:
+        Profiler('perf')
+        assert False, "不支持的剖析方式应报错"
+    except ValueError:
+        pass
+
+
+def main():
+    """主函数"""
+    print("🧪 运行剖析测试")
+    print("=" * 50)
+
+    test_sampling_profiler()
+    test_profiler_outputs()
+
+    print("\n🎉 所有测试完成！")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+测试搜索接口客户端的脚本（使用模拟会话，不需要浏览器）
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import settings
+from modules.search_api import ZhilianSearchClient
+
+
+def make_page(page):
+    return {'code': 200, 'data': {'list': [
+        {'number': f'CC{page}{i}', 'name': f'Python开发{page}-{i}', 'companyName': '某公司',
+         'positionURL': f'//jobs.zhaopin.com/CC{page}{i}.htm'}
+        for i in range(3)
+    ]}}
+
+
+class MockResponse:
+    def __init__(self, data, status_code=200):
+        self.data = data
+        self.status_code = status_code
+
+    def json(self):
+        return self.data
+
+
+class MockSession:
+    """模拟requests会话：按pageIndex返回预设页面，超出页数返回空列表"""
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.requests = []
+
+    def get(self, url, params=None, timeout=None):
+        self.requests.append((url, dict(params)))
+        page = params[settings.SEARCH_API_PARAM_NAMES['page']]
+        return MockResponse(self.pages.get(page, {'code': 200, 'data': {'list': []}}))
+
+
+class MockCapture:
+    """模拟网络抓包：返回一条已捕获的搜索请求"""
+
+    def __init__(self, url, data):
+        self.responses = [{'url': url, 'data': data}]
+
+    def drain(self):
+        return 0
+
+    def find_responses(self, patterns):
+        return self.responses
+
+
+def test_learn_endpoint():
+    """测试从抓包中学习接口地址和模板参数"""
+    print("🔍 测试学习搜索接口...")
+    capture = MockCapture(
+        'https://fe-api.zhaopin.com/c/i/search/positions?pageIndex=1&cityId=530&kw=java&at=abc&rt=xyz',
+        make_page(1)
+    )
+    client = ZhilianSearchClient(driver=None, network_capture=capture)
+    client.endpoint = None
+
+    assert client.learn_endpoint()
+    print(f"   接口: {client.endpoint}, 模板参数: {client.base_params}")
+    assert client.endpoint == 'https://fe-api.zhaopin.com/c/i/search/positions'
+    assert client.base_params == {'at': 'abc', 'rt': 'xyz'}
+
+    params = client.build_params(page=2, location='538', keyword='Python', education='4')
+    print(f"   查询参数: {params}")
+    assert params['cityId'] == '538' and params['kw'] == 'Python' and params['pageIndex'] == 2
+    assert 'workExperience' not in params and params['at'] == 'abc'
+    print("✅ 学习搜索接口通过")
+
+
+def test_learned_page_size():
+    """学到的每页条数用于后续页，从第2页接着请求时不跳过也不重复"""
+    print("📏 测试沿用学到的每页条数...")
+    capture = MockCapture(
+        'https://fe-api.zhaopin.com/c/i/search/positions?pageIndex=1&pageSize=20&kw=java&at=abc',
+        make_page(1)
+    )
+    client = ZhilianSearchClient(driver=type('Driver', (), {'get_cookies': lambda self: []})(), network_capture=capture)
+    client.endpoint = None
+    assert client.learn_endpoint()
+    assert client.page_size == 20 and 'pageSize' not in client.base_params
+
+    client.session = MockSession({2: make_page(2), 3: make_page(3)})
+    original_delay = settings.REQUEST_DELAY
+    settings.REQUEST_DELAY = 0
+    try:
+        list(client.iter_search(page_limit=3, start_page=2, keyword='Python'))
+    finally:
+        settings.REQUEST_DELAY = original_delay
+
+    sizes = [params['pageSize'] for _, params in client.session.requests]
+    print(f"   各页请求的 pageSize: {sizes}")
+    assert sizes == [20, 20]
+
+    # 抓到的请求没有 pageSize 时使用配置
+    capture.responses[0]['url'] = 'https://fe-api.zhaopin.com/c/i/search/positions?pageIndex=1&kw=java'
+    client.endpoint = None
+    assert client.learn_endpoint()
+    assert client.build_params(page=2)['pageSize'] == settings.SEARCH_API_PAGE_SIZE
+    print("✅ 每页条数沿用通过")
+
+
+def test_iter_search():
+    """测试分页请求并在空页停止"""
+    print("📄 测试接口分页...")
+    client = ZhilianSearchClient(driver=type('Driver', (), {'get_cookies': lambda self: []})())
+    client.endpoint = 'https://fe-api.zhaopin.com/c/i/search/positions'
+    client.session = MockSession({1: make_page(1), 2: make_page(2)})
+
+    original_delay = settings.REQUEST_DELAY
+    settings.REQUEST_DELAY = 0
+    try:
+        candidates = list(client.iter_search(page_limit=10, keyword='Python'))
+    finally:
+        settings.REQUEST_DELAY = original_delay
+
+    print(f"   请求次数: {len(client.session.requests)}, 候选人: {len(candidates)}")
+    assert len(candidates) == 6
+    assert len(client.session.requests) == 3
+    assert candidates[0]['profile_url'] == 'https://jobs.zhaopin.com/CC10.htm'
+    assert candidates[0]['source'] == 'api'
+    print("✅ 接口分页通过")
+
+
+def test_repeated_page_stops():
+    """测试接口忽略分页参数时停止翻页"""
+    print("🔁 测试重复页面检测...")
+    client = ZhilianSearchClient(driver=type('Driver', (), {'get_cookies': lambda self: []})())
+    client.endpoint = 'https://fe-api.zhaopin.com/c/i/search/positions'
+    client.session = MockSession({page: make_page(1) for page in range(1, 6)})
+
+    original_delay = settings.REQUEST_DELAY
+    settings.REQUEST_DELAY = 0
+    try:
+        candidates = list(client.iter_search(page_limit=5))
+    finally:
+        settings.REQUEST_DELAY = original_delay
+
+    assert len(candidates) == 3
+    assert len(client.session.requests) == 2
+    print("✅ 重复页面检测通过")
+
+
+def main():
+    """主测试函数"""
+    print("🧪 搜索接口客户端测试")
+    print("=" * 50)
+    test_learn_endpoint()
+    test_learned_page_size()
+    test_iter_search()
+    test_repeated_page_stops()
+    print("\n🎉 所有测试完成！")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+测试追踪span的嵌套、采样和导出格式
+"""
+import os
+import sys
+import json
+import time
+import tempfile
+import threading
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.tracing import Tracer, JsonlSpanExporter, ChromeTraceExporter, NOOP_SPAN
+
+
+def test_nesting_jsonl():
+    """父子关系与JSONL导出"""
+    print("🌲 测试span嵌套...")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "trace.jsonl")
+        tracer = Tracer(JsonlSpanExporter(path), sample_rate=1.0)
+        with tracer.span('search_candidates', keyword='Python') as root:
+            with tracer.span('load_page', page_type='search'):
+                time.sleep(0.01)
+            with tracer.span('extract_card', index=1) as card:
+                card.set(result='ok')
+            root.set(count=1)
+        try:
+            with tracer.span('send_greeting'):
+                raise ValueError("boom")
+        except ValueError:
+            pass
+        tracer.close()
+
+        spans = [json.loads(line) for line in open(path, encoding='utf-8')]
+        by_name = {span['name']: span for span in spans}
+        assert [span['name'] for span in spans] == ['load_page', 'extract_card', 'search_candidates', 'send_greeting']
+        assert by_name['load_page']['parent_id'] == by_name['search_candidates']['span_id']
+        assert by_name['load_page']['trace_id'] == by_name['search_candidates']['trace_id']
+        assert by_name['search_candidates']['parent_id'] is None
+        assert by_name['load_page']['duration_ms'] >= 10
+        assert by_name['extract_card']['attrs'] == {'index': 1, 'result': 'ok'}
+        assert by_name['search_candidates']['attrs']['count'] == 1
+        assert by_name['send_greeting']['attrs']['error'].startswith('ValueError')
+    print("✅ 父子关系、属性和异常记录正常")
+
+
+def test_sampling():
+    """按调用链采样：子span跟随根span"""
+    print("\n🎲 测试采样...")
+    exported = []
+
+    class Collector:
+        def export(self, span, tracer):
+            exported.append(span)
+
+        def close(self):
+            pass
+
+    tracer = Tracer(Collector(), sample_rate=0.0)
+    with tracer.span('root'):
+        with tracer.span('child'):
+            pass
+    assert exported == []
+
+    tracer.sample_rate = 0.5
+    for _ in range(400):
+        with tracer.span('root'):
+            with tracer.span('child'):
+                pass
+    roots = [span for span in exported if span.name == 'root']
+    children = [span for span in exported if span.name == 'child']
+    assert len(roots) == len(children) and 120 < len(roots) < 280, len(roots)
+    print(f"✅ 采样率0.5时记录了 {len(roots)}/400 条调用链，子span与根span一致")
+
+    # 关闭追踪时返回空区间
+    assert Tracer().span('x') is NOOP_SPAN
+
+
+def test_generator_and_threads():
+    """生成器中提前关闭的span不破坏栈，各线程栈相互独立"""
+    print("\n🔀 测试生成器与多线程...")
+    exported = []
+
+    class Collector:
+        def export(self, span, tracer):
+            exported.append(span)
+
+        def close(self):
+            pass
+
+    tracer = Tracer(Collector())
+
+    def pages():
+        with tracer.span('page'):
+            yield 1
+            yield 2
+
+    stream = pages()
+    with tracer.span('consumer'):
+        next(stream)
+    stream.close()
+    assert tracer.current_span() is NOOP_SPAN
+    assert {span.name for span in exported} == {'page', 'consumer'}
+
+    def worker():
+        with tracer.span('worker_root'):
+            pass
+
+    thread = threading.Thread(target=worker)
+    with tracer.span('main_root'):
+        thread.start()
+        thread.join()
+    worker_span = next(span for span in exported if span.name == 'worker_root')
+    assert worker_span.parent_id is None
+    print("✅ 栈状态正确")
+
+
+def test_chrome_trace():
+    """Chrome trace格式可被JSON解析"""
+    print("\n📈 测试Chrome trace导出...")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "trace.json")
+        tracer = Tracer(ChromeTraceExporter(path))
+        with tracer.span('search_candidates'):
+            with tracer.span('load_page', page_type='search'):
+                pass
+
+        # 未关闭时补上结尾即可解析（查看器对缺少 ] 的文件同样接受）
+        events = json.loads(open(path, encoding='utf-8').read() + "]")
+        assert len(events) == 2
+
+        tracer.close()
+        events = json.load(open(path, encoding='utf-8'))
+        assert {event['ph'] for event in events} == {'X'}
+        parent = next(event for event in events if event['name'] == 'search_candidates')
+        child = next(event for event in events if event['name'] == 'load_page')
+        assert parent['ts'] <= child['ts'] and child['ts'] + child['dur'] <= parent['ts'] + parent['dur'] + 1
+        assert child['args']['page_type'] == 'search'
+    print("✅ Chrome trace格式正确")
+
+
+def test_overhead():
+    """关闭和采样未命中时的开销"""
+    print("\n⏱️ 测试开销...")
+    disabled = Tracer()
+    start = time.perf_counter()
+    for _ in range(100000):
+        with disabled.span('card'):
+            pass
+    disabled_us = (time.perf_counter() - start) * 10
+
+    class Collector:
+        def export(self, span, tracer):
+            pass
+
+        def close(self):
+            pass
+
+    unsampled = Tracer(Collector(), sample_rate=0.0)
+    start = time.perf_counter()
+    for _ in range(100000):
+        with unsampled.span('card'):
+            pass
+    unsampled_us = (time.perf_counter() - start) * 10
+    print(f"✅ 每个span: 关闭 {disabled_us:.2f}µs，未采样 {unsampled_us:.2f}µs")
+    assert disabled_us < 5 and unsampled_us < 20
+
+
+def main():
+    """主函数"""
+    print("🧪 追踪测试")
+    print("=" * 50)
+
+    test_nesting_jsonl()
+    test_sampling()
+    test_generator_and_threads()
+    test_chrome_trace()
+    test_overhead()
+
+    print("\n🎉 所有测试完成！")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+测试浏览器用户数据目录的模板与副本
+"""
+import os
+import sys
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import settings
+from modules.user_data import account_profile_dir, clone_profile
+
+
+def test_disabled_by_default():
+    """未配置时不使用持久化目录"""
+    print("🔧 测试未配置 CHROME_PROFILE_DIR...")
+    original = settings.CHROME_PROFILE_DIR
+    settings.CHROME_PROFILE_DIR = None
+    try:
+        assert account_profile_dir("13800000000") is None
+        assert clone_profile("13800000000", 1) is None
+    finally:
+        settings.CHROME_PROFILE_DIR = original
+    print("✅ 未配置时返回None")
+
+
+def test_template_and_clone():
+    """模板按账号隔离，副本跳过锁文件"""
+    print("\n📁 测试模板与副本...")
+    original = settings.CHROME_PROFILE_DIR
+    with tempfile.TemporaryDirectory() as root:
+        settings.CHROME_PROFILE_DIR = root
+        try:
+            template = account_profile_dir("138 0000/0000")
+            assert template.startswith(root) and template.endswith("template")
+            assert os.path.isdir(template)
+            assert account_profile_dir("other") != template
+
+            os.makedirs(os.path.join(template, "Default"))
+            with open(os.path.join(template, "Default", "Cookies"), "w") as f:
+                f.write("cookies")
+            with open(os.path.join(template, "SingletonLock"), "w") as f:
+                f.write("lock")
+
+            clone = clone_profile("138 0000/0000", 1)
+            assert clone == os.path.join(os.path.dirname(template), "lane-1")
+            assert os.path.isfile(os.path.join(clone, "Default", "Cookies"))
+            assert not os.path.exists(os.path.join(clone, "SingletonLock"))
+            print(f"✅ 副本: {clone}")
+
+            # 已有副本直接复用，refresh 时重新复制
+            with open(os.path.join(clone, "marker"), "w") as f:
+                f.write("x")
+            assert os.path.exists(os.path.join(clone_profile("138 0000/0000", 1), "marker"))
+            assert not os.path.exists(os.path.join(clone_profile("138 0000/0000", 1, refresh=True), "marker"))
+            print("✅ 副本复用与刷新正常")
+        finally:
+            settings.CHROME_PROFILE_DIR = original
+
+
+def main():
+    """主函数"""
+    print("🧪 浏览器用户数据目录测试")
+    print("=" * 50)
+
+    test_disabled_by_default()
+    test_template_and_clone()
+
+    print("\n🎉 所有测试完成！")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+测试WebSocket协议层心跳：正常连接按时收到pong，半开连接在限定时间内被发现并重连，且不累积心跳线程
+（在本机启动一个最小的WebSocket服务端，不需要外部网络）
+"""
+import sys
+import os
+import re
+import time
+import base64
+import socket
+import hashlib
+import threading
+from types import SimpleNamespace
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import settings
+from utils import metrics
+from modules.websocket_chat import WebSocketChatManager
+
+
+class TinyServer:
+    """最小WebSocket服务端：按顺序为每个连接指定模式，responsive 回复pong，dead 只读不回（模拟半开连接）"""
+
+    def __init__(self, modes):
+        self.modes = list(modes)
+        self.app_pings = 0
+        self.sock = socket.socket()
+        self.sock.bind(("127.0.0.1", 0))
+        self.sock.listen()
+        self.port = self.sock.getsockname()[1]
+        self.connections = []
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def _accept(self):
+        while True:
+            try:
+                conn, _ = self.sock.accept()
+            except OSError:
+                return
+            self.connections.append(conn)
+            mode = self.modes.pop(0) if self.modes else 'responsive'
+            threading.Thread(target=self._serve, args=(conn, mode), daemon=True).start()
+
+    @staticmethod
+    def _recv_exact(conn, size):
+        data = b''
+        while len(data) < size:
+            chunk = conn.recv(size - len(data))
+            if not chunk:
+                raise ConnectionError()
+            data += chunk
+        return data
+
+    def _serve(self, conn, mode):
+        try:
+            request = b''
+            while b'\r\n\r\n' not in request:
+                request += conn.recv(1024)
+            key = re.search(rb'Sec-WebSocket-Key:\s*(\S+)', request, re.I).group(1)
+            accept = base64.b64encode(hashlib.sha1(key + b'258EAFA5-E914-47DA-95CA-C5AB0DC85B11').digest())
+            conn.sendall(b'HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\n'
+                         b'Connection: Upgrade\r\nSec-WebSocket-Accept: ' + accept + b'\r\n\r\n')
+            while True:
+                first, second = self._recv_exact(conn, 2)
+                opcode, length = first & 0x0F, second & 0x7F
+                if length == 126:
+                    length = int.from_bytes(self._recv_exact(conn, 2), 'big')
+                elif length == 127:
+                    length = int.from_bytes(self._recv_exact(conn, 8), 'big')
+                mask = self._recv_exact(conn, 4)
+                payload = bytes(b ^ mask[i % 4] for i, b in enumerate(self._recv_exact(conn, length)))
+                if opcode == 0x8:
+                    return
+                if opcode == 0x1 and b'"ping"' in payload:
+                    self.app_pings += 1
+                if opcode == 0x9 and mode == 'responsive':
+                    conn.sendall(bytes([0x8A, len(payload)]) + payload)
+        except (ConnectionError, OSError):
+            pass
+
+    def close(self):
+        self.sock.close()
+        for conn in self.connections:
+            try:
+                conn.close()
+            except OSError:
+                pass
+
+
+class LocalManager(WebSocketChatManager):
+    """直接连接本机服务端"""
+
+    def __init__(self, port):
+        driver = SimpleNamespace(get_cookies=lambda: [])
+        super().__init__(driver, network_capture=SimpleNamespace())
+        self.port = port
+
+    def extract_websocket_info(self) -> bool:
+        self.ws_url = f"ws://127.0.0.1:{self.port}/chat"
+        return True
+
+
+def client_threads():
+    """监督线程和 websocket-client 的ping线程"""
+    return [t.name for t in threading.enumerate() if t.name == "websocket-supervisor" or "_send_ping" in t.name]
+
+
+def test_heartbeat():
+    """半开连接在 PING_INTERVAL + PING_TIMEOUT 内被发现，重连后正常连接持续收到pong"""
+    print("💓 测试心跳与失联检测...")
+    names = ('WS_PING_INTERVAL', 'WS_PING_TIMEOUT', 'WS_RECONNECT_INTERVAL', 'WS_APP_PING')
+    original = {name: getattr(settings, name) for name in names}
+    settings.WS_PING_INTERVAL, settings.WS_PING_TIMEOUT, settings.WS_RECONNECT_INTERVAL, settings.WS_APP_PING = 0.3, 0.2, 0.05, True
+    metrics.reset()
+    server = TinyServer(['dead', 'responsive'])
+    try:
+        manager = LocalManager(server.port)
+        assert manager.connect()
+        first_connected = time.time()
+
+        # 等待失联被发现并重连
+        deadline = time.time() + 5
+        while metrics.get('zhilian_ws_dead_peer_total').value() == 0 and time.time() < deadline:
+            time.sleep(0.02)
+        detected = time.time() - first_connected
+        assert metrics.get('zhilian_ws_dead_peer_total').value() == 1
+        assert detected < settings.WS_PING_INTERVAL + settings.WS_PING_TIMEOUT + 0.5, detected
+
+        while not manager.is_connected and time.time() < deadline:
+            time.sleep(0.02)
+        time.sleep(1.2)
+        assert manager.is_connected
+        assert metrics.get('zhilian_ws_dead_peer_total').value() == 1
+        pongs = metrics.get('zhilian_ws_frames_total').value(direction='pong')
+        assert pongs >= 3, pongs
+        assert server.app_pings >= 3, server.app_pings
+        assert manager.last_frame_age is not None and manager.last_frame_age < settings.WS_PING_INTERVAL + 0.1
+
+        # 运行中只有监督线程和当前连接的ping线程
+        assert len(client_threads()) == 2, client_threads()
+        manager.disconnect()
+    finally:
+        server.close()
+        for name, value in original.items():
+            setattr(settings, name, value)
+
+    assert client_threads() == [], client_threads()
+    print(f"✅ 半开连接 {detected:.2f}s 后被发现，重连后收到 {pongs:.0f} 个pong、服务端收到 {server.app_pings} 个应用层心跳")
+
+
+def test_ping_options():
+    """ping_timeout 必须小于 ping_interval"""
+    print("\n⚙️ 测试心跳参数...")
+    original = (settings.WS_PING_INTERVAL, settings.WS_PING_TIMEOUT)
+    try:
+        settings.WS_PING_INTERVAL, settings.WS_PING_TIMEOUT = 30, 10
+        assert WebSocketChatManager._ping_options() == {'ping_interval': 30, 'ping_timeout': 10}
+        settings.WS_PING_INTERVAL, settings.WS_PING_TIMEOUT = 10, 30
+        assert WebSocketChatManager._ping_options() == {'ping_interval': 10, 'ping_timeout': 5}
+        settings.WS_PING_INTERVAL, settings.WS_PING_TIMEOUT = 0, 10
+        assert WebSocketChatManager._ping_options() == {'ping_interval': 0, 'ping_timeout': None}
+    finally:
+        settings.WS_PING_INTERVAL, settings.WS_PING_TIMEOUT = original
+    print("✅ 心跳参数通过")
+
+
+def main():
+    """主函数"""
+    print("🧪 WebSocket心跳测试")
+    print("=" * 50)
+
+    test_heartbeat()
+    test_ping_options()
+
+    print("\n🎉 所有测试完成！")
+
+
+if __name__ == "__main__":
+    main()
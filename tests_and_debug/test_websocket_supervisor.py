@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+测试WebSocket监督线程的重连、退避、登录态失效处理和连接时长指标（使用模拟连接，不需要网络）
+登录态失效后的重新提取和cookies读取必须在持有driver的线程中完成
+"""
+import sys
+import os
+import time
+import inspect
+import threading
+from types import SimpleNamespace
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import settings
+from utils import metrics
+from modules import websocket_chat
+from modules.websocket_chat import WebSocketChatManager
+
+
+class BadStatus(Exception):
+    """模拟握手被拒绝"""
+
+    def __init__(self, status_code):
+        super().__init__(f"Handshake status {status_code}")
+        self.status_code = status_code
+
+
+class FakeApp:
+    """模拟 WebSocketApp：按脚本依次建立连接、保持一段时间后关闭，或握手失败"""
+
+    scripts = []
+    stack_depths = []
+    supervisors = []
+
+    def __init__(self, url, header, on_open, on_message, on_error, on_close, on_pong=None):
+        self.url = url
+        self.header = header
+        self.on_open = on_open
+        self.on_error = on_error
+        self.on_close = on_close
+        self.closed = threading.Event()
+
+    def run_forever(self, **kwargs):
+        FakeApp.stack_depths.append(len(inspect.stack()))
+        FakeApp.supervisors.append(sum(1 for t in threading.enumerate() if t.name == "websocket-supervisor"))
+        kind, value, code = FakeApp.scripts.pop(0) if FakeApp.scripts else ('open', 60, 1000)
+        if kind == 'reject':
+            self.on_error(self, BadStatus(value))
+            self.on_close(self, None, None)
+            return
+        self.on_open(self)
+        self.closed.wait(value)
+        self.on_close(self, code, "")
+
+    def close(self):
+        self.closed.set()
+
+
+class MockManager(WebSocketChatManager):
+    """记录提取连接地址的次数，以及访问driver的线程"""
+
+    def __init__(self):
+        self.driver_threads = set()
+        driver = SimpleNamespace(get_cookies=self._get_cookies)
+        super().__init__(driver, network_capture=SimpleNamespace())
+        self.extractions = 0
+
+    def _get_cookies(self):
+        self.driver_threads.add(threading.current_thread().name)
+        return [{'name': 'at', 'value': 'token'}]
+
+    def extract_websocket_info(self) -> bool:
+        self.driver_threads.add(threading.current_thread().name)
+        self.extractions += 1
+        self.ws_url = f"wss://im.zhaopin.com/ws?v={self.extractions}"
+        return True
+
+
+def test_backoff_delay():
+    """等待时间按指数增长到上限，并在 [d/2, d] 之间抖动"""
+    print("📈 测试退避时间...")
+    manager = MockManager()
+    manager.reconnect_interval = 5
+    for attempt in range(1, 10):
+        expected = min(settings.WS_RECONNECT_MAX_INTERVAL, 5 * 2 ** (attempt - 1))
+        delays = [manager._backoff_delay(attempt) for _ in range(50)]
+        assert all(expected / 2 <= d <= expected for d in delays), (attempt, delays[:3])
+        assert len(set(delays)) > 1
+    assert manager._backoff_delay(5000) <= settings.WS_RECONNECT_MAX_INTERVAL
+    print("✅ 退避时间通过")
+
+
+def test_supervisor_reconnects():
+    """断线、握手失败和登录态失效都由同一个监督线程处理，不递归、不累积线程"""
+    print("\n🔁 测试监督线程重连...")
+    original = (settings.WS_RECONNECT_INTERVAL, settings.WS_RECONNECT_MAX_INTERVAL, settings.WS_STABLE_SECONDS)
+    original_module = websocket_chat.websocket
+    settings.WS_RECONNECT_INTERVAL, settings.WS_RECONNECT_MAX_INTERVAL, settings.WS_STABLE_SECONDS = 0.02, 0.1, 0.3
+    websocket_chat.websocket = SimpleNamespace(WebSocketApp=FakeApp)
+    metrics.reset()
+    FakeApp.scripts = [
+        ('open', 0.05, 1006),   # 短暂连接后异常断开
+        ('reject', 502, None),  # 握手失败，继续重试
+        ('reject', 502, None),
+        ('open', 0.4, 1008),    # 稳定运行后因登录态失效被关闭
+        ('reject', 401, None),  # 握手被拒绝，再次重新提取
+    ]
+    try:
+        manager = MockManager()
+        assert manager.connect()
+        deadline = time.time() + 5
+        # 模拟主线程的监控循环：按需刷新连接信息
+        while FakeApp.scripts and time.time() < deadline:
+            manager.refresh_connection_info()
+            time.sleep(0.02)
+        while not manager.is_connected and time.time() < deadline:
+            manager.refresh_connection_info()
+            time.sleep(0.02)
+        assert manager.is_connected
+        attempts = manager.reconnect_attempts
+        manager.disconnect()
+    finally:
+        websocket_chat.websocket = original_module
+        settings.WS_RECONNECT_INTERVAL, settings.WS_RECONNECT_MAX_INTERVAL, settings.WS_STABLE_SECONDS = original
+
+    print(f"   连接次数: {len(FakeApp.stack_depths)}，调用栈深度: {set(FakeApp.stack_depths)}，提取地址: {manager.extractions} 次")
+    assert len(FakeApp.stack_depths) == 6
+    assert len(set(FakeApp.stack_depths)) == 1          # 重连不再递归
+    assert set(FakeApp.supervisors) == {1}              # 始终只有一个监督线程
+    assert manager.extractions == 3                     # 初次 + 两次登录态失效
+    assert manager.driver_threads == {threading.current_thread().name}  # 只在主线程访问driver
+    assert attempts == 2, attempts                      # 稳定连接后计数清零
+    assert metrics.get('zhilian_ws_reconnects_total').value() == 5
+    durations = metrics.snapshot()['zhilian_ws_connection_seconds']
+    assert durations['count'] == 3 and durations['sum'] >= 0.45, durations
+    assert metrics.get('zhilian_ws_connected_since_seconds').value() == 0
+    assert not any(t.name == "websocket-supervisor" for t in threading.enumerate())
+    print("✅ 监督线程重连通过")
+
+
+def test_attempt_limit():
+    """连续失败达到上限后停止重连，connect() 不会一直等待"""
+    print("\n🛑 测试重连上限...")
+    original_module = websocket_chat.websocket
+    websocket_chat.websocket = SimpleNamespace(WebSocketApp=FakeApp)
+    FakeApp.scripts = [('reject', 502, None)] * 10
+    try:
+        manager = MockManager()
+        manager.reconnect_interval = 0.01
+        manager.max_reconnect_attempts = 3
+        started = time.time()
+        assert not manager.connect()
+        assert time.time() - started < settings.WS_CONNECT_TIMEOUT
+        manager.supervisor_thread.join(timeout=2)
+        assert not manager.running and manager.reconnect_attempts == 4
+    finally:
+        websocket_chat.websocket = original_module
+        FakeApp.scripts = []
+    print("✅ 重连上限通过")
+
+
+def test_refresh_wait_stops():
+    """等待主线程刷新连接信息时断开，监督线程及时退出"""
+    print("\n⏸️ 测试等待刷新时断开...")
+    original_module = websocket_chat.websocket
+    websocket_chat.websocket = SimpleNamespace(WebSocketApp=FakeApp)
+    original_timeout = settings.WS_CONNECT_TIMEOUT
+    settings.WS_CONNECT_TIMEOUT = 0.3
+    FakeApp.scripts = [('reject', 401, None)]
+    try:
+        manager = MockManager()
+        manager.reconnect_interval = 0.01
+        assert not manager.connect()
+        assert manager.refresh_requested.is_set() and manager.extractions == 1
+        manager.disconnect()
+        assert not any(t.name == "websocket-supervisor" for t in threading.enumerate())
+    finally:
+        websocket_chat.websocket = original_module
+        settings.WS_CONNECT_TIMEOUT = original_timeout
+        FakeApp.scripts = []
+    print("✅ 等待刷新时断开通过")
+
+
+def main():
+    """主函数"""
+    print("🧪 WebSocket监督线程测试")
+    print("=" * 50)
+
+    test_backoff_delay()
+    test_supervisor_reconnects()
+    test_attempt_limit()
+    test_refresh_wait_stops()
+
+    print("\n🎉 所有测试完成！")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,5 +2,7 @@
 工具模块
 """
 from .logger import log
+from .metrics import metrics
+from .tracing import tracer, traced
 
-__all__ = ['log']
\ No newline at end of file
+__all__ = ['log', 'metrics', 'tracer', 'traced']
\ No newline at end of file
@@ -1,36 +1,178 @@
 """
 日志工具
 """
+import os
 import sys
+import glob
+import time
+import queue
+import atexit
+import random
+import threading
+from datetime import datetime
+from typing import Dict, Optional
 from loguru import logger
 from config import settings
 
 
+class ModuleSampler:
+    """
+    按模块对高频日志采样的过滤器
+
+    rates 为 {模块名前缀: 保留比例}，最长前缀优先匹配；WARNING及以上级别总是保留。
+    同一条日志在所有输出中的取舍一致（结果记在 record["extra"] 中）。
+    """
+
+    def __init__(self, rates: Dict[str, float]):
+        self.rates = sorted(rates.items(), key=lambda item: -len(item[0]))
+
+    def rate_for(self, name: str) -> float:
+        for prefix, rate in self.rates:
+            if name == prefix or name.startswith(prefix + "."):
+                return rate
+        return 1.0
+
+    def __call__(self, record) -> bool:
+        if not self.rates or record["level"].no >= 30:
+            return True
+        extra = record["extra"]
+        keep = extra.get("_sampled")
+        if keep is None:
+            rate = self.rate_for(record["name"] or "")
+            keep = extra["_sampled"] = rate >= 1 or random.random() < rate
+        return keep
+
+
+class QueuedWriter:
+    """
+    后台线程批量写出的日志输出
+
+    loguru 在调用线程中格式化好每行日志后交给 write()，这里只放入内存队列；
+    写线程一次取出队列中积压的全部日志合并写入并flush，磁盘或控制台变慢时不会阻塞抓取和WebSocket读取。
+    （loguru 自带的 enqueue=True 会把整条记录pickle后经进程间管道传递，调用方开销反而更大。）
+    写入文件时按 rotation_bytes 轮转，删除 retention_days 天前的轮转文件，命名与 loguru 一致。
+    """
+
+    def __init__(self, target, rotation_bytes: int = None, retention_days: float = None, encoding: str = "utf-8"):
+        self.path = target if isinstance(target, str) else None
+        self.stream = target if self.path is None else None
+        self.rotation_bytes = rotation_bytes
+        self.retention_days = retention_days
+        self.encoding = encoding
+        self.queue = queue.SimpleQueue()
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+
+    def write(self, message):
+        self.queue.put(message)
+
+    def _open(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.stream = open(self.path, "a", encoding=self.encoding)
+
+    def _rotate(self):
+        self.stream.close()
+        root, ext = os.path.splitext(self.path)
+        os.replace(self.path, f"{root}.{datetime.now():%Y-%m-%d_%H-%M-%S_%f}{ext}")
+        if self.retention_days is not None:
+            cutoff = time.time() - self.retention_days * 86400
+            for old in glob.glob(f"{glob.escape(root)}.*{ext}"):
+                try:
+                    if os.path.getmtime(old) < cutoff:
+                        os.remove(old)
+                except OSError:
+                    pass
+        self._open()
+
+    def _run(self):
+        while True:
+            batch = [self.queue.get()]
+            while len(batch) < 1000:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            done = batch[-1] is None
+            lines = [message for message in batch if message is not None]
+            if lines:
+                try:
+                    if self.stream is None:
+                        self._open()
+                    self.stream.write("".join(lines))
+                    self.stream.flush()
+                    if self.path and self.rotation_bytes and self.stream.tell() >= self.rotation_bytes:
+                        self._rotate()
+                except Exception as e:
+                    sys.stderr.write(f"写入日志失败: {e}\n")
+            if done:
+                return
+
+    def stop(self):
+        """写完队列中剩余的日志后停止"""
+        if self._stopped:
+            return
+        self._stopped = True
+        self.queue.put(None)
+        self._thread.join(timeout=5)
+        if self.path and self.stream is not None:
+            self.stream.close()
+
+
+def _sink(target, rotation_bytes: int = None, retention_days: float = None):
+    """LOG_ENQUEUE 开启时用后台写线程包装输出"""
+    if not settings.LOG_ENQUEUE:
+        return target
+    return QueuedWriter(target, rotation_bytes, retention_days)
+
+
+def _file_options(path: str) -> Dict:
+    """文件输出的参数：后台写出时轮转由 QueuedWriter 负责，否则交给 loguru"""
+    if settings.LOG_ENQUEUE:
+        return {'sink': _sink(path, 10 * 1024 * 1024, 7)}
+    return {'sink': path, 'rotation': "10 MB", 'retention': "7 days", 'encoding': "utf-8"}
+
+
 def setup_logger():
     """设置日志配置"""
     # 移除默认的日志处理器
     logger.remove()
-    
+
+    # 高频日志采样（未配置时不过滤）
+    sampler: Optional[ModuleSampler] = ModuleSampler(settings.LOG_SAMPLING) if settings.LOG_SAMPLING else None
+
     # 添加控制台输出
     logger.add(
-        sys.stdout,
+        _sink(sys.stdout),
         level=settings.LOG_LEVEL,
         format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>",
-        colorize=True
+        colorize=True,
+        filter=sampler
     )
-    
+
     # 添加文件输出
     logger.add(
-        settings.LOG_FILE,
         level=settings.LOG_LEVEL,
         format="{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {name}:{function}:{line} - {message}",
-        rotation="10 MB",
-        retention="7 days",
-        encoding="utf-8"
+        filter=sampler,
+        **_file_options(settings.LOG_FILE)
     )
-    
+
+    # 结构化JSON日志（每行一条，包含级别、模块、函数、行号和extra字段）
+    if settings.LOG_JSON_FILE:
+        logger.add(
+            level=settings.LOG_LEVEL,
+            serialize=True,
+            filter=sampler,
+            **_file_options(settings.LOG_JSON_FILE)
+        )
+
     return logger
 
 
 # 全局日志实例
-log = setup_logger()
\ No newline at end of file
+log = setup_logger()
@@ -0,0 +1,267 @@
+"""
+进程内指标 - 计数器、仪表和直方图，可输出Prometheus文本格式并通过本地HTTP端点提供
+"""
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .logger import log
+
+
+# 默认直方图分桶（秒），覆盖选择器查找到整页加载的耗时范围
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labelnames: Sequence[str], labelvalues: Tuple, extra: Dict[str, str] = None) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, labelvalues)]
+    if extra:
+        pairs.extend(f'{name}="{_escape(value)}"' for name, value in extra.items())
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    """指标基类：按标签值分组保存样本"""
+
+    type_name = ''
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.lock = threading.Lock()
+        self.samples: Dict[Tuple, object] = {}
+
+    def _key(self, labels: Dict) -> Tuple:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"指标 {self.name} 需要标签 {self.labelnames}，实际为 {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        with self.lock:
+            items = sorted(self.samples.items())
+        for key, value in items:
+            lines.extend(self._render_sample(key, value))
+        return lines
+
+    def _render_sample(self, key: Tuple, value) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"]
+
+    def snapshot(self) -> Dict:
+        with self.lock:
+            items = list(self.samples.items())
+        if not self.labelnames:
+            return self._snapshot_value(items[0][1]) if items else self._snapshot_value(None)
+        return {",".join(key): self._snapshot_value(value) for key, value in items}
+
+    def _snapshot_value(self, value):
+        return value or 0
+
+    def reset(self):
+        with self.lock:
+            self.samples.clear()
+
+
+class Counter(_Metric):
+    """只增不减的计数器"""
+
+    type_name = 'counter'
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self.lock:
+            self.samples[key] = self.samples.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        with self.lock:
+            return self.samples.get(self._key(labels), 0)
+
+
+class Gauge(_Metric):
+    """可任意设置的当前值"""
+
+    type_name = 'gauge'
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self.lock:
+            self.samples[key] = value
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self.lock:
+            self.samples[key] = self.samples.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def value(self, **labels) -> Optional[float]:
+        with self.lock:
+            return self.samples.get(self._key(labels))
+
+
+class Histogram(_Metric):
+    """分桶直方图，记录观测值的分布、总和与次数"""
+
+    type_name = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Iterable[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            sample = self.samples.get(key)
+            if sample is None:
+                sample = self.samples[key] = {'counts': [0] * (len(self.buckets) + 1), 'sum': 0.0, 'count': 0}
+            sample['counts'][index] += 1
+            sample['sum'] += value
+            sample['count'] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """记录代码块耗时（秒）"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def _render_sample(self, key: Tuple, value) -> List[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float('inf'),), value['counts']):
+            cumulative += count
+            labels = _format_labels(self.labelnames, key, {'le': _format_value(bound)})
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        labels = _format_labels(self.labelnames, key)
+        lines.append(f"{self.name}_sum{labels} {_format_value(value['sum'])}")
+        lines.append(f"{self.name}_count{labels} {value['count']}")
+        return lines
+
+    def _snapshot_value(self, value):
+        if not value:
+            return {'count': 0, 'sum': 0.0, 'avg': 0.0}
+        return {'count': value['count'], 'sum': round(value['sum'], 4),
+                'avg': round(value['sum'] / value['count'], 4) if value['count'] else 0.0}
+
+
+class MetricsRegistry:
+    """指标注册表，同名指标只创建一次"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.metrics: Dict[str, _Metric] = {}
+        self.server = None
+
+    def _register(self, cls, name: str, documentation: str, labelnames: Sequence[str], **kwargs):
+        with self.lock:
+            metric = self.metrics.get(name)
+            if metric is None:
+                metric = self.metrics[name] = cls(name, documentation, labelnames, **kwargs)
+            elif not isinstance(metric, cls) or metric.labelnames != tuple(labelnames):
+                raise ValueError(f"指标 {name} 已以不同类型或标签注册")
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge, name, documentation, labelnames)
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Iterable[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def get(self, name: str) -> Optional[_Metric]:
+        return self.metrics.get(name)
+
+    def render(self) -> str:
+        """Prometheus文本格式"""
+        with self.lock:
+            metrics = sorted(self.metrics.values(), key=lambda metric: metric.name)
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> Dict:
+        """所有指标当前值的字典（直方图给出次数、总和和平均值）"""
+        with self.lock:
+            metrics = list(self.metrics.values())
+        return {metric.name: metric.snapshot() for metric in metrics}
+
+    def reset(self):
+        with self.lock:
+            metrics = list(self.metrics.values())
+        for metric in metrics:
+            metric.reset()
+
+    def start_server(self, port: int, host: str = "127.0.0.1"):
+        """
+        在后台线程中提供 /metrics（Prometheus文本）和 /metrics.json
+
+        端口被占用等原因无法监听时只记录警告并返回None，不影响机器人运行。
+        """
+        if self.server is not None:
+            return self.server
+
+        import json
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.startswith("/metrics.json"):
+                    body = json.dumps(registry.snapshot(), ensure_ascii=False).encode('utf-8')
+                    content_type = "application/json; charset=utf-8"
+                elif self.path.startswith("/metrics"):
+                    body = registry.render().encode('utf-8')
+                    content_type = "text/plain; version=0.0.4; charset=utf-8"
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        try:
+            self.server = ThreadingHTTPServer((host, port), Handler)
+        except OSError as e:
+            log.warning(f"指标端点启动失败（{host}:{port}），继续运行但不提供 /metrics: {e}")
+            return None
+        thread = threading.Thread(target=self.server.serve_forever, name="metrics-server", daemon=True)
+        thread.start()
+        log.info(f"指标端点已启动: http://{host}:{self.server.server_address[1]}/metrics")
+        return self.server
+
+    def stop_server(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+
+# 全局指标注册表
+metrics = MetricsRegistry()
@@ -0,0 +1,184 @@
+"""
+运行剖析 - 用 cProfile 或低开销的采样剖析器记录一次运行，输出剖析文件和折叠栈（火焰图）文件
+"""
+import os
+import sys
+import json
+import time
+import threading
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Optional
+
+from config import settings
+from .logger import log
+
+
+PROFILER_KINDS = ('cprofile', 'sampling')
+
+
+class SamplingProfiler:
+    """采样剖析器
+
+    后台线程每隔 interval 秒读取一次所有线程的调用栈（sys._current_frames），按折叠栈计数。
+    记录的是挂钟时间：等待页面、等待锁和 sleep 的时间同样会出现在结果中。
+    """
+
+    def __init__(self, interval: float = None):
+        self.interval = interval or settings.PROFILE_SAMPLE_INTERVAL
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    @staticmethod
+    def _frame_name(frame) -> str:
+        code = frame.f_code
+        return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+    def _sample(self):
+        own_id = threading.get_ident()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_id:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(self._frame_name(frame))
+                frame = frame.f_back
+            stack.append(f"thread:{names.get(thread_id, thread_id)}")
+            self.stacks[";".join(reversed(stack))] += 1
+        self.samples += 1
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def write_collapsed(self, filename: str):
+        """折叠栈格式（每行 "栈;帧 次数"），可用 flamegraph.pl、speedscope 等工具生成火焰图"""
+        with open(filename, 'w', encoding='utf-8') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+    def top_functions(self, limit: int = 30):
+        """按自身采样数和累计采样数统计的热点函数"""
+        self_counts = Counter()
+        total_counts = Counter()
+        for stack, count in self.stacks.items():
+            frames = stack.split(";")[1:]
+            if not frames:
+                continue
+            self_counts[frames[-1]] += count
+            for frame in set(frames):
+                total_counts[frame] += count
+        return [(name, self_counts[name], total_counts[name]) for name, _ in total_counts.most_common(limit)]
+
+
+class Profiler:
+    """
+    剖析一次运行，作为上下文管理器使用
+
+    输出到 PROFILE_DIR，文件名前缀为 {时间}-{mode}-{kind}：
+    - cprofile: .prof（pstats格式，可用 snakeviz 等工具查看）和 .txt（按累计耗时排序的前若干函数）；
+      cProfile 只挂在调用 start() 的线程上，后台线程（详情抓取、打招呼通道、WebSocket）不计入，需要时用 sampling
+    - sampling: .folded（折叠栈，火焰图输入）和 .txt（热点函数）
+    - 两种方式都写 .json，记录运行模式、参数和耗时，便于对比多次运行
+    """
+
+    def __init__(self, kind: str = 'sampling', tags: Dict = None, output_dir: str = None, interval: float = None):
+        if kind not in PROFILER_KINDS:
+            raise ValueError(f"不支持的剖析方式: {kind}（可选 {', '.join(PROFILER_KINDS)}）")
+        self.kind = kind
+        self.tags = dict(tags or {})
+        self.output_dir = output_dir or settings.PROFILE_DIR
+        self.interval = interval
+        self.prefix: Optional[str] = None
+        self.files = []
+        self._profiler = None
+        self._started = 0.0
+        self._started_at = None
+
+    def start(self):
+        self._started_at = datetime.now()
+        self._started = time.perf_counter()
+        if self.kind == 'cprofile':
+            import cProfile
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+            if threading.active_count() > 1:
+                log.info("cprofile 只记录当前线程，其他线程的耗时请用 sampling 剖析")
+        else:
+            self._profiler = SamplingProfiler(self.interval)
+            self._profiler.start()
+        log.info(f"开始剖析（{self.kind}）")
+
+    def stop(self):
+        if self._profiler is None:
+            return self.files
+        duration = time.perf_counter() - self._started
+        if self.kind == 'cprofile':
+            self._profiler.disable()
+        else:
+            self._profiler.stop()
+
+        try:
+            os.makedirs(self.output_dir, exist_ok=True)
+            mode = str(self.tags.get('mode', 'run'))
+            self.prefix = os.path.join(self.output_dir, f"{self._started_at:%Y%m%d-%H%M%S}-{mode}-{self.kind}")
+            meta = {'kind': self.kind, 'started_at': self._started_at.isoformat(timespec='seconds'),
+                    'duration_s': round(duration, 3), 'argv': sys.argv, 'tags': self.tags}
+
+            if self.kind == 'cprofile':
+                self._write_cprofile()
+            else:
+                self._write_sampling()
+                meta.update(samples=self._profiler.samples, interval=self._profiler.interval)
+
+            with open(self.prefix + ".json", 'w', encoding='utf-8') as f:
+                json.dump(meta, f, ensure_ascii=False, indent=2, default=str)
+            self.files.append(self.prefix + ".json")
+            log.info(f"剖析完成，耗时 {duration:.1f}s，结果: {', '.join(self.files)}")
+        except Exception as e:
+            log.error(f"写入剖析结果失败: {e}")
+        finally:
+            self._profiler = None
+        return self.files
+
+    def _write_cprofile(self):
+        import io
+        import pstats
+        self._profiler.dump_stats(self.prefix + ".prof")
+        buffer = io.StringIO()
+        pstats.Stats(self._profiler, stream=buffer).sort_stats('cumulative').print_stats(40)
+        with open(self.prefix + ".txt", 'w', encoding='utf-8') as f:
+            f.write(buffer.getvalue())
+        self.files.extend([self.prefix + ".prof", self.prefix + ".txt"])
+
+    def _write_sampling(self):
+        sampler = self._profiler
+        sampler.write_collapsed(self.prefix + ".folded")
+        with open(self.prefix + ".txt", 'w', encoding='utf-8') as f:
+            f.write(f"采样 {sampler.samples} 次，间隔 {sampler.interval * 1000:.1f}ms\n")
+            f.write(f"{'自身':>8}{'累计':>8}  函数\n")
+            for name, self_count, total_count in sampler.top_functions():
+                f.write(f"{self_count:>8}{total_count:>8}  {name}\n")
+        self.files.extend([self.prefix + ".folded", self.prefix + ".txt"])
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+        return False
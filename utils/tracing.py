@@ -0,0 +1,247 @@
+"""
+轻量级追踪 - 为热点路径记录嵌套的耗时区间（span），按调用链采样，写入JSONL或Chrome trace文件
+"""
+import os
+import json
+import time
+import random
+import atexit
+import functools
+import threading
+from typing import Dict, Optional
+
+from config import settings
+from .logger import log
+
+
+class Span:
+    """一个耗时区间，作为上下文管理器使用，退出时交给导出器"""
+
+    __slots__ = ('tracer', 'name', 'attrs', 'sampled', 'trace_id', 'span_id', 'parent_id',
+                 'thread_id', 'start_ns', 'end_ns')
+
+    def __init__(self, tracer: 'Tracer', name: str, attrs: Dict, sampled: bool,
+                 trace_id: int, span_id: int, parent_id: Optional[int]):
+        self.tracer = tracer
+        self.name = name
+        self.attrs = attrs
+        self.sampled = sampled
+        self.trace_id = trace_id
+        self.span_id = span_id
+        self.parent_id = parent_id
+        self.thread_id = threading.get_ident()
+        self.start_ns = 0
+        self.end_ns = 0
+
+    def set(self, **attrs):
+        """补充属性（如结果数量），未采样时忽略"""
+        if self.sampled:
+            self.attrs.update(attrs)
+
+    @property
+    def duration_ms(self) -> float:
+        return (self.end_ns - self.start_ns) / 1e6
+
+    def __enter__(self):
+        self.tracer._push(self)
+        self.start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.end_ns = time.perf_counter_ns()
+        if exc_type is not None and self.sampled:
+            self.attrs['error'] = f"{exc_type.__name__}: {exc_val}"
+        self.tracer._pop(self)
+        return False
+
+
+class _NoopSpan:
+    """追踪关闭时使用的空区间"""
+
+    sampled = False
+
+    def set(self, **attrs):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        return False
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class JsonlSpanExporter:
+    """每个span写一行JSON"""
+
+    def __init__(self, filename: str):
+        self.file = open(filename, 'a', encoding='utf-8')
+
+    def export(self, span: Span, tracer: 'Tracer'):
+        self.file.write(json.dumps({
+            'trace_id': f"{span.trace_id:016x}",
+            'span_id': f"{span.span_id:016x}",
+            'parent_id': f"{span.parent_id:016x}" if span.parent_id else None,
+            'name': span.name,
+            'start': round(tracer.wall_time(span.start_ns), 6),
+            'duration_ms': round(span.duration_ms, 3),
+            'thread': span.thread_id,
+            'attrs': span.attrs
+        }, ensure_ascii=False, default=str))
+        self.file.write('\n')
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+class ChromeTraceExporter:
+    """
+    Chrome trace事件格式（JSON数组，每个span一个 "X" 完整事件），
+    可在 chrome://tracing 或 https://ui.perfetto.dev 打开；进程中途退出时数组缺少结尾的 ]，查看器同样接受
+    """
+
+    def __init__(self, filename: str):
+        self.file = open(filename, 'w', encoding='utf-8')
+        self.file.write('[\n')
+        self.first = True
+        self.pid = os.getpid()
+
+    def export(self, span: Span, tracer: 'Tracer'):
+        event = {
+            'name': span.name,
+            'cat': 'zhilian',
+            'ph': 'X',
+            'ts': round(tracer.wall_time(span.start_ns) * 1e6, 1),
+            'dur': round((span.end_ns - span.start_ns) / 1000, 1),
+            'pid': self.pid,
+            'tid': span.thread_id,
+            'args': dict(span.attrs, trace_id=f"{span.trace_id:016x}")
+        }
+        self.file.write(('' if self.first else ',\n') + json.dumps(event, ensure_ascii=False, default=str))
+        self.first = False
+        self.file.flush()
+
+    def close(self):
+        self.file.write('\n]\n')
+        self.file.close()
+
+
+EXPORTERS = {'jsonl': JsonlSpanExporter, 'chrome': ChromeTraceExporter}
+
+
+class Tracer:
+    """追踪器
+
+    每个线程维护当前打开的span栈，新span的父节点为栈顶。是否采样在根span处按 sample_rate 决定，
+    子span沿用根span的结果，因此一条调用链要么完整记录、要么完全不记录。
+    未配置导出器时 span() 直接返回空区间，开销只有一次属性判断。
+    """
+
+    def __init__(self, exporter=None, sample_rate: float = 1.0):
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.origin_ns = time.perf_counter_ns()
+        self.origin_wall = time.time()
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+
+    def configure(self, exporter=None, sample_rate: float = None):
+        """更换导出器（None 为关闭追踪），旧导出器会被关闭"""
+        with self.lock:
+            old, self.exporter = self.exporter, exporter
+            if sample_rate is not None:
+                self.sample_rate = sample_rate
+        if old is not None and old is not exporter:
+            old.close()
+
+    def wall_time(self, perf_ns: int) -> float:
+        """perf_counter_ns 时间点换算为Unix时间（秒）"""
+        return self.origin_wall + (perf_ns - self.origin_ns) / 1e9
+
+    def _stack(self) -> list:
+        stack = getattr(self.local, 'stack', None)
+        if stack is None:
+            stack = self.local.stack = []
+        return stack
+
+    def span(self, name: str, **attrs):
+        """创建一个span，用法: with tracer.span('load_page', page_type='search') as span: ..."""
+        if self.exporter is None:
+            return NOOP_SPAN
+        stack = self._stack()
+        span_id = random.getrandbits(64)
+        if stack:
+            parent = stack[-1]
+            return Span(self, name, attrs, parent.sampled, parent.trace_id, span_id, parent.span_id)
+        return Span(self, name, attrs, random.random() < self.sample_rate, span_id, span_id, None)
+
+    def current_span(self):
+        """当前线程最内层的span，没有时返回空区间"""
+        stack = getattr(self.local, 'stack', None)
+        return stack[-1] if stack else NOOP_SPAN
+
+    def _push(self, span: Span):
+        self._stack().append(span)
+
+    def _pop(self, span: Span):
+        stack = self._stack()
+        # 生成器中的span可能在外层span之后才关闭，按对象移除而不是直接弹出栈顶
+        if stack and stack[-1] is span:
+            stack.pop()
+        elif span in stack:
+            stack.remove(span)
+        if span.sampled:
+            exporter = self.exporter
+            if exporter is None:
+                return
+            try:
+                with self.lock:
+                    exporter.export(span, self)
+            except Exception as e:
+                log.debug(f"导出追踪数据失败: {e}")
+
+    def close(self):
+        self.configure(None)
+
+
+def traced(name: str = None):
+    """为函数添加span的装饰器，span名默认为函数的限定名"""
+    def decorator(func):
+        span_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if tracer.exporter is None:
+                return func(*args, **kwargs)
+            with tracer.span(span_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def setup_tracer() -> Tracer:
+    """按配置创建全局追踪器，TRACE_ENABLED 关闭时不创建导出器"""
+    instance = Tracer(sample_rate=settings.TRACE_SAMPLE_RATE)
+    if settings.TRACE_ENABLED:
+        exporter_class = EXPORTERS.get(settings.TRACE_FORMAT)
+        if exporter_class is None:
+            log.warning(f"未知的追踪格式 {settings.TRACE_FORMAT}，使用chrome")
+            exporter_class = ChromeTraceExporter
+        try:
+            instance.configure(exporter_class(settings.TRACE_FILE))
+            log.info(f"追踪已开启: {settings.TRACE_FILE}（{settings.TRACE_FORMAT}，采样率 {settings.TRACE_SAMPLE_RATE}）")
+        except Exception as e:
+            log.error(f"打开追踪文件失败: {e}")
+    atexit.register(instance.close)
+    return instance
+
+
+# 全局追踪器
+tracer = setup_tracer()
@@ -5,29 +5,44 @@ import time
 import json
 import signal
 import sys
-from typing import Dict, List, Optional
+import threading
+from concurrent.futures import Future
+from typing import Dict, Iterable, List, Optional
 
+import modules
 from config import settings
-from utils import log
-from modules import (
-    ZhilianLogin,
-    CandidateManager,
-    InteractionManager,
-    WebSocketChatManager,
-    MessageForwarder
-)
+from utils import log, metrics
+from utils.profiling import Profiler
+from modules.user_data import clone_profile
 
 
 class ZhilianBot:
     """智联招聘自动化机器人"""
     
+    # 各运行模式需要初始化的组件：browser（浏览器及依赖它的管理器）、forwarder（消息转发）、index（本地职位索引）
+    # 管理器模块在 modules 中按需导入，未用到的组件不会加载 selenium、requests 等依赖
+    MODE_COMPONENTS = {
+        'full': ('browser', 'forwarder', 'index'),
+        'search': ('browser',),
+        'monitor': ('browser', 'forwarder'),
+        'test': ('browser', 'forwarder', 'index'),
+        'export': ('index',)
+    }
+    
     def __init__(self):
         self.login_manager = None
         self.candidate_manager = None
         self.interaction_manager = None
         self.websocket_manager = None
+        self.chat_resolver = None
         self.message_forwarder = None
+        self.greeting_scheduler = None
+        self.job_index = None
+        self.crawl_scheduler = None
+        self.lane_logins = []  # 额外打招呼通道的浏览器实例
         self.is_running = False
+        self._browser_future = None  # prewarm 启动的浏览器
+        self.started_at = time.perf_counter()
         
         # 注册信号处理器
         signal.signal(signal.SIGINT, self._signal_handler)
@@ -39,23 +54,110 @@ class ZhilianBot:
         self.stop()
         sys.exit(0)
     
-    def initialize(self) -> bool:
-        """初始化机器人"""
+    def prewarm(self):
+        """
+        在后台线程中启动浏览器并打开首页，预热DNS/TLS连接和HTTP缓存
+
+        浏览器启动是初始化中最慢的一步，提前调用可与配置加载、消息转发器等
+        不依赖浏览器的初始化并行进行；initialize 会等待预热完成后再使用该浏览器。
+        """
+        if self._browser_future is not None or self.login_manager is not None:
+            return
+        
+        future = Future()
+        self._browser_future = future
+        
+        def launch():
+            try:
+                login_manager = modules.ZhilianLogin()
+                try:
+                    from modules.page_loader import load_page
+                    load_page(login_manager.driver, settings.ZHILIAN_BASE_URL)
+                except Exception as e:
+                    log.debug(f"预热首页加载失败: {e}")
+                future.set_result(login_manager)
+            except Exception as e:
+                future.set_exception(e)
+        
+        threading.Thread(target=launch, name="browser-prewarm", daemon=True).start()
+        log.info("已在后台启动浏览器预热")
+    
+    def _take_browser(self) -> "modules.ZhilianLogin":
+        """取得预热好的浏览器，未预热时同步启动"""
+        if self._browser_future is None:
+            return modules.ZhilianLogin()
+        
+        waited = time.perf_counter()
         try:
-            log.info("正在初始化智联招聘机器人...")
+            return self._browser_future.result()
+        finally:
+            self._browser_future = None
+            log.info(f"等待浏览器预热 {(time.perf_counter() - waited) * 1000:.0f}ms")
+    
+    def profile(self, kind: str = 'sampling', mode: str = 'run', **params) -> Profiler:
+        """
+        剖析一段运行，结果写入 PROFILE_DIR
+        
+        用法: with bot.profile('sampling', mode='search', keyword='Python'): bot.search_and_greet_candidates(...)
+        
+        Args:
+            kind: cprofile（确定性剖析，开销较大，只记录调用线程）或 sampling（采样所有线程，含等待时间，可生成火焰图）
+            mode: 写入文件名和元数据的运行模式
+            **params: 记录到元数据中的运行参数
+        """
+        return Profiler(kind, tags={'mode': mode, **params})
+    
+    def initialize(self, mode: str = 'full', components: Iterable[str] = None) -> bool:
+        """
+        初始化机器人
+        
+        Args:
+            mode: 运行模式，决定需要初始化的组件（见 MODE_COMPONENTS）
+            components: 显式指定组件，优先于 mode
+        """
+        try:
+            components = set(components if components is not None else self.MODE_COMPONENTS.get(mode, self.MODE_COMPONENTS['full']))
+            log.info(f"正在初始化智联招聘机器人（{', '.join(sorted(components))}）...")
+            
+            if settings.METRICS_PORT:
+                metrics.start_server(settings.METRICS_PORT, settings.METRICS_HOST)
             
-            # 初始化登录管理器
-            self.login_manager = ZhilianLogin()
+            if 'browser' in components and settings.BROWSER_PREWARM:
+                self.prewarm()
             
-            # 初始化其他管理器
-            self.candidate_manager = CandidateManager(self.login_manager.driver)
-            self.interaction_manager = InteractionManager(self.login_manager.driver)
-            self.websocket_manager = WebSocketChatManager(self.login_manager.driver)
+            # 先初始化不依赖浏览器的组件，与浏览器启动并行
+            if 'forwarder' in components:
+                self.message_forwarder = modules.MessageForwarder()
             
-            # 初始化消息转发器
-            self.message_forwarder = MessageForwarder()
+            # 本地职位索引
+            if 'index' in components and settings.JOB_INDEX_ENABLED:
+                self.job_index = modules.LocalJobIndex()
+                self.crawl_scheduler = modules.CrawlScheduler(self.job_index)
             
-            log.info("机器人初始化完成")
+            if 'browser' in components:
+                # 初始化登录管理器
+                self.login_manager = self._take_browser()
+                
+                # 初始化其他管理器
+                # 同一个driver的performance日志只能读取一次，各管理器共用一个抓包器和显式等待对象
+                driver = self.login_manager.driver
+                network_capture = self.login_manager.network_capture
+                wait = self.login_manager.wait
+                self.candidate_manager = modules.CandidateManager(driver, network_capture=network_capture, wait=wait)
+                self.websocket_manager = modules.WebSocketChatManager(driver, network_capture=network_capture, wait=wait)
+                # 主通道和额外打招呼通道共用一个聊天ID解析器（同一份缓存和缓存文件）
+                self.chat_resolver = modules.ChatIdResolver()
+                self.interaction_manager = modules.InteractionManager(
+                    driver,
+                    websocket_manager=self.websocket_manager,
+                    chat_resolver=self.chat_resolver,
+                    wait=wait
+                )
+                
+                # 初始化打招呼调度器（额外通道在首次使用时再创建）
+                self.greeting_scheduler = modules.GreetingScheduler([self.interaction_manager])
+            
+            log.info(f"机器人初始化完成，耗时 {(time.perf_counter() - self.started_at) * 1000:.0f}ms")
             return True
             
         except Exception as e:
@@ -142,34 +244,55 @@ class ZhilianBot:
         try:
             log.info("开始搜索并打招呼候选人...")
             
-            # 搜索候选人
-            candidates = self.candidate_manager.search_candidates(
+            # 筛选条件在解析卡片时判断，凑够目标数量后不再解析和翻页。
+            # 开启排序时多搜索 RANKING_OVERSAMPLE 倍，排序后取最匹配的 max_candidates 个；
+            # 否则流式处理，第1页解析出的候选人立即进入打招呼流程
+            ranking = settings.GREETING_RANKING
+            target_count = max_candidates * max(1, settings.RANKING_OVERSAMPLE) if ranking else max_candidates
+            
+            candidates = []
+            candidate_stream = self.candidate_manager.iter_candidates(
                 keyword=search_params.get('keyword', ''),
                 location=search_params.get('location', ''),
                 experience=search_params.get('experience', ''),
                 education=search_params.get('education', ''),
-                page_limit=search_params.get('page_limit', 3)
+                page_limit=search_params.get('page_limit', 3),
+                target_count=target_count,
+                candidate_filter=modules.CandidateFilter.from_params(search_params)
+            )
+            
+            def collect_and_forward():
+                for candidate in candidate_stream:
+                    candidates.append(candidate)
+                    # 转发候选人信息
+                    if self.message_forwarder:
+                        self.message_forwarder.forward_candidate_info(candidate)
+                    yield candidate
+            
+            if ranking:
+                greeting_queue = modules.CandidateRanker(search_params).rank(list(collect_and_forward()), top_k=max_candidates)
+            else:
+                greeting_queue = collect_and_forward()
+            
+            # 调度打招呼（限速 + 每日配额 + 断点续发）
+            self._ensure_greeting_lanes()
+            results = self.greeting_scheduler.run(
+                candidates=greeting_queue,
+                message_template=greeting_message,
+                max_count=max_candidates
             )
             
             if not candidates:
                 log.warning("未找到符合条件的候选人")
                 return {'total': 0, 'success': 0, 'failed': 0}
             
-            # 限制候选人数量
-            candidates = candidates[:max_candidates]
-            
-            # 批量打招呼
-            results = self.interaction_manager.batch_greeting(
-                candidates=candidates,
-                message_template=greeting_message,
-                max_count=max_candidates
-            )
+            # 搜索结果写入本地索引，后续可用 search_local 直接查询；新发现的职位在增量抓取时优先
+            if self.job_index:
+                self.job_index.add_many(candidates)
+                self.crawl_scheduler.discover(candidate.get('profile_url') for candidate in candidates)
             
-            # 转发候选人信息和互动事件
+            # 转发互动事件
             if self.message_forwarder:
-                for candidate in candidates:
-                    self.message_forwarder.forward_candidate_info(candidate)
-                
                 self.message_forwarder.forward_interaction_event(
                     event_type="batch_greeting",
                     candidate_id="batch",
@@ -182,13 +305,38 @@ class ZhilianBot:
             log.error(f"搜索并打招呼候选人失败: {e}")
             return {'total': 0, 'success': 0, 'failed': 0}
     
-    def get_candidate_details(self, candidate_urls: List[str]) -> List[Dict]:
-        """获取候选人详细信息"""
+    def _ensure_greeting_lanes(self):
+        """按配置创建额外的打招呼通道，复用主浏览器的登录态（配置了 CHROME_PROFILE_DIR 时各通道使用模板的副本）"""
+        extra_lanes = settings.GREETING_LANES - 1 - len(self.lane_logins)
+        if extra_lanes <= 0:
+            return
+        
+        cookies = self.login_manager.export_cookies()
+        for _ in range(extra_lanes):
+            try:
+                lane_login = modules.ZhilianLogin(user_data_dir=clone_profile(lane_index=len(self.lane_logins) + 1))
+                lane_login.import_cookies(cookies)
+                self.lane_logins.append(lane_login)
+                self.greeting_scheduler.lanes.append(
+                    modules.InteractionManager(lane_login.driver, websocket_manager=self.websocket_manager,
+                                               chat_resolver=self.chat_resolver, wait=lane_login.wait)
+                )
+            except Exception as e:
+                log.error(f"创建打招呼通道失败: {e}")
+                break
+        
+        log.info(f"打招呼通道数: {len(self.greeting_scheduler.lanes)}")
+    
+    def get_candidate_details(self, candidate_urls: List[str], budget: int = None) -> List[Dict]:
+        """获取候选人详细信息（budget 为本次最多访问的详情页数量，默认使用今日剩余抓取预算）"""
         try:
             log.info(f"获取 {len(candidate_urls)} 个候选人的详细信息...")
             
             detailed_candidates = []
             
+            # 增量抓取：只访问新职位和估计已过期的职位，其余使用本地索引
+            planned = set(self.crawl_scheduler.plan(candidate_urls, budget)) if self.crawl_scheduler else None
+            
             for i, url in enumerate(candidate_urls, 1):
                 try:
                     log.info(f"正在获取第 {i}/{len(candidate_urls)} 个职位详情...")
@@ -198,9 +346,22 @@ class ZhilianBot:
                         log.warning(f"第 {i} 个URL为空，跳过")
                         continue
                     
+                    if planned is not None and url not in planned:
+                        # 只有搜索卡片数据的职位不算详情，不能当作详情返回
+                        cached = self.job_index.get(url, detail_only=True)
+                        if cached:
+                            detailed_candidates.append(cached)
+                            log.info(f"✓ 第 {i} 个职位未过期，使用本地索引中的详情")
+                        else:
+                            log.info(f"第 {i} 个职位超出今日抓取预算且本地没有详情，跳过")
+                        continue
+                    
                     detail = self.candidate_manager.get_candidate_detail(url)
                     if detail:
                         detailed_candidates.append(detail)
+                        if self.job_index and not detail.get('error'):
+                            self.job_index.add(detail)
+                            self.crawl_scheduler.record_fetch(url, detail)
                         
                         # 检查是否获取成功
                         if detail.get('error'):
@@ -239,6 +400,41 @@ class ZhilianBot:
             log.error(f"获取候选人详细信息失败: {e}")
             return []
     
+    def refresh_stale_details(self, budget: int = None) -> List[Dict]:
+        """按增量抓取计划刷新已登记职位的详情（新职位优先，其次是估计已过期的职位）"""
+        if not self.crawl_scheduler:
+            log.warning("本地职位索引未启用，无法增量抓取")
+            return []
+        urls = self.crawl_scheduler.plan(budget=budget)
+        if not urls:
+            log.info("没有需要刷新的职位详情")
+            return []
+        return self.get_candidate_details(urls, budget=len(urls))
+    
+    def search_local(self, query: str = "", filters: Dict = None, limit: int = 50) -> List[Dict]:
+        """在本地职位索引中搜索（不访问网站），filters 同 CandidateFilter 参数"""
+        if not self.job_index:
+            log.warning("本地职位索引未启用")
+            return []
+        return self.job_index.search_local(query, filters, limit=limit)
+    
+    def export_local(self, filename: str, query: str = "", filters: Dict = None, limit: int = None) -> int:
+        """把本地索引中的职位导出为JSON或JSONL文件（以.jsonl结尾时逐行写入），返回导出数量"""
+        jobs = self.search_local(query, filters, limit=limit)
+        try:
+            with open(filename, 'w', encoding='utf-8') as f:
+                if filename.endswith(".jsonl"):
+                    for job in jobs:
+                        f.write(json.dumps(job, ensure_ascii=False))
+                        f.write('\n')
+                else:
+                    json.dump(jobs, f, ensure_ascii=False, indent=2)
+            log.info(f"已从本地索引导出 {len(jobs)} 个职位到 {filename}")
+            return len(jobs)
+        except Exception as e:
+            log.error(f"导出本地索引失败: {e}")
+            return 0
+    
     def monitor_chats(self):
         """监控聊天消息"""
         try:
@@ -246,6 +442,9 @@ class ZhilianBot:
             
             while self.is_running:
                 try:
+                    # WebSocket登录态失效时，在本线程（持有driver）中重新获取连接信息
+                    self.websocket_manager.refresh_connection_info()
+                    
                     # 获取聊天列表
                     chat_list = self.websocket_manager.get_chat_list()
                     
@@ -378,33 +577,63 @@ class ZhilianBot:
             if self.message_forwarder:
                 self.message_forwarder.stop()
             
+            # 停止打招呼调度
+            if self.greeting_scheduler:
+                self.greeting_scheduler.stop()
+            
             # 关闭浏览器
+            for lane_login in self.lane_logins:
+                lane_login.close()
+            self.lane_logins = []
+            
             if self.login_manager:
                 self.login_manager.close()
             
+            # 预热中的浏览器尚未被取走时等待其启动完成后关闭
+            if self._browser_future is not None:
+                try:
+                    self._browser_future.result(timeout=settings.BROWSER_TIMEOUT).close()
+                except Exception as e:
+                    log.debug(f"关闭预热浏览器失败: {e}")
+                self._browser_future = None
+            
+            if self.job_index:
+                self.job_index.close()
+                self.job_index = None
+            
+            metrics.stop_server()
+            
             log.info("机器人已停止")
             
         except Exception as e:
             log.error(f"停止机器人失败: {e}")
     
     def get_status(self) -> Dict:
-        """获取机器人状态"""
+        """获取机器人状态（读取指标和内存状态，不访问浏览器）"""
         status = {
             'is_running': self.is_running,
             'login_status': False,
             'websocket_status': False,
-            'forwarder_status': {}
+            'websocket_uptime': 0.0,
+            'websocket_last_frame_age': None,
+            'forwarder_status': {},
+            'metrics': {}
         }
         
         try:
-            if self.login_manager:
-                status['login_status'] = self.login_manager.is_logged_in()
+            # 登录状态取最近一次登录/检查的结果，避免为了报告状态重新加载页面
+            logged_in = metrics.get('zhilian_logged_in')
+            status['login_status'] = bool(logged_in and logged_in.value())
             
             if self.websocket_manager:
                 status['websocket_status'] = self.websocket_manager.is_connected
+                status['websocket_uptime'] = round(self.websocket_manager.uptime, 1)
+                status['websocket_last_frame_age'] = self.websocket_manager.last_frame_age
             
             if self.message_forwarder:
                 status['forwarder_status'] = self.message_forwarder.get_status()
+            
+            status['metrics'] = metrics.snapshot()
         
         except Exception as e:
             log.error(f"获取状态失败: {e}")